@@ -1,56 +1,89 @@
+import time
+PROCESS_STARTED = time.perf_counter()
+
 import os
+import sys
 import json
-import base64
+import gzip
 import traceback
 import argparse
-import time
-from datetime import datetime
-from google.cloud import secretmanager
-from google.auth import default
-import google.generativeai as genai
-import gspread
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import timedelta
 from google.api_core import exceptions as gax_exceptions
+from url_index import UrlIndex
+from canonical import deduplicate_jobs
+from canonical_url import canonicalize_url
+from verdict_cache import VerdictCache, resume_fingerprint
+from rate_limiter import AdaptiveRateLimiter, backoff_delay
+from resume_profile import get_resume_profile, estimate_tokens
+from call_stats import CallStats
+from prefilter import prefilter_jobs, prefilter_report
+from jd_fetcher import JobDescriptionFetcher, JD_FETCH_ENABLED
+from chunk_packer import ChunkPacker
+from response_parser import RESPONSE_SCHEMA, parse_good_matches
+from sheet_sink import SheetSink
+from config_loader import get_config, GCP_PROJECT_ID
+from blob_store import get_blob_store
 
 # --- Configuration ---
-GCP_PROJECT_ID = os.environ.get("GCLOUD_PROJECT")
-GEMINI_API_KEY = None
-RESUME_CONTENT = None
 MAX_RATE_LIMIT_RETRIES = 3
-RETRY_SLEEP_SECONDS = 60
+GEMINI_MODEL = "gemini-2.5-flash"
+GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}
+# Keep the resume and instructions in a server-side cached context instead of every prompt
+GEMINI_CONTEXT_CACHE = os.environ.get("GEMINI_CONTEXT_CACHE", "true").lower() == "true"
+GEMINI_CONTEXT_CACHE_TTL_MINUTES = int(os.environ.get("GEMINI_CONTEXT_CACHE_TTL_MINUTES", 60))
+CHUNK_SIZE = 5
+GEMINI_CONCURRENCY = int(os.environ.get("GEMINI_CONCURRENCY", 3))
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get("GEMINI_TIMEOUT_SECONDS", 120))
+# A call still running after this many seconds gets a second, hedged request; 0 disables hedging
+GEMINI_HEDGE_AFTER_SECONDS = float(os.environ.get("GEMINI_HEDGE_AFTER_SECONDS", 45))
+# Threads for model calls, shared by every batch in the process. Calls abandoned at the deadline keep
+# a thread until the transport gives up, so leave room beyond one call plus one hedge per chunk.
+GEMINI_CALL_THREADS = int(os.environ.get("GEMINI_CALL_THREADS", GEMINI_CONCURRENCY * 4))
+APPLICATIONS_SHEET = None
+# Where job_trigger_service puts claim-check batches passed as --jobs-ref
+BATCH_STORE_URI = os.environ.get("BATCH_STORE_URI")
+# Worker mode: streaming pull from this subscription to the scraped-urls topic
+ANALYZER_SUBSCRIPTION = os.environ.get("ANALYZER_SUBSCRIPTION", "scraped-urls-analyzer")
+WORKER_MAX_MESSAGES = int(os.environ.get("WORKER_MAX_MESSAGES", 4))
+WORKER_FLUSH_SECONDS = float(os.environ.get("WORKER_FLUSH_SECONDS", 30))
+MODEL_CACHE = {}
+RATE_LIMITER = None
+CALL_POOL = None
+# Startup cost is reported for the first batch only; later batches in worker mode start warm
+FIRST_WORK_REPORTED = False
 
 def get_gemini_api_key():
-    """Fetches the Gemini API key from Secret Manager."""
-    global GEMINI_API_KEY
-    if GEMINI_API_KEY: return GEMINI_API_KEY
-        
-    client = secretmanager.SecretManagerServiceClient()
-    secret_name = f"projects/{GCP_PROJECT_ID}/secrets/gemini-api-key/versions/latest"
-    response = client.access_secret_version(name=secret_name)
-    GEMINI_API_KEY = response.payload.data.decode("UTF-8").strip()
-    return GEMINI_API_KEY
+    """Returns the Gemini API key from the process-wide config."""
+    return get_config()["gemini_api_key"]
 
 def get_resume_content():
-    """Fetches the resume content from Secret Manager."""
-    global RESUME_CONTENT
-    if RESUME_CONTENT: return RESUME_CONTENT
-    
-    client = secretmanager.SecretManagerServiceClient()
-    secret_name = f"projects/{GCP_PROJECT_ID}/secrets/resume-latex/versions/latest"
-    response = client.access_secret_version(name=secret_name)
-    RESUME_CONTENT = response.payload.data.decode("UTF-8").strip()
-    return RESUME_CONTENT
+    """Returns the resume LaTeX from the process-wide config."""
+    return get_config()["resume_latex"]
 
 def get_sheet_id():
-    """Fetches the Google Sheet ID from Secret Manager."""
-    client = secretmanager.SecretManagerServiceClient()
-    secret_name = f"projects/{GCP_PROJECT_ID}/secrets/google-sheet-id/versions/latest"
-    response = client.access_secret_version(name=secret_name)
-    return response.payload.data.decode("UTF-8").strip()
+    """Returns the Google Sheet ID from the process-wide config."""
+    return get_config()["sheet_id"]
+
+def load_genai():
+    """Imports and configures the Gemini SDK on first use; batches that never reach the model skip it."""
+    import google.generativeai as genai
+    genai.configure(api_key=get_gemini_api_key())
+    return genai
 
-def chunk_list(data, chunk_size):
-    """Splits a list into smaller chunks of a specified size."""
-    for i in range(0, len(data), chunk_size):
-        yield data[i:i + chunk_size]
+def get_applications_sheet(sheet_id):
+    """Opens the "applications" worksheet once per process."""
+    global APPLICATIONS_SHEET
+    if APPLICATIONS_SHEET: return APPLICATIONS_SHEET
+
+    import gspread
+    from google.auth import default
+
+    creds, _ = default(scopes=["https://www.googleapis.com/auth/spreadsheets"])
+    sa = gspread.authorize(creds)
+    APPLICATIONS_SHEET = sa.open_by_key(sheet_id).worksheet("applications")
+    return APPLICATIONS_SHEET
 
 def is_rate_limit_error(exc: Exception) -> bool:
     """Detect 429/rate limit across common exception types/messages."""
@@ -60,12 +93,12 @@ def is_rate_limit_error(exc: Exception) -> bool:
     return ("429" in s) or ("rate limit" in s) or ("quota" in s) or ("exceeded" in s)
 
 def deduplicate_by_url(matches):
-    """Simple deduplication by URL within current batch"""
+    """Simple deduplication by canonical URL within current batch"""
     seen_urls = set()
     unique_matches = []
     
     for job in matches:
-        url = job.get("url", "").strip()
+        url = canonicalize_url(job.get("url", ""))
         if url not in seen_urls and url:
             seen_urls.add(url)
             unique_matches.append(job)
@@ -75,7 +108,7 @@ def deduplicate_by_url(matches):
     print(f"🔍 Batch deduplication: {len(matches)} → {len(unique_matches)} jobs")
     return unique_matches
 
-def check_against_existing_sheet_and_deduplicate(matches, sheet_id):
+def check_against_existing_sheet_and_deduplicate(matches, url_index):
     """Remove duplicates both within the batch and against existing sheet entries"""
     
     # First, deduplicate within the current batch
@@ -84,27 +117,14 @@ def check_against_existing_sheet_and_deduplicate(matches, sheet_id):
     if not unique_matches:
         return []
     
-    # Then check against existing Google Sheet entries
+    # Then check against existing Google Sheet entries via the synced URL index
     try:
-        creds, _ = default(scopes=["https://www.googleapis.com/auth/spreadsheets"])
-        sa = gspread.authorize(creds)
-        
-        sheet = sa.open_by_key(sheet_id).worksheet("applications")
-        
-        # Get all existing URLs from the sheet (assuming URL is in column D)
-        existing_data = sheet.get_all_values()
-        if len(existing_data) > 1:  # Skip header row
-            existing_urls = {row[3].strip() for row in existing_data[1:] if len(row) > 3 and row[3].strip()}
-        else:
-            existing_urls = set()
-        
-        print(f"📋 Found {len(existing_urls)} existing URLs in Google Sheet")
+        print(f"📋 Found {url_index.count()} existing URLs in Google Sheet")
         
         # Filter out URLs that already exist in the sheet
         new_unique_matches = []
         for job in unique_matches:
-            url = job.get("url", "").strip()
-            if url not in existing_urls:
+            if job.get("url", "") not in url_index:
                 new_unique_matches.append(job)
             else:
                 print(f"🗑️ Already exists in sheet: {job.get('companyName')} - {job.get('positionName')}")
@@ -116,52 +136,22 @@ def check_against_existing_sheet_and_deduplicate(matches, sheet_id):
         print(f"⚠️ Error checking against existing sheet: {e}")
         return unique_matches
 
-def analyze_job_batch(jobs_json):
-    """Analyzes a batch of job data and returns good matches"""
-    try:
-        jobs_to_process = json.loads(jobs_json)
-        
-        if not jobs_to_process:
-            print("Empty batch received.")
-            return []
-
-        print(f"🧠 AI Analyzer Job processing {len(jobs_to_process)} jobs.")
-        
-        resume_latex = get_resume_content()
-        if not resume_latex:
-            print("Could not load resume from secret.")
-            return []
-
-        api_key = get_gemini_api_key()
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        all_good_matches = []
-        
-        # Break jobs into smaller chunks of 5 (reduced for job reliability)
-        job_chunks = list(chunk_list(jobs_to_process, 5))
-
-        for i, chunk in enumerate(job_chunks):
-            print(f"--- Processing Gemini chunk {i+1}/{len(job_chunks)} with {len(chunk)} jobs ---")
-            
-            
-            prompt = f"""
+def build_instructions(resume_profile):
+    """The part of the prompt shared by every chunk: the resume profile and the matching rules."""
+    return f"""
             You are an expert AI job scout. Your task is to analyze a list of job postings against the provided resume and identify the best matches.
 
-            MY RESUME (in LaTeX):
+            MY RESUME:
             ---
-            {resume_latex}
+            {resume_profile}
             ---
 
-            Jobs to analyze in this chunk:
-            {json.dumps(chunk)}
-
-            For each job in the list, you must visit the provided URL, read the full job description, and strictly evaluate it against my resume.
+            For each job in the list, read the full job description and strictly evaluate it against my resume. Use the job's "description" field when it is present; otherwise visit the provided URL.
             Identify which of these jobs are a good match (a score of 40% or higher). A good match is a Software Engineer role for a new grad with less than 2 years of professional experience, and the required tech stack should align with the skills listed in my resume. **NO DATA ENGINEERING/MACHINE LEARNING/DATA ANALYST ROLES.** Also, importantly, the job description must NOT explicitly require US citizenship or permanent residency.
 
             Return a single JSON object with a key "good_matches". The value should be an array of the original job objects that you determine are a good match.
 
-            Assume the companyName and the positionName provided in the above mentioned jobs as truth. Do not replace them, only reply with the good matches from the bunch.
+            Assume the companyName and the positionName provided in the jobs as truth. Do not replace them, only reply with the good matches from the bunch.
 
             If no jobs in the chunk are a good match, return an empty array for "good_matches". **Only reply with the JSON. Nothing else preceding it or following it.**
 
@@ -176,124 +166,446 @@ def analyze_job_batch(jobs_json):
                 ]
             }}
             """
-          
-            retries = 0
-            while retries <= MAX_RATE_LIMIT_RETRIES:
-                try:
-                    response = model.generate_content(prompt)
-                    cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-                    
-                    if not cleaned_response:
-                        print(f"❌ Empty response from Gemini for chunk {i+1}")
-                        break # Exit retry loop, move to next chunk
-                        
-                    analysis_result = json.loads(cleaned_response)
-                    chunk_matches = analysis_result.get("good_matches", [])
-                    
-                    if chunk_matches:
-                        print(f"✅ Gemini found {len(chunk_matches)} good matches in this chunk.")
-                        all_good_matches.extend(chunk_matches)
-                    else:
-                        print("❌ Gemini: No good matches found in this chunk.")
-                    
-                    break # Success, exit retry loop
-
-                except Exception as e:
-                    if is_rate_limit_error(e):
-                        retries += 1
-                        if retries > MAX_RATE_LIMIT_RETRIES:
-                            print(f"❌ Rate limit exceeded after {MAX_RATE_LIMIT_RETRIES} retries. Skipping chunk.")
-                            break # Exit retry loop
-                        print(f"⚠️ Rate limit hit. Waiting {RETRY_SLEEP_SECONDS}s... (Attempt {retries}/{MAX_RATE_LIMIT_RETRIES})")
-                        time.sleep(RETRY_SLEEP_SECONDS)
-                    else:
-                        # It's a different error (e.g., JSONDecodeError, or another API error)
-                        if isinstance(e, json.JSONDecodeError):
-                             print(f"❌ JSON parse error for chunk {i+1}: {e}")
-                             print(f"Response was: {response.text}")
-                        else:
-                             print(f"❌ Non-rate-limit error processing chunk {i+1}: {e}")
-                        break # Exit retry loop on other errors
 
+def build_prompt(chunk, instructions=None, descriptions=None):
+    """Builds the Gemini prompt for one chunk. Instructions are omitted when they live in a cached context."""
+    descriptions = descriptions or {}
+    jobs = [
+        dict(job, description=descriptions[job.get("url")]) if job.get("url") in descriptions else job
+        for job in chunk
+    ]
+    jobs_part = f"""
+            Jobs to analyze in this chunk:
+            {json.dumps(jobs)}
+            """
+    # Shared text goes first so consecutive calls share a prefix
+    return f"{instructions}{jobs_part}" if instructions else jobs_part
+
+def create_model(instructions, resume_hash):
+    """Returns (model, inline_instructions). With a context cache the instructions are sent once, not per call."""
+    genai = load_genai()
+    if GEMINI_CONTEXT_CACHE:
+        try:
+            from google.generativeai import caching
+            display_name = f"jobscout-resume-{resume_hash}"
+            cache = next((c for c in caching.CachedContent.list() if c.display_name == display_name), None)
+            if cache is None:
+                cache = caching.CachedContent.create(
+                    model=f"models/{GEMINI_MODEL}",
+                    display_name=display_name,
+                    system_instruction=instructions,
+                    ttl=timedelta(minutes=GEMINI_CONTEXT_CACHE_TTL_MINUTES),
+                )
+                print(f"🗃️ Created Gemini context cache {display_name}")
+            else:
+                cache.update(ttl=timedelta(minutes=GEMINI_CONTEXT_CACHE_TTL_MINUTES))
+                print(f"🗃️ Reusing Gemini context cache {display_name}")
+            return genai.GenerativeModel.from_cached_content(cached_content=cache), None
+        except Exception as e:
+            # e.g. the instructions are below the model's minimum cacheable size
+            print(f"⚠️ Context cache unavailable, sending the resume inline: {e}")
+    return genai.GenerativeModel(GEMINI_MODEL), instructions
+
+def get_model(instructions, resume_hash):
+    """Reuses the model (and its context cache) across batches until half the cache TTL has passed."""
+    cached = MODEL_CACHE.get(resume_hash)
+    if cached and time.time() - cached[2] < GEMINI_CONTEXT_CACHE_TTL_MINUTES * 30:
+        return cached[0], cached[1]
+    model, inline_instructions = create_model(instructions, resume_hash)
+    MODEL_CACHE[resume_hash] = (model, inline_instructions, time.time())
+    return model, inline_instructions
+
+def get_rate_limiter():
+    """One limiter per process, so concurrent batches in worker mode share the quota."""
+    global RATE_LIMITER
+    if RATE_LIMITER is None:
+        RATE_LIMITER = AdaptiveRateLimiter()
+    return RATE_LIMITER
+
+def report_first_work(started):
+    global FIRST_WORK_REPORTED
+    if not FIRST_WORK_REPORTED:
+        FIRST_WORK_REPORTED = True
+        print(f"⏱️ Time to first useful work: {started - PROCESS_STARTED:.2f}s after process start")
+
+def get_call_pool():
+    """One model-call pool per process. It is never shut down, so a batch does not wait for abandoned calls."""
+    global CALL_POOL
+    if CALL_POOL is None:
+        CALL_POOL = ThreadPoolExecutor(max_workers=GEMINI_CALL_THREADS, thread_name_prefix="gemini-call")
+    return CALL_POOL
+
+def generate_with_hedge(model, prompt, limiter, call_pool):
+    """Calls the model with a deadline; if it runs long, races a second request and takes the first answer."""
+    def call():
+        return model.generate_content(
+            prompt, generation_config=GENERATION_CONFIG, request_options={"timeout": GEMINI_TIMEOUT_SECONDS}
+        )
+
+    limiter.acquire()
+    # The SDK timeout is a request option the transport may not enforce; this is the hard stop
+    deadline = time.monotonic() + GEMINI_TIMEOUT_SECONDS
+    futures = [call_pool.submit(call)]
+    if GEMINI_HEDGE_AFTER_SECONDS > 0:
+        done, _ = wait(futures, timeout=min(GEMINI_HEDGE_AFTER_SECONDS, GEMINI_TIMEOUT_SECONDS))
+        if not done and time.monotonic() < deadline:
+            print(f"⏳ Gemini call still running after {GEMINI_HEDGE_AFTER_SECONDS}s, sending a hedged request")
+            limiter.acquire()
+            futures.append(call_pool.submit(call))
+            deadline = time.monotonic() + GEMINI_TIMEOUT_SECONDS
+
+    pending = set(futures)
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            # The abandoned calls finish in the background; their results are ignored
+            raise TimeoutError(f"Gemini call did not answer within {GEMINI_TIMEOUT_SECONDS}s")
+        for future in done:
+            try:
+                return future.result()
+            except Exception as e:
+                error = e  # Wait for the other request before giving up
+    raise error
+
+def analyze_chunk(model, chunk, label, instructions, descriptions, limiter, call_pool, verdict_cache, stats):
+    """Sends one chunk to Gemini with backoff on rate limits.
+
+    Returns (matches, unresolved_jobs): unresolved jobs got no verdict because the answer was
+    unusable or cut off. Returns None when the request kept failing on quota or timeouts.
+    """
+    print(f"--- Processing Gemini {label} with {len(chunk)} jobs ---")
+    prompt = build_prompt(chunk, instructions, descriptions)
+    originals = {canonicalize_url(job.get("url", "")): job for job in chunk}
+
+    retries = 0
+    while retries <= MAX_RATE_LIMIT_RETRIES:
+        try:
+            call_started = time.perf_counter()
+            response = generate_with_hedge(model, prompt, limiter, call_pool)
+            stats.record(response, time.perf_counter() - call_started, label)
+            limiter.on_success()
+        except Exception as e:
+            retryable = is_rate_limit_error(e) or isinstance(e, (gax_exceptions.DeadlineExceeded, TimeoutError))
+            if not retryable:
+                print(f"❌ Non-rate-limit error processing {label}: {e}")
+                stats.record_wasted()
+                # A request rejected as invalid (e.g. too large) may go through in halves
+                return ([], chunk) if isinstance(e, gax_exceptions.InvalidArgument) else None
+            if is_rate_limit_error(e):
+                limiter.on_throttle()
+            retries += 1
+            if retries > MAX_RATE_LIMIT_RETRIES:
+                print(f"❌ {label} still failing after {MAX_RATE_LIMIT_RETRIES} retries. Skipping chunk.")
+                return None
+            delay = backoff_delay(retries)
+            print(f"⚠️ {type(e).__name__} on {label}. Waiting {delay:.1f}s... (Attempt {retries}/{MAX_RATE_LIMIT_RETRIES})")
+            time.sleep(delay)
+            continue
+
+        try:
+            matches, complete = parse_good_matches(response.text)
+        except ValueError as e:
+            # Also covers a blocked or empty candidate, where response.text itself raises ValueError
+            print(f"❌ Unusable response for {label}: {e}")
+            stats.record_wasted()
+            return [], chunk
+
+        # Hand back the scraped job objects, not the model's copies with descriptions attached
+        chunk_matches = []
+        for match in matches:
+            original = originals.get(canonicalize_url(match.get("url", "")))
+            if original is not None and original not in chunk_matches:
+                chunk_matches.append(original)
+
+        if complete:
+            judged, unresolved = chunk, []
+        else:
+            # A cut-off answer still vouches for the matches it got out; the rest get asked again
+            judged = chunk_matches
+            unresolved = [job for job in chunk if job not in chunk_matches]
+            stats.record_salvaged()
+            print(f"⚠️ Truncated response for {label}: kept {len(chunk_matches)} matches, {len(unresolved)} jobs unresolved")
+        verdict_cache.record(judged, chunk_matches)
+
+        if chunk_matches:
+            print(f"✅ Gemini found {len(chunk_matches)} good matches in {label}.")
+        else:
+            print(f"❌ Gemini: No good matches found in {label}.")
+        return chunk_matches, unresolved
+    return None
+
+def analyze_with_bisection(model, chunk, label, instructions, descriptions, limiter, call_pool, verdict_cache, stats):
+    """Analyzes a chunk, splitting jobs without a verdict in half and retrying them.
+
+    Returns (matches, clean) where clean is True when the first request answered for every
+    job, False when it failed for its size (cut off, rejected as invalid, unusable answer),
+    and None when it gave up on quota or timeouts, which says nothing about its size.
+    At most a single job that fails on its own is dropped, rather than the whole chunk.
+    """
+    result = analyze_chunk(model, chunk, label, instructions, descriptions, limiter, call_pool, verdict_cache, stats)
+    if result is None:
+        stats.record_dropped(len(chunk))
+        return [], None
+    matches, unresolved = result
+    if not unresolved:
+        return matches, True
+    if len(chunk) == 1:
+        print(f"🗑️ Dropping job after a failed request: {chunk[0].get('companyName')} - {chunk[0].get('positionName')}")
+        stats.record_dropped(1)
+        return matches, False
+
+    stats.record_bisected()
+    middle = max(1, len(unresolved) // 2)
+    for suffix, part in (("a", unresolved[:middle]), ("b", unresolved[middle:])):
+        if part:
+            part_matches, _ = analyze_with_bisection(
+                model, part, f"{label}{suffix}", instructions, descriptions, limiter, call_pool, verdict_cache, stats
+            )
+            matches.extend(part_matches)
+    return matches, False
+
+def load_batch_ref(store, ref):
+    """Streams a gzipped claim-check batch back from the store"""
+    started = time.perf_counter()
+    with store.open_read(ref) as raw, gzip.GzipFile(fileobj=raw) as unzipped:
+        jobs = json.load(unzipped)
+    print(f"📦 Loaded {len(jobs)} jobs from {ref} in {time.perf_counter() - started:.2f}s")
+    return jobs
+
+def analyze_job_batch(jobs, model=None):
+    """Analyzes a batch of job data and returns good matches.
+
+    Raises on fatal errors (secrets, model setup, ...) instead of returning no matches,
+    so the caller can nack the message or fail the task and the batch is retried.
+    """
+    try:
+        jobs_to_process = list(jobs)
+        
+        if not jobs_to_process:
+            print("Empty batch received.")
+            return []
+
+        print(f"🧠 AI Analyzer Job processing {len(jobs_to_process)} jobs.")
+
+        # Collapse URL variants and reposts before paying for them in Gemini calls
+        jobs_to_process = deduplicate_jobs(jobs_to_process, CHUNK_SIZE)
+        
+        resume_latex = get_resume_content()
+        if not resume_latex:
+            raise RuntimeError("Could not load resume from secret")
+
+        # Jobs judged before against this same resume skip the model entirely
+        verdict_cache = VerdictCache(resume_latex)
+        all_good_matches, jobs_to_process = verdict_cache.partition(jobs_to_process)
+        if not jobs_to_process:
+            print("✅ Every job in this batch has a cached verdict.")
+            return all_good_matches
+
+        # The LaTeX is reduced once per resume version; only the compact profile reaches the model
+        resume_profile = get_resume_profile(resume_latex)
+
+        # Clear rejects by title and similarity to the resume never reach the model
+        jobs_to_process, sample_weights = prefilter_jobs(jobs_to_process, resume_profile, CHUNK_SIZE)
+        verdict_cache.set_sample_weights(sample_weights)
+        if not jobs_to_process:
+            return all_good_matches
+
+        # Descriptions fetched here spare the model from visiting each URL itself
+        descriptions = {}
+        if JD_FETCH_ENABLED:
+            fetcher = JobDescriptionFetcher()
+            descriptions = fetcher.fetch_all(jobs_to_process)
+            fetcher.save()
+
+        instructions = build_instructions(resume_profile)
+        if model is None:
+            model, instructions = get_model(instructions, resume_fingerprint(resume_latex))
+        
+        # Fill each request up to the learned token budget rather than a fixed 5 jobs
+        packer = ChunkPacker()
+        job_chunks = packer.pack(jobs_to_process, estimate_tokens(build_prompt([], instructions)), descriptions)
+
+        # Chunks run concurrently; every model call goes through one shared, quota-adaptive limiter
+        limiter = get_rate_limiter()
+        stats = CallStats()
+        started = time.perf_counter()
+        report_first_work(started)
+        call_pool = get_call_pool()
+        with ThreadPoolExecutor(max_workers=GEMINI_CONCURRENCY) as chunk_pool:
+            chunk_results = chunk_pool.map(
+                lambda args: analyze_with_bisection(
+                    model, args[1], f"chunk {args[0] + 1}/{len(job_chunks)}", instructions, descriptions,
+                    limiter, call_pool, verdict_cache, stats
+                ),
+                enumerate(job_chunks)
+            )
+            for chunk, (chunk_matches, clean) in zip(job_chunks, chunk_results):
+                if clean is not None:
+                    packer.observe(chunk, clean)
+                all_good_matches.extend(chunk_matches)
+
+        print(f"⏱️ Analyzed {len(job_chunks)} chunks in {time.perf_counter() - started:.1f}s with concurrency {GEMINI_CONCURRENCY}")
+        stats.report()
+        packer.report(len(jobs_to_process), len(job_chunks), CHUNK_SIZE)
+        packer.save()
+        verdict_cache.save()
         return all_good_matches
 
     except Exception as e:
         print(f"❌ Fatal error in AI analysis: {e}")
-        traceback.print_exc()
-        return []
+        raise
+
+def log_matches(all_good_matches, sink, url_index, on_flushed=None):
+    """Drops matches already in the batch or the sheet and buffers the rest in the sink."""
+    # Held across the index check and add() so concurrent batches see each other's rows
+    with sink.lock:
+        unique_matches = check_against_existing_sheet_and_deduplicate(all_good_matches, url_index)
+        sink.add(unique_matches, on_flushed)
+    return unique_matches
+
+def run_worker(subscriber=None):
+    """Long-running mode: streaming pull from the scraped-urls subscription with warm clients.
+
+    subscriber defaults to a pubsub_v1.SubscriberClient; tests pass a stand-in.
+    """
+    from google.cloud import pubsub_v1
+    from google.cloud.pubsub_v1.subscriber.scheduler import ThreadScheduler
+
+    sheet_id = get_sheet_id()
+    sheet = get_applications_sheet(sheet_id)
+    url_index = UrlIndex(sheet_id)
+    url_index.sync(sheet)
+    sink = SheetSink(sheet, url_index)
+
+    def handle_message(message):
+        try:
+            jobs = json.loads(message.data.decode("utf-8")).get("jobs", [])
+        except (ValueError, AttributeError) as e:
+            print(f"❌ Message {message.message_id}: Could not parse payload: {e}")
+            message.ack()
+            return
+        print(f"📥 Message {message.message_id}: {len(jobs)} jobs")
+        try:
+            matches = analyze_job_batch(jobs)
+            # Acked only once its rows are in the sheet; until then the subscriber keeps extending the lease
+            log_matches(matches, sink, url_index, on_flushed=message.ack)
+        except Exception as e:
+            print(f"❌ Message {message.message_id}: {e}")
+            traceback.print_exc()
+            message.nack()
+
+    def flush_periodically():
+        while True:
+            time.sleep(WORKER_FLUSH_SECONDS)
+            try:
+                sink.flush()
+            except Exception as e:
+                print(f"⚠️ Periodic sheet flush failed, rows stay buffered: {e}")
+                continue
+            with sink.lock:
+                url_index.save()
+
+    threading.Thread(target=flush_periodically, daemon=True).start()
+
+    subscriber = subscriber or pubsub_v1.SubscriberClient()
+    subscription_path = subscriber.subscription_path(GCP_PROJECT_ID, ANALYZER_SUBSCRIPTION)
+    streaming_pull = subscriber.subscribe(
+        subscription_path,
+        callback=handle_message,
+        flow_control=pubsub_v1.types.FlowControl(max_messages=WORKER_MAX_MESSAGES),
+        scheduler=ThreadScheduler(ThreadPoolExecutor(max_workers=WORKER_MAX_MESSAGES)),
+    )
+    print(f"👷 Worker listening on {subscription_path} ({WORKER_MAX_MESSAGES} messages at a time)")
+    try:
+        streaming_pull.result()
+    except KeyboardInterrupt:
+        streaming_pull.cancel()
+        streaming_pull.result()
+    finally:
+        sink.flush()
+        url_index.save()
+        subscriber.close()
 
 def main():
     parser = argparse.ArgumentParser(description='AI Job Analyzer')
-    parser.add_argument('--jobs-json', required=True, help='JSON string of job data to analyze')
+    parser.add_argument('--jobs-json', help='JSON string of job data to analyze')
+    parser.add_argument('--jobs-ref', help='Key of a gzipped JSON batch in BATCH_STORE_URI (claim-check)')
     parser.add_argument('--batch-id', default='unknown', help='Batch identifier for logging')
+    parser.add_argument('--prefilter-report', action='store_true',
+                        help='Score the pre-filter against recorded Gemini verdicts and exit')
+    parser.add_argument('--worker', action='store_true',
+                        help='Run as a long-lived streaming-pull worker on ANALYZER_SUBSCRIPTION')
     
     args = parser.parse_args()
+
+    if args.prefilter_report:
+        resume_latex = get_resume_content()
+        prefilter_report(VerdictCache(resume_latex).recorded_verdicts(), get_resume_profile(resume_latex))
+        return
+    if args.worker:
+        run_worker()
+        return
+    if args.jobs_json is None and args.jobs_ref is None:
+        parser.error("--jobs-json or --jobs-ref is required")
     
     print(f"🚀 Starting AI Analyzer Job (Batch: {args.batch_id})")
     
+    # A batch that cannot be read fails the task, so it is retried and the stored batch is kept
+    batch_store = None
+    if args.jobs_ref:
+        batch_store = get_blob_store(BATCH_STORE_URI)
+        if batch_store is None:
+            print("❌ --jobs-ref given but BATCH_STORE_URI is not set.")
+            sys.exit(1)
+        try:
+            jobs = load_batch_ref(batch_store, args.jobs_ref)
+        except Exception as e:
+            print(f"❌ Could not load batch {args.jobs_ref}: {e}")
+            sys.exit(1)
+    else:
+        try:
+            jobs = json.loads(args.jobs_json)
+        except json.JSONDecodeError as e:
+            print(f"❌ Could not parse --jobs-json: {e}")
+            sys.exit(1)
+
     # Analyze the jobs
-    all_good_matches = analyze_job_batch(args.jobs_json)
+    try:
+        all_good_matches = analyze_job_batch(jobs)
+    except Exception:
+        traceback.print_exc()
+        # The claim-check batch is still stored, so a retried task analyzes it again
+        print(f"❌ AI Analyzer Job failed (Batch: {args.batch_id})")
+        sys.exit(1)
     
     if all_good_matches:
         print(f"\n🔍 Found {len(all_good_matches)} matches. Processing deduplication...")
         
         sheet_id = get_sheet_id()
-        unique_matches = check_against_existing_sheet_and_deduplicate(all_good_matches, sheet_id)
+        sheet = get_applications_sheet(sheet_id)
+        url_index = UrlIndex(sheet_id)
+        try:
+            url_index.sync(sheet)
+        except Exception as e:
+            print(f"⚠️ Error syncing URL index with the sheet: {e}")
+        # One append request for all rows; the server picks the rows, so concurrent runs cannot collide
+        sink = SheetSink(sheet, url_index)
+        unique_matches = log_matches(all_good_matches, sink, url_index)
         
         if unique_matches:
             print(f"\n✅ After deduplication: {len(unique_matches)} unique jobs. Logging to Google Sheet...")
-            
-            creds, _ = default(scopes=["https://www.googleapis.com/auth/spreadsheets"])
-            sa = gspread.authorize(creds)
-            
-            sheet = sa.open_by_key(sheet_id).worksheet("applications")
-            
-            rows_to_add = []
-            for job in unique_matches:
-                rows_to_add.append([
-                    job.get("companyName"),
-                    job.get("positionName"),
-                    "applying",
-                    job.get("url"),
-                    datetime.now().strftime("%Y-%m-%d"),
-                    "Scraped from JobRight, needs review."
-                ])
-            
-            if rows_to_add:
-                # Get the starting row number
-                all_values = sheet.get_all_values()
-                start_row = len(all_values) + 1
-                end_row = start_row + len(unique_matches) - 1
-
-                # Prepare data for columns A-D
-                main_data = []
-                date_notes_data = []
-
-                for job in unique_matches:
-                    main_data.append([
-                        job.get("companyName"),
-                        job.get("positionName"),
-                        "applying", 
-                        job.get("url")
-                    ])
-
-                    date_notes_data.append([
-                        datetime.now().strftime("%Y-%m-%d"),
-                        "Scraped from JobRight, needs review."
-                    ])
-
-                # Batch update - columns A-D
-                sheet.update(f'A{start_row}:D{end_row}', main_data)
-
-                # Batch update - columns F-G (skipping E for relevant contacts)
-                sheet.update(f'F{start_row}:G{end_row}', date_notes_data)
-
-                print(f"📝 Successfully logged {len(unique_matches)} unique jobs to Google Sheet.")
+            sink.flush()
+            print(f"📝 Successfully logged {sink.rows_written} unique jobs to Google Sheet.")
         else:
             print("\n❌ No unique matches remaining after deduplication.")
+        url_index.save()
     else:
         print("\n❌ No good matches found in any chunks.")
     
+    if batch_store is not None:
+        batch_store.delete(args.jobs_ref)  # Kept until here so a retried task can still read it
+
     print(f"✅ AI Analyzer Job completed (Batch: {args.batch_id})")
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+import threading
+
+
+class CallStats:
+    """Token usage and latency of the Gemini calls made for one batch"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.latencies = []
+        self.wasted_calls = 0
+        self.salvaged_calls = 0
+        self.bisected_chunks = 0
+        self.dropped_jobs = 0
+
+    def record(self, response, latency, label):
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+        with self.lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            self.output_tokens += output_tokens
+            self.latencies.append(latency)
+        print(f"📊 {label}: {prompt_tokens} prompt tokens ({cached_tokens} cached), "
+              f"{output_tokens} output tokens, {latency:.1f}s")
+
+    def record_wasted(self):
+        """A call whose answer could not be used at all"""
+        with self.lock:
+            self.wasted_calls += 1
+
+    def record_salvaged(self):
+        """A call whose answer was cut off but partly parsed"""
+        with self.lock:
+            self.salvaged_calls += 1
+
+    def record_bisected(self):
+        with self.lock:
+            self.bisected_chunks += 1
+
+    def record_dropped(self, jobs):
+        with self.lock:
+            self.dropped_jobs += jobs
+
+    def report(self):
+        if not self.calls:
+            return
+        latencies = sorted(self.latencies)
+        median = latencies[len(latencies) // 2]
+        print(f"📊 Gemini usage: {self.calls} calls, {self.prompt_tokens} prompt tokens "
+              f"({self.cached_tokens} cached, {self.prompt_tokens // self.calls} per call), "
+              f"{self.output_tokens} output tokens, median latency {median:.1f}s, max {latencies[-1]:.1f}s")
+        print(f"📊 Failures: {self.wasted_calls} wasted calls, {self.salvaged_calls} salvaged, "
+              f"{self.bisected_chunks} chunks bisected, {self.dropped_jobs} jobs dropped")
@@ -0,0 +1,96 @@
+import os
+import re
+import math
+import hashlib
+from canonical_url import canonicalize_url
+
+# --- Configuration ---
+# Estimated Jaccard similarity of two titles at one company above which they count as the same posting
+NEAR_DUP_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", 0.8))
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME | 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME)
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+
+def normalize_text(text):
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).strip()
+
+
+def title_shingles(title):
+    """Word unigrams and bigrams: 'Engineer I' and 'Engineer II' stay apart, punctuation changes do not"""
+    words = normalize_text(title).split()
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(shingles):
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimated_similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of company + title pairs for catching reposts under new URLs"""
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD):
+        self.threshold = threshold
+        self.rows_per_band = MINHASH_PERMUTATIONS // LSH_BANDS
+        self.buckets = {}
+
+    def find_or_add(self, company, title):
+        """Return the (company, title) this pair duplicates, or add it and return None"""
+        signature = minhash(title_shingles(title))
+        if signature is None:
+            return None
+        company_key = normalize_text(company)
+        band_keys = [
+            (company_key, band, signature[band * self.rows_per_band:(band + 1) * self.rows_per_band])
+            for band in range(LSH_BANDS)
+        ]
+
+        candidates = {c for key in band_keys for c in self.buckets.get(key, [])}
+        for other_signature, original in candidates:
+            if estimated_similarity(signature, other_signature) >= self.threshold:
+                return original
+
+        for key in band_keys:
+            self.buckets.setdefault(key, []).append((signature, (company, title)))
+        return None
+
+
+def deduplicate_jobs(jobs, chunk_size):
+    """Drop exact (canonical URL) and near (company + title) duplicates and report the LLM calls saved"""
+    seen_urls = set()
+    near_index = NearDuplicateIndex()
+    unique_jobs = []
+    exact_dups = near_dups = 0
+
+    for job in jobs:
+        canonical = canonicalize_url(job.get("url"))
+        if not canonical or canonical in seen_urls:
+            exact_dups += 1
+            print(f"🗑️ Same posting as an earlier URL: {job.get('companyName')} - {job.get('positionName')}")
+            continue
+        original = near_index.find_or_add(job.get("companyName"), job.get("positionName"))
+        if original:
+            near_dups += 1
+            print(f"🗑️ Near-duplicate of {original[0]} - {original[1]}: {job.get('companyName')} - {job.get('positionName')}")
+            continue
+        seen_urls.add(canonical)
+        unique_jobs.append(job)
+
+    calls_before = math.ceil(len(jobs) / chunk_size)
+    calls_after = math.ceil(len(unique_jobs) / chunk_size)
+    print(f"🧹 Canonical dedup: {len(jobs)} → {len(unique_jobs)} jobs "
+          f"({exact_dups} same URL, {near_dups} near-duplicates), saved {calls_before - calls_after} Gemini calls")
+    return unique_jobs
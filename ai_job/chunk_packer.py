@@ -0,0 +1,102 @@
+import os
+import json
+import math
+from resume_profile import estimate_tokens
+from state_files import StateFile
+
+# --- Configuration ---
+# Upper bound on estimated prompt tokens per Gemini request
+GEMINI_CHUNK_TOKEN_BUDGET = int(os.environ.get("GEMINI_CHUNK_TOKEN_BUDGET", 12000))
+GEMINI_MIN_CHUNK_TOKEN_BUDGET = int(os.environ.get("GEMINI_MIN_CHUNK_TOKEN_BUDGET", 2000))
+# More jobs than this per request risks truncating the answer, whatever their size
+GEMINI_MAX_JOBS_PER_CHUNK = int(os.environ.get("GEMINI_MAX_JOBS_PER_CHUNK", 20))
+# Learned token budget, a one-key JSON file
+CHUNK_PACKER_STATE_PATH = os.environ.get("CHUNK_PACKER_STATE_PATH", "/tmp/jobscout-chunk-packer.json")
+SHRINK_FACTOR = 0.7
+GROW_FACTOR = 1.05
+
+
+class ChunkPacker:
+    """Fills each Gemini request up to a token budget instead of a fixed job count.
+
+    The budget is learned: a request that failed for its size (truncated, rejected as
+    invalid, unusable answer) shrinks it below that request's size, and successful requests
+    near the budget let it creep back up. Quota and timeout failures say nothing about size
+    and are not observed. The budget is kept in the analyzer state store so the next
+    execution starts from what worked.
+    """
+
+    def __init__(self, state_path=CHUNK_PACKER_STATE_PATH, max_budget=GEMINI_CHUNK_TOKEN_BUDGET,
+                 min_budget=GEMINI_MIN_CHUNK_TOKEN_BUDGET, max_jobs=GEMINI_MAX_JOBS_PER_CHUNK, state_file=None):
+        self.state_path = state_path
+        self.state_file = state_file or StateFile(state_path)
+        self.state_file.restore()
+        self.max_budget = max_budget
+        self.min_budget = min_budget
+        self.max_jobs = max_jobs
+        self.budget = max_budget
+        self.descriptions = {}
+        self.fixed_tokens = 0
+        self.failures = 0
+        self.successes = 0
+        try:
+            with open(state_path) as f:
+                self.budget = json.load(f).get("budget", max_budget)
+        except (OSError, ValueError):
+            pass
+        self.budget = max(min_budget, min(max_budget, self.budget))
+
+    def job_tokens(self, job):
+        description = self.descriptions.get(job.get("url"))
+        payload = dict(job, description=description) if description else job
+        return estimate_tokens(json.dumps(payload)) + 1
+
+    def chunk_tokens(self, chunk):
+        return self.fixed_tokens + sum(self.job_tokens(job) for job in chunk)
+
+    def pack(self, jobs, fixed_tokens, descriptions=None):
+        """Greedily fills chunks in order; a job larger than the budget gets a chunk of its own"""
+        self.fixed_tokens = fixed_tokens
+        self.descriptions = descriptions or {}
+        chunks, current, current_tokens = [], [], fixed_tokens
+        for job in jobs:
+            tokens = self.job_tokens(job)
+            if current and (current_tokens + tokens > self.budget or len(current) >= self.max_jobs):
+                chunks.append(current)
+                current, current_tokens = [], fixed_tokens
+            current.append(job)
+            current_tokens += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def observe(self, chunk, succeeded):
+        """Learn from one request's outcome; succeeded=False only for size-related failures"""
+        tokens = self.chunk_tokens(chunk)
+        if succeeded:
+            self.successes += 1
+            if tokens >= self.budget * 0.8:
+                self.budget = min(self.max_budget, int(self.budget * GROW_FACTOR))
+        else:
+            self.failures += 1
+            if len(chunk) > 1:
+                self.budget = max(self.min_budget, int(min(self.budget, tokens) * SHRINK_FACTOR))
+                print(f"📦 Request of ~{tokens} tokens failed, chunk token budget lowered to {self.budget}")
+
+    def report(self, jobs_count, chunks_count, fixed_chunk_size):
+        total = self.successes + self.failures
+        failure_rate = self.failures / total * 100 if total else 0
+        print(f"📦 Packed {jobs_count} jobs into {chunks_count} requests "
+              f"(fixed chunks of {fixed_chunk_size} would need {math.ceil(jobs_count / fixed_chunk_size)}), "
+              f"{self.failures} failed ({failure_rate:.0f}%), next budget {self.budget} tokens")
+
+    def save(self):
+        try:
+            tmp_path = f"{self.state_path}.tmp-{os.getpid()}-{id(self)}"  # Concurrent batches in worker mode
+            with open(tmp_path, "w") as f:
+                json.dump({"budget": self.budget}, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            print(f"⚠️ Could not save chunk packer state: {e}")
+            return
+        self.state_file.save()
@@ -0,0 +1,87 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Configuration ---
+GCP_PROJECT_ID = os.environ.get("GCLOUD_PROJECT")
+SECRET_CACHE_PATH = os.environ.get("SECRET_CACHE_PATH", "/tmp/jobscout-secrets.json")
+SECRET_CACHE_TTL_SECONDS = int(os.environ.get("SECRET_CACHE_TTL_SECONDS", 3600))
+
+# Config name -> (environment variable, Secret Manager secret id)
+SECRETS = {
+    "gemini_api_key": ("GEMINI_API_KEY", "gemini-api-key"),
+    "resume_latex": ("RESUME_LATEX", "resume-latex"),
+    "sheet_id": ("GOOGLE_SHEET_ID", "google-sheet-id"),
+}
+
+CONFIG = None
+
+
+def read_secret_cache():
+    try:
+        with open(SECRET_CACHE_PATH) as f:
+            cached = json.load(f)
+        if time.time() - cached.get("saved_at", 0) < SECRET_CACHE_TTL_SECONDS:
+            return cached.get("values", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def write_secret_cache(values):
+    try:
+        tmp_path = f"{SECRET_CACHE_PATH}.tmp"
+        # Owner-only: the cache holds the API key
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"saved_at": time.time(), "values": values}, f)
+        os.replace(tmp_path, SECRET_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not cache secrets: {e}")
+
+
+def fetch_secrets(secret_ids):
+    """Reads several secrets concurrently through one Secret Manager client"""
+    from google.cloud import secretmanager
+
+    client = secretmanager.SecretManagerServiceClient()
+
+    def access(secret_id):
+        name = f"projects/{GCP_PROJECT_ID}/secrets/{secret_id}/versions/latest"
+        return client.access_secret_version(name=name).payload.data.decode("UTF-8").strip()
+
+    with ThreadPoolExecutor(max_workers=len(secret_ids)) as pool:
+        return dict(zip(secret_ids, pool.map(access, secret_ids)))
+
+
+def get_config():
+    """Loads every secret once per process: environment first, then the disk cache, then Secret Manager"""
+    global CONFIG
+    if CONFIG is not None:
+        return CONFIG
+
+    started = time.perf_counter()
+    config = {name: os.environ.get(env_var, "").strip() for name, (env_var, _) in SECRETS.items()}
+    sources = {name: "env" for name, value in config.items() if value}
+
+    missing = [name for name, value in config.items() if not value]
+    if missing:
+        cached = read_secret_cache()
+        for name in missing:
+            if cached.get(name):
+                config[name] = cached[name]
+                sources[name] = "cache"
+
+    missing = [name for name, value in config.items() if not value]
+    if missing:
+        fetched = fetch_secrets([SECRETS[name][1] for name in missing])
+        for name in missing:
+            config[name] = fetched[SECRETS[name][1]]
+            sources[name] = "secret manager"
+        write_secret_cache({name: config[name] for name in missing})
+
+    summary = ", ".join(f"{name} from {source}" for name, source in sources.items())
+    print(f"🔐 Loaded config in {time.perf_counter() - started:.2f}s ({summary})")
+    CONFIG = config
+    return CONFIG
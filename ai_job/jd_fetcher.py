@@ -0,0 +1,204 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+import multiprocessing
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from state_files import StateFile
+
+# --- Configuration ---
+JD_FETCH_ENABLED = os.environ.get("JD_FETCH_ENABLED", "true").lower() == "true"
+JD_FETCH_WORKERS = int(os.environ.get("JD_FETCH_WORKERS", 16))
+JD_PER_HOST_LIMIT = int(os.environ.get("JD_PER_HOST_LIMIT", 2))
+JD_FETCH_TIMEOUT = float(os.environ.get("JD_FETCH_TIMEOUT", 15))
+JD_PARSE_PROCESSES = int(os.environ.get("JD_PARSE_PROCESSES", os.cpu_count() or 1))
+JD_MAX_CHARS = int(os.environ.get("JD_MAX_CHARS", 4000))
+# Pages rendered client-side yield almost no text; those are left for the model to visit
+JD_MIN_CHARS = int(os.environ.get("JD_MIN_CHARS", 200))
+# SQLite table of page validators (ETag/Last-Modified) and the text extracted from each page
+JD_CACHE_PATH = os.environ.get("JD_CACHE_PATH", "/tmp/jobscout-jd-cache.sqlite3")
+# Parser processes must not be forked from a worker running gRPC streaming-pull threads,
+# which can leave a child holding a lock that no thread will ever release
+JD_PARSE_START_METHOD = "forkserver"
+
+SKIP_TAGS = {"script", "style", "noscript", "svg", "head", "nav", "footer", "form", "iframe"}
+BLOCK_TAGS = {"p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "tr", "section", "article"}
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    """Visible text of an HTML page, one block per line. Runs in a worker process."""
+    extractor = TextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:
+        pass  # Keep whatever was extracted before the markup broke
+    lines = (re.sub(r"\s+", " ", line).strip() for line in "".join(extractor.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class JobDescriptionFetcher:
+    """Downloads job pages concurrently and turns them into plain-text descriptions.
+
+    Connections are pooled, each host gets at most a few requests at a time, and
+    responses are revalidated with ETag/Last-Modified so unchanged postings cost a 304.
+    The page cache is kept in the analyzer state store, so revalidation also works for
+    pages fetched by earlier executions.
+    """
+
+    def __init__(self, cache_path=JD_CACHE_PATH, workers=JD_FETCH_WORKERS, per_host_limit=JD_PER_HOST_LIMIT,
+                 timeout=JD_FETCH_TIMEOUT, parse_processes=JD_PARSE_PROCESSES, state_file=None):
+        self.workers = workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.parse_processes = parse_processes
+        self.session = self.build_session()
+        self.host_slots = {}
+        self.host_lock = threading.Lock()
+        self.state_file = state_file or StateFile(cache_path)
+        self.state_file.restore()
+        self.conn = sqlite3.connect(cache_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, text TEXT, fetched_at REAL)"
+        )
+        self.conn.commit()
+
+    def build_session(self):
+        """Create a pooled requests session with retries on transient errors"""
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.per_host_limit, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Accept": "text/html,application/xhtml+xml",
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
+        })
+        return session
+
+    def host_slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self.host_lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self.host_slots[host]
+
+    def fetch(self, url, cached):
+        """Returns (status, html, etag, last_modified) with status fetched, not_modified or failed"""
+        headers = {}
+        if cached:
+            if cached[0]:
+                headers["If-None-Match"] = cached[0]
+            if cached[1]:
+                headers["If-Modified-Since"] = cached[1]
+        try:
+            with self.host_slot(url):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and cached:
+                return "not_modified", None, cached[0], cached[1]
+            if response.status_code != 200 or "html" not in response.headers.get("Content-Type", "html"):
+                return "failed", None, None, None
+            return "fetched", response.text, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        except requests.RequestException as e:
+            print(f"⚠️ Could not fetch job description from {url}: {type(e).__name__}")
+            return "failed", None, None, None
+
+    def merge(self, remote_path):
+        """Fold in pages another execution saved, keeping the more recently fetched copy"""
+        self.conn.execute("ATTACH DATABASE ? AS remote", (remote_path,))
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages SELECT r.* FROM remote.pages r "
+                "LEFT JOIN pages l ON l.url = r.url WHERE l.url IS NULL OR r.fetched_at > l.fetched_at"
+            )
+            self.conn.commit()
+        finally:
+            self.conn.execute("DETACH DATABASE remote")
+
+    def save(self):
+        self.state_file.save(merge=self.merge)
+
+    def load_cached(self, urls):
+        cached = {}
+        for url in urls:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, text FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row:
+                cached[url] = row
+        return cached
+
+    def fetch_all(self, jobs):
+        """Returns {url: description text} for every job page that yielded a usable description"""
+        urls = list(dict.fromkeys(job.get("url") for job in jobs if job.get("url")))
+        if not urls:
+            return {}
+        started = time.perf_counter()
+        cached = self.load_cached(urls)
+        descriptions, updates = {}, []
+        counts = {"fetched": 0, "not_modified": 0, "failed": 0}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as fetch_pool, \
+                ProcessPoolExecutor(max_workers=self.parse_processes,
+                                    mp_context=multiprocessing.get_context(JD_PARSE_START_METHOD)) as parse_pool:
+            fetches = {fetch_pool.submit(self.fetch, url, cached.get(url)): url for url in urls}
+            parses = {}
+            # Pages are handed to the parser processes as soon as they arrive
+            for future in as_completed(fetches):
+                url = fetches[future]
+                status, html, etag, last_modified = future.result()
+                counts[status] += 1
+                if status == "not_modified":
+                    descriptions[url] = cached[url][2]
+                elif status == "fetched":
+                    parses[parse_pool.submit(html_to_text, html)] = (url, etag, last_modified)
+
+            for future in as_completed(parses):
+                url, etag, last_modified = parses[future]
+                try:
+                    text = future.result()[:JD_MAX_CHARS]
+                except Exception as e:
+                    print(f"⚠️ Could not extract text from {url}: {e}")
+                    continue
+                descriptions[url] = text
+                if etag or last_modified:
+                    updates.append((url, etag, last_modified, text, time.time()))
+
+        if updates:
+            self.conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", updates)
+            self.conn.commit()
+
+        descriptions = {url: text for url, text in descriptions.items() if text and len(text) >= JD_MIN_CHARS}
+        print(f"📥 Job descriptions: {len(descriptions)}/{len(urls)} usable ({counts['fetched']} fetched, "
+              f"{counts['not_modified']} not modified, {counts['failed']} failed) in {time.perf_counter() - started:.1f}s")
+        return descriptions
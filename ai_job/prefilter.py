@@ -0,0 +1,126 @@
+import os
+import re
+import math
+import random
+from canonical import normalize_text
+from canonical_url import canonicalize_url
+
+# --- Configuration ---
+PREFILTER_ENABLED = os.environ.get("PREFILTER_ENABLED", "true").lower() == "true"
+# Titles matching this are rejected outright (the prompt's hard rules: new-grad SWE, no data/ML/analyst roles)
+PREFILTER_EXCLUDE_TITLES = os.environ.get(
+    "PREFILTER_EXCLUDE_TITLES",
+    r"\b(data engineer(ing)?|machine learning|ml|ai/ml|data scien(ce|tist)|data analyst|analyst|"
+    r"senior|sr|staff|principal|lead|manager|director|head of|architect|iii|iv)\b",
+)
+# Titles matching this are always kept as plausible
+PREFILTER_ROLE_TITLES = os.environ.get(
+    "PREFILTER_ROLE_TITLES",
+    r"\b(software|developer|swe|sde|programmer|full ?stack|back ?end|front ?end|web|mobile|platform|application)\b",
+)
+# Other titles are kept only when their TF-IDF similarity to the resume reaches this (borderline)
+PREFILTER_MIN_SIMILARITY = float(os.environ.get("PREFILTER_MIN_SIMILARITY", 0.05))
+# Share of rejected jobs sent to Gemini anyway, so the report can measure what the filter throws away
+PREFILTER_AUDIT_RATE = float(os.environ.get("PREFILTER_AUDIT_RATE", 0.05))
+
+EXCLUDE_RE = re.compile(PREFILTER_EXCLUDE_TITLES, re.IGNORECASE)
+ROLE_RE = re.compile(PREFILTER_ROLE_TITLES, re.IGNORECASE)
+
+
+def tfidf_similarities(documents, reference):
+    """Cosine similarity of each document to the reference text over a shared TF-IDF space"""
+    import numpy as np  # Imported on first use to keep it off the startup path
+
+    tokenized = [normalize_text(d).split() for d in documents]
+    reference_tokens = normalize_text(reference).split()
+    vocabulary = {}
+    for tokens in tokenized + [reference_tokens]:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+    if not vocabulary:
+        return np.zeros(len(documents))
+
+    counts = np.zeros((len(tokenized) + 1, len(vocabulary)))
+    for row, tokens in enumerate(tokenized + [reference_tokens]):
+        np.add.at(counts[row], [vocabulary[t] for t in tokens], 1)
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+    weights = counts * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    weights = np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+    return weights[:-1] @ weights[-1]
+
+
+def score_jobs(jobs, resume_profile):
+    """Returns a (keep, reason, similarity) triple per job"""
+    titles = [job.get("positionName") or "" for job in jobs]
+    similarities = tfidf_similarities(titles, resume_profile)
+    results = []
+    for title, similarity in zip(titles, similarities):
+        if EXCLUDE_RE.search(title):
+            results.append((False, "excluded title", similarity))
+        elif ROLE_RE.search(title):
+            results.append((True, "role title", similarity))
+        elif similarity >= PREFILTER_MIN_SIMILARITY:
+            results.append((True, "borderline", similarity))
+        else:
+            results.append((False, "low similarity", similarity))
+    return results
+
+
+def prefilter_jobs(jobs, resume_profile, chunk_size, audit_rate=PREFILTER_AUDIT_RATE):
+    """Drops clear rejects before the model; plausible and borderline jobs pass through.
+
+    Returns (jobs_for_the_model, sample_weights). A random audit_rate share of rejects is
+    kept as an audit sample; sample_weights maps their canonical URLs to 1 / audit_rate so
+    the verdicts recorded for them stand in for all the rejects that were not sent.
+    """
+    if not PREFILTER_ENABLED or not jobs:
+        return jobs, {}
+    kept, audited, reasons = [], [], {}
+    for job, (keep, reason, similarity) in zip(jobs, score_jobs(jobs, resume_profile)):
+        reasons[reason] = reasons.get(reason, 0) + 1
+        if keep:
+            kept.append(job)
+        elif audit_rate > 0 and random.random() < audit_rate:
+            audited.append(job)
+            print(f"🎲 Pre-filter audit ({reason}), sending anyway: {job.get('companyName')} - {job.get('positionName')}")
+        else:
+            print(f"🚫 Pre-filter ({reason}, similarity {similarity:.2f}): {job.get('companyName')} - {job.get('positionName')}")
+
+    saved_calls = math.ceil(len(jobs) / chunk_size) - math.ceil((len(kept) + len(audited)) / chunk_size)
+    breakdown = ", ".join(f"{count} {reason}" for reason, count in sorted(reasons.items()))
+    print(f"🔎 Pre-filter: {len(jobs)} → {len(kept)} jobs ({breakdown}), {len(audited)} rejects audited, "
+          f"saved {saved_calls} Gemini calls")
+    weights = {canonicalize_url(job.get("url", "")): 1 / audit_rate for job in audited}
+    return kept + audited, weights
+
+
+def prefilter_report(verdicts, resume_profile):
+    """Precision and recall of the pre-filter's keep decision against recorded Gemini verdicts.
+
+    verdicts are (job, is_match, weight) triples. Jobs the filter rejected only reach Gemini
+    through the audit sample (or in runs with the filter off), so each verdict is weighted by
+    the inverse of its chance of being sent; unweighted, recall would always look perfect.
+    """
+    if not verdicts:
+        print("No recorded Gemini verdicts to evaluate the pre-filter against.")
+        return
+    jobs = [job for job, _, _ in verdicts]
+    kept = [keep for keep, _, _ in score_jobs(jobs, resume_profile)]
+    true_pos = sum(w for k, (_, match, w) in zip(kept, verdicts) if k and match)
+    false_pos = sum(w for k, (_, match, w) in zip(kept, verdicts) if k and not match)
+    false_neg = sum(w for k, (_, match, w) in zip(kept, verdicts) if not k and match)
+    precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 0
+    recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1
+    rejected = len(kept) - sum(kept)
+
+    print(f"🔎 Pre-filter vs {len(verdicts)} Gemini verdicts: precision {precision:.2%}, recall {recall:.2%} "
+          f"({sum(kept)} kept, {rejected} rejected, {sum(1 for _, _, w in verdicts if w > 1)} from the audit sample)")
+    if rejected == 0:
+        print("   ⚠️ No verdicts for jobs the filter rejects, so recall cannot be measured yet. "
+              "Raise PREFILTER_AUDIT_RATE or run with PREFILTER_ENABLED=false for a while.")
+    for keep, (job, match, _) in zip(kept, verdicts):
+        if match and not keep:
+            print(f"   ❗ Would have rejected a match: {job.get('companyName')} - {job.get('positionName')}")
@@ -0,0 +1,60 @@
+import os
+import time
+import random
+import threading
+
+# --- Configuration ---
+GEMINI_RATE_PER_MINUTE = float(os.environ.get("GEMINI_RATE_PER_MINUTE", 10))
+GEMINI_MIN_RATE_PER_MINUTE = float(os.environ.get("GEMINI_MIN_RATE_PER_MINUTE", 1))
+GEMINI_MAX_RATE_PER_MINUTE = float(os.environ.get("GEMINI_MAX_RATE_PER_MINUTE", 60))
+BACKOFF_BASE_SECONDS = float(os.environ.get("BACKOFF_BASE_SECONDS", 2))
+BACKOFF_MAX_SECONDS = float(os.environ.get("BACKOFF_MAX_SECONDS", 60))
+
+
+class AdaptiveRateLimiter:
+    """Token bucket shared by all Gemini calls that adapts its rate to the quota.
+
+    Every call takes a token. A 429 halves the refill rate; each success adds back a
+    small step (AIMD), so concurrent chunks converge on what the quota allows.
+    """
+
+    def __init__(self, rate_per_minute=GEMINI_RATE_PER_MINUTE, min_rate=GEMINI_MIN_RATE_PER_MINUTE,
+                 max_rate=GEMINI_MAX_RATE_PER_MINUTE, burst=None):
+        self.rate = rate_per_minute / 60
+        self.min_rate = min_rate / 60
+        self.max_rate = max_rate / 60
+        self.capacity = burst or max(1, int(rate_per_minute // 6))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill_locked(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                self.refill_locked()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+    def on_throttle(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+            print(f"🐢 Rate limit hit, slowing Gemini calls to {self.rate * 60:.1f}/min")
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS):
+    """Exponential backoff with full jitter for the given 1-based attempt"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,65 @@
+import re
+import json
+
+# Passed as response_schema so the model is constrained to this shape
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "good_matches": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "companyName": {"type": "STRING"},
+                    "positionName": {"type": "STRING"},
+                    "url": {"type": "STRING"},
+                },
+                "required": ["url"],
+            },
+        },
+    },
+    "required": ["good_matches"],
+}
+
+DECODER = json.JSONDecoder()
+SEPARATORS = re.compile(r"[\s,]*")
+
+
+def parse_good_matches(text):
+    """Parse the model's answer into (matches, complete).
+
+    Tolerates code fences, prose around the JSON and a bare array. When the answer
+    was cut off mid-array, the matches decoded before the cut are returned with
+    complete=False. Raises ValueError when nothing usable is found.
+    """
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", (text or "").strip())
+    if not text:
+        raise ValueError("empty response")
+
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start != -1:
+        try:
+            result, _ = DECODER.raw_decode(text, start)
+            if isinstance(result, dict) and isinstance(result.get("good_matches"), list):
+                return [m for m in result["good_matches"] if isinstance(m, dict)], True
+            if isinstance(result, list):
+                return [m for m in result if isinstance(m, dict)], True
+        except ValueError:
+            pass
+
+    # Salvage the complete objects of a truncated "good_matches" array
+    key = text.find('"good_matches"')
+    bracket = text.find("[", key) if key != -1 else -1
+    if bracket == -1:
+        raise ValueError("no good_matches array in response")
+    matches, pos = [], bracket + 1
+    while True:
+        pos = SEPARATORS.match(text, pos).end()
+        if pos < len(text) and text[pos] == "]":
+            return matches, True
+        try:
+            match, pos = DECODER.raw_decode(text, pos)
+        except ValueError:
+            return matches, False
+        if isinstance(match, dict):
+            matches.append(match)
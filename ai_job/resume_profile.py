@@ -0,0 +1,90 @@
+import os
+import re
+import json
+from verdict_cache import resume_fingerprint
+
+# --- Configuration ---
+RESUME_PROFILE_PATH = os.environ.get("RESUME_PROFILE_PATH", "/tmp/jobscout-resume-profile.json")
+
+# Layout-only commands whose arguments carry no content
+LAYOUT_COMMANDS = (
+    "vspace", "hspace", "setlength", "addtolength", "usepackage", "documentclass", "pagestyle",
+    "fancyhf", "titleformat", "newcommand", "renewcommand", "color", "definecolor", "input",
+    "titlespacing", "setlist", "hypersetup", "geometry", "pagenumbering", "extracolsep",
+)
+# A {...} argument that may contain one level of nested braces
+BRACED = r"\{(?:[^{}]|\{[^{}]*\})*\}"
+# A command with its [options] and {arguments}
+COMMAND_WITH_ARGS = re.compile(r"\\[a-zA-Z]+\*?((?:\s*(?:\[[^\]]*\]|%s))*)" % BRACED)
+# Arguments that are key=value option lists (leftmargin=0pt, colorlinks=true, ...)
+OPTION_LIST = re.compile(r"[\[{]\s*[A-Za-z-]+\s*=")
+LATEX_ESCAPES = {r"\&": "&", r"\%": "%", r"\$": "$", r"\_": "_", r"\#": "#", r"\{": "(", r"\}": ")", "~": " "}
+
+PROFILE_CACHE = {}
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token) for before/after reporting"""
+    return len(text) // 4
+
+
+def latex_to_profile(resume_latex):
+    """Strips a LaTeX resume down to plain section headings, entries and bullet points"""
+    body = resume_latex
+    if r"\begin{document}" in body:
+        body = body.split(r"\begin{document}", 1)[1]
+    body = body.split(r"\end{document}", 1)[0]
+
+    body = re.sub(r"(?<!\\)%.*", "", body)  # Comments
+    body = re.sub(r"\\(?:%s)\*?(?:\[[^\]]*\])?(?:%s)*" % ("|".join(LAYOUT_COMMANDS), BRACED), " ", body)
+    # Commands configured with key=value options go with their options, not just the command name
+    body = COMMAND_WITH_ARGS.sub(lambda m: " " if OPTION_LIST.search(m.group(1)) else m.group(0), body)
+    # Table column specs ({0.97\textwidth}{l@{...}r}) are layout too
+    body = re.sub(r"\\begin\{(?:tabular\*?|tabularx)\}(?:%s)*" % BRACED, " ", body)
+    body = re.sub(r"\\(?:sub)*section\*?\{([^{}]*)\}", r"\n## \1\n", body)
+    body = re.sub(r"\\(?:begin|end)\{[^{}]*\}(?:\[[^\]]*\])?", " ", body)
+    body = re.sub(r"\\href\{[^{}]*\}", " ", body)  # Keep the link text, drop the target
+    body = re.sub(r"\\(?:item|resumeItem|resumeSubItem)\b", "\n- ", body)
+    body = re.sub(r"\\(?:resumeSubheading|resumeProjectHeading|resumeSubSubheading)\b", "\n", body)
+    for escape, char in LATEX_ESCAPES.items():
+        body = body.replace(escape, char)
+    body = body.replace("}{", " | ")
+    body = re.sub(r"\\\\", "\n", body)  # Line breaks
+    body = re.sub(r"\\[a-zA-Z]+\*?(?:\[[^\]]*\])?", " ", body)  # Remaining commands, arguments kept
+    body = re.sub(r"[{}$]", " ", body)
+
+    lines = []
+    for line in body.splitlines():
+        line = re.sub(r"\s+", " ", line).strip(" |")
+        if line and line != "-":
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def get_resume_profile(resume_latex, path=RESUME_PROFILE_PATH):
+    """Returns the compact profile for this resume version, building it only when the resume changes"""
+    resume_hash = resume_fingerprint(resume_latex)
+    if resume_hash in PROFILE_CACHE:
+        return PROFILE_CACHE[resume_hash]
+
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        if cached.get("resume_hash") == resume_hash:
+            PROFILE_CACHE[resume_hash] = cached["profile"]
+            return cached["profile"]
+    except (OSError, ValueError):
+        pass
+
+    profile = latex_to_profile(resume_latex)
+    print(f"📄 Resume profile: {len(resume_latex)} chars (~{estimate_tokens(resume_latex)} tokens) → "
+          f"{len(profile)} chars (~{estimate_tokens(profile)} tokens)")
+    try:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"resume_hash": resume_hash, "profile": profile}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not cache resume profile: {e}")
+    PROFILE_CACHE[resume_hash] = profile
+    return profile
@@ -0,0 +1,116 @@
+import os
+import time
+import threading
+from datetime import datetime
+from rate_limiter import backoff_delay
+from canonical_url import canonicalize_url
+
+# --- Configuration ---
+SHEET_FLUSH_ROWS = int(os.environ.get("SHEET_FLUSH_ROWS", 50))
+SHEET_WRITE_RETRIES = int(os.environ.get("SHEET_WRITE_RETRIES", 5))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+NOTES = "Scraped from JobRight, needs review."
+
+
+def job_row(job):
+    """Columns A-G of the applications sheet; E (relevant contacts) is left blank"""
+    return [
+        job.get("companyName"),
+        job.get("positionName"),
+        "applying",
+        job.get("url"),
+        "",
+        datetime.now().strftime("%Y-%m-%d"),
+        NOTES,
+    ]
+
+
+class SheetSink:
+    """Buffers matched jobs and appends them to the applications sheet in one request.
+
+    Rows go through the Sheets append API, which places them after the last row on the
+    server, so concurrent analyzer executions cannot pick the same start row and
+    overwrite each other. Only the worksheet's append_rows is used. Values are written RAW:
+    company names and titles come from scraped pages, so a leading "=", "+" or "-" must stay
+    text rather than be parsed as a formula. Callers that must not acknowledge work before
+    it is written can pass on_flushed to add().
+    """
+
+    def __init__(self, worksheet, url_index=None, flush_rows=SHEET_FLUSH_ROWS, retries=SHEET_WRITE_RETRIES):
+        self.worksheet = worksheet
+        self.url_index = url_index
+        self.flush_rows = flush_rows
+        self.retries = retries
+        self.buffer = []
+        self.callbacks = []
+        # Reentrant so callers can hold it around their own index checks and add()
+        self.lock = threading.RLock()
+        self.rows_written = 0
+
+    def add(self, jobs, on_flushed=None):
+        """Buffer jobs; on_flushed runs once they (and everything buffered with them) are written"""
+        with self.lock:
+            if not jobs:
+                if on_flushed:
+                    on_flushed()
+                return
+            self.buffer.extend(jobs)
+            if on_flushed:
+                self.callbacks.append(on_flushed)
+            should_flush = len(self.buffer) >= self.flush_rows
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered job; rows stay buffered if all retries fail"""
+        with self.lock:
+            if not self.buffer:
+                return 0
+            jobs, seen = [], set()
+            for job in self.buffer:
+                url = canonicalize_url(job.get("url", ""))
+                if url not in seen:  # Redelivered batches can buffer the same job twice
+                    seen.add(url)
+                    jobs.append(job)
+            if self.url_index is not None:
+                # Pick up rows other executions appended since the last check
+                try:
+                    self.url_index.sync(self.worksheet)
+                except Exception as e:
+                    print(f"⚠️ Error syncing URL index with the sheet: {e}")
+                new_jobs = [job for job in jobs if job.get("url", "") not in self.url_index]
+                if len(new_jobs) < len(jobs):
+                    print(f"🗑️ Skipping {len(jobs) - len(new_jobs)} jobs another execution already logged")
+                jobs = new_jobs
+            if jobs:
+                self.append_with_retry([job_row(job) for job in jobs])
+                if self.url_index is not None:
+                    self.url_index.add([job.get("url", "") for job in jobs])
+            callbacks = self.callbacks
+            self.buffer, self.callbacks = [], []
+            self.rows_written += len(jobs)
+        for callback in callbacks:
+            callback()
+        return len(jobs)
+
+    def append_with_retry(self, rows):
+        attempt = 0
+        while True:
+            try:
+                started = time.perf_counter()
+                self.worksheet.append_rows(
+                    rows,
+                    value_input_option="RAW",
+                    insert_data_option="INSERT_ROWS",
+                    table_range="A1",
+                )
+                print(f"📝 Appended {len(rows)} rows to the sheet in {time.perf_counter() - started:.2f}s")
+                return
+            except Exception as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                attempt += 1
+                if status not in RETRYABLE_STATUS or attempt > self.retries:
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"⚠️ Sheets API returned {status}. Retrying in {delay:.1f}s... (Attempt {attempt}/{self.retries})")
+                time.sleep(delay)
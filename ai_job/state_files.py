@@ -0,0 +1,80 @@
+import os
+import threading
+from blob_store import get_blob_store
+
+# --- Configuration ---
+# Durable home for the analyzer's local state files (URL index, verdict cache, chunk packer budget,
+# job description cache):
+# gs://bucket/prefix or a local path. Cloud Run Jobs start every execution with an empty /tmp, so each
+# file's *_PATH is only a working copy, restored from here before use and saved back after the run.
+ANALYZER_STATE_URI = os.environ.get("ANALYZER_STATE_URI")
+STATE_PREFIX = "analyzer-state"
+SAVE_ATTEMPTS = 3
+STATE_STORE = None
+
+
+def get_state_store():
+    """One state store per process, or None when ANALYZER_STATE_URI is unset"""
+    global STATE_STORE
+    if STATE_STORE is None and ANALYZER_STATE_URI:
+        STATE_STORE = get_blob_store(ANALYZER_STATE_URI)
+    return STATE_STORE
+
+
+class StateFile:
+    """Keeps a local state file in the state store between executions.
+
+    restore() downloads the saved copy before the file is opened, unless a copy is already
+    on disk (a warm worker or a mounted volume). save() uploads it with a compare-and-swap
+    on the stored version; when another execution saved first, merge(remote_path) is called
+    to fold its copy in before trying again. Without a store both are no-ops.
+    """
+
+    def __init__(self, local_path, store=None):
+        self.local_path = local_path
+        self.key = f"{STATE_PREFIX}/{os.path.basename(local_path)}"
+        self.store = store if store is not None else get_state_store()
+
+    def restore(self):
+        if self.store is None or os.path.exists(self.local_path):
+            return False
+        try:
+            data = self.store.read(self.key)
+        except Exception as e:
+            print(f"⚠️ Could not restore {self.key}, starting empty: {e}")
+            return False
+        if data is None:
+            return False
+        self.write_local(self.local_path, data)
+        print(f"♻️ Restored {self.key} ({len(data) / 1024:.0f} KiB)")
+        return True
+
+    def write_local(self, path, data):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self, merge=None):
+        if self.store is None or not os.path.exists(self.local_path):
+            return False
+        try:
+            for _ in range(SAVE_ATTEMPTS):
+                remote, token = self.store.read_with_token(self.key)
+                if remote is not None and merge is not None:
+                    remote_path = f"{self.local_path}.remote-{os.getpid()}-{threading.get_ident()}"
+                    self.write_local(remote_path, remote)
+                    try:
+                        merge(remote_path)
+                    finally:
+                        os.remove(remote_path)
+                with open(self.local_path, "rb") as f:
+                    data = f.read()
+                saved = self.store.create(self.key, data) if remote is None else self.store.replace(self.key, data, token)
+                if saved:
+                    return True
+            print(f"⚠️ {self.key} kept changing while saving, skipped this time")
+        except Exception as e:
+            print(f"⚠️ Could not save {self.key}: {e}")
+        return False
@@ -0,0 +1,72 @@
+"""Benchmark of sheet deduplication cost against the size of the applications sheet.
+
+Compares the old approach (read every row and build a set on each run) with the URL
+index (read only the rows appended since the last run, then primary-key lookups).
+Rows read per run stand in for Sheets API cost; times are local.
+
+    python tests/bench_url_index.py [--sizes 1000,10000,100000] [--new-rows 50] [--lookups 2000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from url_index import UrlIndex, URL_COLUMN
+from state_files import StateFile
+from fakes import FakeWorksheet, sheet_row
+
+
+def full_read_run(sheet, probes):
+    """What check_against_existing_sheet_and_deduplicate did before the index"""
+    started = time.perf_counter()
+    rows = sheet.get_all_values()
+    existing = {row[URL_COLUMN].strip() for row in rows[1:] if len(row) > URL_COLUMN and row[URL_COLUMN].strip()}
+    hits = sum(1 for url in probes if url in existing)
+    return time.perf_counter() - started, len(rows), hits
+
+
+def indexed_run(index, sheet, probes):
+    started = time.perf_counter()
+    before = sheet.rows_read
+    index.sync(sheet)
+    rows_read = sheet.rows_read - before
+    lookup_started = time.perf_counter()
+    hits = sum(1 for url in probes if url in index)
+    lookup_seconds = time.perf_counter() - lookup_started
+    return time.perf_counter() - started, rows_read, hits, lookup_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000,100000")
+    parser.add_argument("--new-rows", type=int, default=50, help="Rows appended between runs")
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} | {'full read':>10} {'rows read':>10} | {'index run':>10} {'rows read':>10} {'µs/lookup':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        sheet = FakeWorksheet([sheet_row(i) for i in range(size)])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.sqlite3")
+            index = UrlIndex("bench", path=path, state_file=StateFile(path))
+            index.sync(sheet)  # The one-time initial build, as on the very first run
+
+            # Next run: a few rows were appended and a batch of matches is checked
+            sheet.rows.extend(sheet_row(i) for i in range(size, size + args.new_rows))
+            probes = [sheet_row(random.randrange(size * 2))[URL_COLUMN] for _ in range(args.lookups)]
+
+            full_seconds, full_rows, full_hits = full_read_run(sheet, probes)
+            index_seconds, index_rows, index_hits, lookup_seconds = indexed_run(index, sheet, probes)
+            index.conn.close()
+        assert full_hits == index_hits
+        print(f"{size:>8} | {full_seconds * 1000:>8.1f}ms {full_rows:>10} | {index_seconds * 1000:>8.1f}ms "
+              f"{index_rows:>10} {lookup_seconds / args.lookups * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import sys
+
+# Service modules import each other as top-level modules, as they do inside the container
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+
+@pytest.fixture
+def offline_batch(tmp_path, monkeypatch):
+    """Lets analyze_job_batch run without secrets, the network or /tmp: pass it a FakeModel"""
+    import ai_analyzer
+    from verdict_cache import VerdictCache
+    from chunk_packer import ChunkPacker
+    from state_files import StateFile
+    from rate_limiter import AdaptiveRateLimiter
+
+    verdicts_path = str(tmp_path / "verdicts.sqlite3")
+    packer_path = str(tmp_path / "chunk-packer.json")
+    monkeypatch.setattr(ai_analyzer, "get_resume_content", lambda: "\\section{Experience} Python")
+    monkeypatch.setattr(ai_analyzer, "get_resume_profile", lambda resume: "Experience: Python")
+    monkeypatch.setattr(ai_analyzer, "prefilter_jobs", lambda jobs, profile, chunk_size: (jobs, {}))
+    monkeypatch.setattr(ai_analyzer, "JD_FETCH_ENABLED", False)
+    monkeypatch.setattr(ai_analyzer, "VerdictCache",
+                        lambda resume: VerdictCache(resume, path=verdicts_path, state_file=StateFile(verdicts_path, store=None)))
+    monkeypatch.setattr(ai_analyzer, "ChunkPacker",
+                        lambda: ChunkPacker(state_path=packer_path, state_file=StateFile(packer_path, store=None)))
+    limiter = AdaptiveRateLimiter(rate_per_minute=6000, max_rate=6000, burst=10)
+    monkeypatch.setattr(ai_analyzer, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(ai_analyzer, "backoff_delay", lambda attempt: 0)
+    return ai_analyzer.analyze_job_batch
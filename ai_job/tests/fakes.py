@@ -0,0 +1,147 @@
+"""In-memory stand-ins for the external services the analyzer talks to."""
+import re
+import threading
+
+HEADER = ["Company", "Position", "Status", "URL", "Contacts", "Date", "Notes"]
+
+
+class FakeWorksheet:
+    """The subset of gspread.Worksheet the analyzer uses: get() of an open-ended range and append_rows()"""
+
+    def __init__(self, rows=None, failures=None):
+        self.rows = [list(HEADER)] + [list(r) for r in rows or []]
+        self.failures = list(failures or [])  # Exceptions raised by the next append_rows calls
+        self.get_calls = []
+        self.append_calls = []
+        self.rows_read = 0
+        self.lock = threading.Lock()
+
+    def get(self, range_name):
+        first_row = int(re.match(r"[A-Z]+(\d+)", range_name).group(1))
+        with self.lock:
+            self.get_calls.append(range_name)
+            rows = [list(r) for r in self.rows[first_row - 1:]]
+            self.rows_read += len(rows)
+        return rows
+
+    def get_all_values(self):
+        return self.get("A1:G")
+
+    def append_rows(self, rows, **kwargs):
+        with self.lock:
+            self.append_calls.append((rows, kwargs))
+            if self.failures:
+                raise self.failures.pop(0)
+            self.rows.extend(list(r) for r in rows)
+
+    def urls(self):
+        return [row[3] for row in self.rows[1:]]
+
+
+class FakeAPIError(Exception):
+    """Shaped like gspread.exceptions.APIError: the HTTP status is on .response.status_code"""
+
+    def __init__(self, status_code):
+        super().__init__(f"APIError: [{status_code}]")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+
+def sheet_row(i):
+    return [f"Acme {i}", "Software Engineer", "applying", f"https://boards.greenhouse.io/acme/jobs/{i}", "", "2026-01-01", ""]
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class FakeModel:
+    """Local stand-in for genai.GenerativeModel that plays a script of outcomes, one per call.
+
+    Steps: ("ok", text), ("429",), ("slow", seconds, text) which honours the request timeout like
+    the real client (raising DeadlineExceeded), and ("hang", seconds, text) which ignores it.
+    When the script runs out the last step repeats.
+    """
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        import time
+        from google.api_core import exceptions as gax_exceptions
+        with self.lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            step = self.steps.pop(0) if len(self.steps) > 1 else self.steps[0]
+        kind = step[0]
+        if kind == "429":
+            raise gax_exceptions.ResourceExhausted("429 Quota exceeded for generate_content")
+        if kind == "slow":
+            timeout = (request_options or {}).get("timeout")
+            if timeout is not None and step[1] > timeout:
+                time.sleep(timeout)
+                raise gax_exceptions.DeadlineExceeded("504 Deadline Exceeded")
+            time.sleep(step[1])
+            return FakeResponse(step[2])
+        if kind == "hang":
+            time.sleep(step[1])
+            return FakeResponse(step[2])
+        return FakeResponse(step[1])
+
+
+class FakeMessage:
+    """A received Pub/Sub message: records whether it was acked or nacked"""
+
+    def __init__(self, message_id, data):
+        self.message_id = message_id
+        self.data = data
+        self.acked = False
+        self.nacked = False
+
+    def ack(self):
+        self.acked = True
+
+    def nack(self):
+        self.nacked = True
+
+
+class FakeSubscriber:
+    """Stand-in for pubsub_v1.SubscriberClient whose streaming pull delivers a fixed list of messages.
+
+    The messages are handed to the callback in order; `acked_while_pulling` records which ones were
+    acked before the pull ended and the worker flushed on the way out.
+    """
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.subscribe_kwargs = None
+        self.acked_while_pulling = None
+        self.closed = False
+
+    def subscription_path(self, project, subscription):
+        return f"projects/{project}/subscriptions/{subscription}"
+
+    def subscribe(self, subscription, callback, **kwargs):
+        self.subscribe_kwargs = dict(kwargs, subscription=subscription)
+        return FakeStreamingPull(self, callback)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStreamingPull:
+    def __init__(self, subscriber, callback):
+        self.subscriber = subscriber
+        self.callback = callback
+
+    def result(self):
+        for message in self.subscriber.messages:
+            self.callback(message)
+        self.subscriber.acked_while_pulling = [m.message_id for m in self.subscriber.messages if m.acked]
+
+    def cancel(self):
+        pass
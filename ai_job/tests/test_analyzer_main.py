@@ -0,0 +1,37 @@
+import gzip
+import sys
+import pytest
+
+import ai_analyzer
+from blob_store import LocalBlobStore
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    def run(*argv):
+        monkeypatch.setattr(sys, "argv", ["ai_analyzer.py", *argv])
+        with pytest.raises(SystemExit) as exit_info:
+            ai_analyzer.main()
+        return exit_info.value.code
+    return run
+
+
+def test_a_batch_ref_without_a_store_fails_the_task(run_main, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "BATCH_STORE_URI", None)
+    assert run_main("--jobs-ref", "batches/1.json.gz") == 1
+
+
+@pytest.mark.parametrize("blob", [b"not gzip", gzip.compress(b'[{"url": "https://x"'), None])
+def test_an_unreadable_batch_fails_the_task_and_is_kept(run_main, monkeypatch, tmp_path, blob):
+    store_root = str(tmp_path / "store")
+    store = LocalBlobStore(store_root)
+    if blob is not None:
+        store.write("batches/1.json.gz", blob)
+    monkeypatch.setattr(ai_analyzer, "BATCH_STORE_URI", store_root)
+
+    assert run_main("--jobs-ref", "batches/1.json.gz") == 1
+    assert store.read("batches/1.json.gz") == blob
+
+
+def test_invalid_jobs_json_fails_the_task(run_main):
+    assert run_main("--jobs-json", '[{"url": ') == 1
@@ -0,0 +1,61 @@
+import pytest
+
+from canonical import NearDuplicateIndex, deduplicate_jobs
+from canonical_url import canonicalize_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    # Greenhouse: board, job-boards, embed and career-site links share the job id
+    ("https://boards.greenhouse.io/acme/jobs/4012345?gh_src=abc", "greenhouse:4012345"),
+    ("https://job-boards.greenhouse.io/acme/jobs/4012345", "greenhouse:4012345"),
+    ("https://boards.greenhouse.io/embed/job_app?for=acme&token=4012345", "greenhouse:4012345"),
+    ("https://acme.com/careers?gh_jid=4012345", "greenhouse:4012345"),
+    # Lever: the posting uuid, case-insensitive, with or without /apply and a scheme
+    ("https://jobs.lever.co/acme/0A1B2C3D-aaaa-bbbb-cccc-1234567890ab/apply?lever-source=LinkedIn",
+     "lever:0a1b2c3d-aaaa-bbbb-cccc-1234567890ab"),
+    ("jobs.lever.co/acme/0a1b2c3d-aaaa-bbbb-cccc-1234567890ab", "lever:0a1b2c3d-aaaa-bbbb-cccc-1234567890ab"),
+    # Workday: tenant plus requisition id, whatever the data center, locale or location slug
+    ("https://acme.wd5.myworkdayjobs.com/en-US/External/job/Remote-USA/Software-Engineer_R-12345/apply",
+     "workday:acme:R-12345"),
+    ("https://acme.wd1.myworkdayjobs.com/External/job/NYC/Software-Engineer_r-12345", "workday:acme:R-12345"),
+    ("https://jobs.ashbyhq.com/acme/6f0e-11/application", "ashby:6f0e-11"),
+    ("https://jobs.smartrecruiters.com/Acme/743999-software-engineer", "smartrecruiters:743999"),
+    ("", ""),
+    (None, ""),
+])
+def test_ats_links_reduce_to_their_job_id(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://WWW.Acme.com/careers/123/", "acme.com/careers/123"),
+    ("https://acme.com/careers/123?utm_source=x&utm_campaign=y", "acme.com/careers/123"),
+    ("https://acme.com/careers/123?ref=jobright&gclid=1&src=feed&jobright=1", "acme.com/careers/123"),
+    ("https://acme.com//careers/123?dept=eng&b=2&trk=x", "acme.com/careers/123?b=2&dept=eng"),
+])
+def test_tracking_parameters_are_stripped_and_the_rest_kept_in_order(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize("first, second, threshold, duplicate", [
+    (("Acme", "Sr. Software Engineer"), ("Acme", "Sr Software Engineer"), 0.8, True),
+    (("Acme", "Backend Engineer, Payments"), ("ACME", "Backend Engineer - Payments"), 0.8, True),
+    (("Acme", "Software Engineer I"), ("Acme", "Software Engineer II"), 0.8, False),
+    (("Acme", "Staff Data Engineer"), ("Acme", "Staff Data Engineer Platform"), 0.8, False),
+    (("Acme", "Staff Data Engineer"), ("Acme", "Staff Data Engineer Platform"), 0.5, True),
+    (("Acme", "Software Engineer"), ("Globex", "Software Engineer"), 0.8, False),
+])
+def test_near_duplicate_threshold(first, second, threshold, duplicate):
+    index = NearDuplicateIndex(threshold)
+    assert index.find_or_add(*first) is None
+    assert (index.find_or_add(*second) == first) is duplicate
+
+
+def test_deduplicate_jobs_drops_url_variants_and_reposts():
+    jobs = [
+        {"companyName": "Acme", "positionName": "Backend Engineer", "url": "https://jobs.lever.co/acme/1"},
+        {"companyName": "Acme", "positionName": "Backend Engineer", "url": "https://jobs.lever.co/acme/1/apply"},
+        {"companyName": "Acme", "positionName": "Backend Engineer!", "url": "https://jobs.lever.co/acme/2"},
+        {"companyName": "Acme", "positionName": "Frontend Engineer", "url": "https://jobs.lever.co/acme/3"},
+    ]
+    assert deduplicate_jobs(jobs, chunk_size=5) == [jobs[0], jobs[3]]
@@ -0,0 +1,68 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+import ai_analyzer
+from ai_analyzer import analyze_with_bisection
+from chunk_packer import ChunkPacker
+from rate_limiter import AdaptiveRateLimiter
+from verdict_cache import VerdictCache
+from state_files import StateFile
+from blob_store import LocalBlobStore
+from call_stats import CallStats
+from fakes import FakeModel
+
+
+def job(i):
+    return {"companyName": f"Acme {i}", "positionName": "Software Engineer", "url": f"https://jobs.lever.co/acme/{i}"}
+
+
+def make_packer(tmp_path, name, store=None):
+    (tmp_path / name).mkdir(exist_ok=True)
+    path = str(tmp_path / name / "chunk-packer.json")
+    return ChunkPacker(state_path=path, max_budget=10000, min_budget=100, state_file=StateFile(path, store=store))
+
+
+@pytest.fixture
+def run_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "backoff_delay", lambda attempt: 0)
+    path = str(tmp_path / "verdicts.sqlite3")
+    verdict_cache = VerdictCache("resume", path=path, state_file=StateFile(path, store=None))
+    limiter = AdaptiveRateLimiter(rate_per_minute=6000, max_rate=6000, burst=10)
+
+    def run(model, chunk):
+        with ThreadPoolExecutor(max_workers=4) as call_pool:
+            return analyze_with_bisection(model, chunk, "chunk 1/1", None, {}, limiter, call_pool, verdict_cache, CallStats())
+    return run
+
+
+def test_quota_failures_are_not_reported_as_size_failures(run_chunk):
+    matches, clean = run_chunk(FakeModel(("429",)), [job(1), job(2)])
+    assert matches == []
+    assert clean is None
+
+
+def test_unusable_answers_are_reported_as_size_failures(run_chunk):
+    matches, clean = run_chunk(FakeModel(("ok", "not json")), [job(1), job(2)])
+    assert clean is False
+
+
+def test_only_size_failures_shrink_the_budget(tmp_path):
+    packer = make_packer(tmp_path, "run")
+    chunks = packer.pack([job(i) for i in range(10)], fixed_tokens=100)
+    packer.observe(chunks[0], True)
+    assert packer.budget == 10000
+
+    packer.observe(chunks[0], False)
+    assert packer.budget < packer.chunk_tokens(chunks[0])
+    assert packer.failures == 1
+
+
+def test_budget_survives_to_an_execution_with_an_empty_disk(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    first = make_packer(tmp_path, "run1", store)
+    first.pack([job(i) for i in range(10)], fixed_tokens=100)
+    first.observe([job(i) for i in range(10)], False)
+    first.save()
+
+    second = make_packer(tmp_path, "run2", store)
+    assert second.budget == first.budget < 10000
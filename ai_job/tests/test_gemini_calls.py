@@ -0,0 +1,171 @@
+import json
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+import ai_analyzer
+from ai_analyzer import analyze_chunk, generate_with_hedge
+from rate_limiter import AdaptiveRateLimiter, backoff_delay
+from verdict_cache import VerdictCache
+from state_files import StateFile
+from call_stats import CallStats
+from fakes import FakeModel
+
+JOBS = [
+    {"companyName": "Acme", "positionName": "Software Engineer", "url": "https://jobs.lever.co/acme/1"},
+    {"companyName": "Globex", "positionName": "Backend Engineer", "url": "https://jobs.lever.co/globex/2"},
+]
+ANSWER = json.dumps({"good_matches": [JOBS[0]]})
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    """Record backoff attempts instead of sleeping through them"""
+    attempts = []
+    monkeypatch.setattr(ai_analyzer, "backoff_delay", lambda attempt: attempts.append(attempt) or 0)
+    return attempts
+
+
+@pytest.fixture
+def call_pool():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+@pytest.fixture
+def verdict_cache(tmp_path):
+    path = str(tmp_path / "verdicts.sqlite3")
+    return VerdictCache("resume", path=path, state_file=StateFile(path, store=None))
+
+
+def fast_limiter():
+    return AdaptiveRateLimiter(rate_per_minute=6000, max_rate=6000, burst=10)
+
+
+def run_chunk(model, call_pool, verdict_cache, limiter=None):
+    limiter = limiter or fast_limiter()
+    return analyze_chunk(model, JOBS, "chunk 1/1", None, {}, limiter, call_pool, verdict_cache, CallStats())
+
+
+def test_on_throttle_halves_the_rate_and_success_recovers_it():
+    limiter = AdaptiveRateLimiter(rate_per_minute=20, min_rate=4, max_rate=60)
+    limiter.on_throttle()
+    assert limiter.rate * 60 == pytest.approx(10)
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate * 60 == pytest.approx(4)  # Clamped at the minimum
+    limiter.on_success()
+    assert limiter.rate * 60 == pytest.approx(4 + 60 / 50)
+
+
+def test_acquire_waits_once_the_bucket_is_empty():
+    limiter = AdaptiveRateLimiter(rate_per_minute=600, max_rate=600, burst=2)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.09  # The third token refills at 10/s
+
+
+def test_on_throttle_drains_the_burst():
+    limiter = AdaptiveRateLimiter(rate_per_minute=600, max_rate=600, burst=5)
+    limiter.on_throttle()
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.15  # No saved-up tokens left after a 429
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    for attempt in range(1, 8):
+        for _ in range(50):
+            assert 0 <= backoff_delay(attempt, base=2, cap=30) <= min(30, 2 * 2 ** attempt)
+
+
+def test_rate_limited_calls_back_off_and_then_succeed(call_pool, verdict_cache, backoffs):
+    model = FakeModel(("429",), ("429",), ("ok", ANSWER))
+    limiter = fast_limiter()
+
+    matches, unresolved = run_chunk(model, call_pool, verdict_cache, limiter)
+
+    assert matches == [JOBS[0]] and unresolved == []
+    assert model.calls == 3
+    assert backoffs == [1, 2]
+    # Two halvings, then one additive step back up
+    assert limiter.rate * 60 == pytest.approx(6000 / 4 + 6000 / 50)
+
+
+def test_chunk_is_given_up_after_the_retry_budget(call_pool, verdict_cache, backoffs):
+    model = FakeModel(("429",))
+
+    assert run_chunk(model, call_pool, verdict_cache) is None
+    assert model.calls == ai_analyzer.MAX_RATE_LIMIT_RETRIES + 1
+    assert backoffs == list(range(1, ai_analyzer.MAX_RATE_LIMIT_RETRIES + 1))
+
+
+def test_slow_call_is_hedged_and_the_fast_answer_wins(call_pool, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "GEMINI_HEDGE_AFTER_SECONDS", 0.05)
+    monkeypatch.setattr(ai_analyzer, "GEMINI_TIMEOUT_SECONDS", 5)
+    model = FakeModel(("slow", 1.0, "first"), ("ok", "second"))
+
+    started = time.monotonic()
+    response = generate_with_hedge(model, "prompt", fast_limiter(), call_pool)
+
+    assert response.text == "second"
+    assert model.calls == 2
+    assert time.monotonic() - started < 0.5
+
+
+def test_fast_call_is_not_hedged(call_pool, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "GEMINI_HEDGE_AFTER_SECONDS", 0.5)
+    model = FakeModel(("ok", "only"))
+
+    assert generate_with_hedge(model, "prompt", fast_limiter(), call_pool).text == "only"
+    assert model.calls == 1
+
+
+def test_request_timeout_is_retried_then_dropped(call_pool, verdict_cache, backoffs, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "GEMINI_HEDGE_AFTER_SECONDS", 0)
+    monkeypatch.setattr(ai_analyzer, "GEMINI_TIMEOUT_SECONDS", 0.05)
+    model = FakeModel(("slow", 1.0, ANSWER))
+
+    assert run_chunk(model, call_pool, verdict_cache) is None
+    assert model.calls == ai_analyzer.MAX_RATE_LIMIT_RETRIES + 1
+
+
+def test_hung_call_hits_the_client_side_deadline(call_pool, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "GEMINI_HEDGE_AFTER_SECONDS", 0)
+    monkeypatch.setattr(ai_analyzer, "GEMINI_TIMEOUT_SECONDS", 0.1)
+    model = FakeModel(("hang", 0.5, ANSWER))
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        generate_with_hedge(model, "prompt", fast_limiter(), call_pool)
+    assert time.monotonic() - started < 0.4
+
+
+def test_timeout_after_a_hedge_recovers_when_the_retry_is_fast(call_pool, verdict_cache, backoffs, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "GEMINI_HEDGE_AFTER_SECONDS", 0.02)
+    monkeypatch.setattr(ai_analyzer, "GEMINI_TIMEOUT_SECONDS", 0.1)
+    model = FakeModel(("hang", 0.5, "late"), ("hang", 0.5, "late"), ("ok", ANSWER))
+
+    matches, unresolved = run_chunk(model, call_pool, verdict_cache)
+
+    assert matches == [JOBS[0]]
+    assert model.calls == 3
+    assert backoffs == [1]
+
+
+def test_fatal_errors_reach_the_caller_so_the_batch_is_retried(monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "get_resume_content", lambda: None)
+    with pytest.raises(RuntimeError):
+        ai_analyzer.analyze_job_batch(JOBS)
+
+
+def test_a_hung_call_does_not_hold_the_batch_past_its_deadline(offline_batch, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "GEMINI_HEDGE_AFTER_SECONDS", 0)
+    monkeypatch.setattr(ai_analyzer, "GEMINI_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(ai_analyzer, "MAX_RATE_LIMIT_RETRIES", 0)
+    model = FakeModel(("hang", 3, ANSWER))
+
+    started = time.monotonic()
+    assert offline_batch(JOBS, model=model) == []
+    assert time.monotonic() - started < 1.0
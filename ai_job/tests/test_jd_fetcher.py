@@ -0,0 +1,145 @@
+import time
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from jd_fetcher import JobDescriptionFetcher, html_to_text
+from state_files import StateFile
+from blob_store import LocalBlobStore
+
+DESCRIPTION = "We are hiring a backend engineer to build data pipelines in Python. " * 5
+PAGE = f"<html><head><title>Job</title><script>var x = 1;</script></head><body><nav>Menu</nav><p>{DESCRIPTION}</p></body></html>"
+SLOW_SECONDS = 2
+
+
+class JobPages(ThreadingHTTPServer):
+    """Local job site: /ok/* serves a page with an ETag, /slow/* stalls, /fail/* returns 500"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), JobPageHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class JobPageHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if self.path.startswith("/slow/"):
+                time.sleep(SLOW_SECONDS)
+                self.reply(200, PAGE)
+            elif self.path.startswith("/fail/"):
+                self.reply(500, "")
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self.reply(304, None)
+            else:
+                time.sleep(0.05)  # Long enough for concurrent requests to overlap
+                self.reply(200, PAGE, {"ETag": '"v1"'})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body is None:
+            self.end_headers()
+            return
+        data = body.encode("utf-8")
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except OSError:
+            pass  # The client gave up on a slow page
+
+
+def make_fetcher(tmp_path, name="run", store=None):
+    (tmp_path / name).mkdir(exist_ok=True)
+    path = str(tmp_path / name / "jd.sqlite3")
+    return JobDescriptionFetcher(cache_path=path, workers=8, per_host_limit=2, timeout=0.5, parse_processes=1,
+                                 state_file=StateFile(path, store=store))
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    return make_fetcher(tmp_path)
+
+
+def test_html_to_text_drops_markup_and_hidden_blocks():
+    text = html_to_text(PAGE)
+    assert "var x" not in text and "Menu" not in text
+    assert text == DESCRIPTION.strip()
+
+
+def test_slow_and_failing_hosts_do_not_hold_up_healthy_pages(fetcher):
+    with JobPages() as healthy, JobPages() as broken:
+        jobs = [{"url": healthy.url(f"/ok/{i}")} for i in range(6)]
+        jobs += [{"url": broken.url("/slow/1")}, {"url": broken.url("/fail/1")}]
+
+        started = time.perf_counter()
+        descriptions = fetcher.fetch_all(jobs)
+        elapsed = time.perf_counter() - started
+
+    assert set(descriptions) == {job["url"] for job in jobs[:6]}
+    assert descriptions[jobs[0]["url"]] == DESCRIPTION.strip()
+    # The slow page is abandoned at the client timeout (plus retries) instead of waited out
+    assert elapsed < SLOW_SECONDS * 3
+    # 500s are retried before the page is given up on
+    assert [path for path, _ in broken.requests].count("/fail/1") == 3
+
+
+def test_requests_per_host_stay_within_the_limit(fetcher):
+    with JobPages() as site:
+        fetcher.fetch_all([{"url": site.url(f"/ok/{i}")} for i in range(10)])
+    assert len(site.requests) == 10
+    assert site.max_in_flight == 2
+
+
+def test_unchanged_pages_are_revalidated_from_the_cache(fetcher):
+    with JobPages() as site:
+        jobs = [{"url": site.url("/ok/1")}, {"url": site.url("/ok/2")}]
+        first = fetcher.fetch_all(jobs)
+        second = fetcher.fetch_all(jobs)
+
+    assert second == first
+    revalidations = site.requests[2:]
+    assert [etag for _, etag in revalidations] == ['"v1"', '"v1"']
+
+
+def test_validators_carry_over_to_an_execution_with_an_empty_disk(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    with JobPages() as site:
+        jobs = [{"url": site.url("/ok/1")}]
+        first = make_fetcher(tmp_path, "run1", store)
+        descriptions = first.fetch_all(jobs)
+        first.save()
+
+        second = make_fetcher(tmp_path, "run2", store)
+        assert second.fetch_all(jobs) == descriptions
+
+    assert [etag for _, etag in site.requests] == [None, '"v1"']
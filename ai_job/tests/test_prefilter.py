@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from prefilter import prefilter_jobs, prefilter_report
+from verdict_cache import VerdictCache
+from state_files import StateFile
+from canonical import canonicalize_url
+
+PROFILE = "Software engineer. Python, Go, React, PostgreSQL, distributed systems."
+
+
+def job(i, title):
+    return {"companyName": f"Acme {i}", "positionName": title, "url": f"https://jobs.lever.co/acme/{i}"}
+
+
+def test_audit_sample_of_rejects_reaches_the_model_with_weights():
+    jobs = [job(i, "Senior Data Analyst") for i in range(200)] + [job(999, "Software Engineer")]
+
+    sent, weights = prefilter_jobs(jobs, PROFILE, 5, audit_rate=0.1)
+
+    audited = [j for j in sent if j["positionName"] == "Senior Data Analyst"]
+    assert job(999, "Software Engineer") in sent
+    assert 5 <= len(audited) <= 50
+    assert weights == {canonicalize_url(j["url"]): pytest.approx(10) for j in audited}
+
+
+def test_no_audit_when_rate_is_zero():
+    sent, weights = prefilter_jobs([job(1, "Data Scientist")], PROFILE, 5, audit_rate=0)
+    assert sent == [] and weights == {}
+
+
+def test_report_weights_audited_verdicts(tmp_path, capsys):
+    path = str(tmp_path / "verdicts.sqlite3")
+    cache = VerdictCache("resume", path=path, state_file=StateFile(path, store=None))
+    kept = [job(i, "Software Engineer") for i in range(4)]
+    rejected_match = job(10, "Senior Analyst")
+    cache.record(kept, kept[:2])
+    cache.set_sample_weights({canonicalize_url(rejected_match["url"]): 10})
+    cache.record([rejected_match], [rejected_match])
+
+    prefilter_report(cache.recorded_verdicts(), PROFILE)
+
+    out = capsys.readouterr().out
+    # 2 true positives against 10 estimated missed matches, not the 2/3 an unweighted count gives
+    assert "recall 16.67%" in out
+    assert "precision 50.00%" in out
+    assert "1 from the audit sample" in out
+
+
+def test_report_warns_when_no_rejects_were_ever_judged(capsys):
+    prefilter_report([(job(1, "Software Engineer"), True, 1)], PROFILE)
+    assert "recall cannot be measured" in capsys.readouterr().out
@@ -0,0 +1,104 @@
+import json
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+import ai_analyzer
+from ai_analyzer import analyze_with_bisection
+from response_parser import parse_good_matches
+from rate_limiter import AdaptiveRateLimiter
+from verdict_cache import VerdictCache
+from state_files import StateFile
+from call_stats import CallStats
+from fakes import FakeModel
+
+A = {"companyName": "Acme", "positionName": "Backend Engineer", "url": "https://jobs.lever.co/acme/1"}
+B = {"companyName": "Globex", "positionName": "Platform Engineer", "url": "https://jobs.lever.co/globex/2"}
+ANSWER = json.dumps({"good_matches": [A, B]})
+
+
+@pytest.mark.parametrize("text, expected", [
+    (ANSWER, ([A, B], True)),
+    (f"```json\n{ANSWER}\n```", ([A, B], True)),
+    (f"```\n{ANSWER}```", ([A, B], True)),
+    (f"Here are the matches I found:\n{ANSWER}\nLet me know if you need more.", ([A, B], True)),
+    (json.dumps([A, B]), ([A, B], True)),
+    (f"Matches: {json.dumps([A])} (1 of 5)", ([A], True)),
+    ('{"good_matches": []}', ([], True)),
+    # Cut off inside the second object: the first one is kept, the answer is incomplete
+    (ANSWER[:ANSWER.index('"Globex"') + 5], ([A], False)),
+    ('{"good_matches": [', ([], False)),
+    # Cut off after a complete object but before the closing brace
+    (json.dumps({"good_matches": [A]})[:-1], ([A], True)),
+    ('{"good_matches": [{"url": "x"}, "stray", {"url": "y"}]}', ([{"url": "x"}, {"url": "y"}], True)),
+])
+def test_answers_are_salvaged(text, expected):
+    assert parse_good_matches(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "   ", None, "```json\n```", "No good matches today.", '{"matches": []}'])
+def test_unusable_answers_raise(text):
+    with pytest.raises(ValueError):
+        parse_good_matches(text)
+
+
+def job(i):
+    return {"companyName": f"Acme {i}", "positionName": "Software Engineer", "url": f"https://jobs.lever.co/acme/{i}"}
+
+
+@pytest.fixture
+def bisect(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "backoff_delay", lambda attempt: 0)
+    path = str(tmp_path / "verdicts.sqlite3")
+    verdict_cache = VerdictCache("resume", path=path, state_file=StateFile(path, store=None))
+    limiter = AdaptiveRateLimiter(rate_per_minute=6000, max_rate=6000, burst=10)
+    stats = CallStats()
+
+    def run(model, chunk):
+        with ThreadPoolExecutor(max_workers=2) as call_pool:
+            result = analyze_with_bisection(model, chunk, "chunk 1/1", None, {}, limiter, call_pool, verdict_cache, stats)
+        return result, verdict_cache, stats
+    return run
+
+
+def urls_in(prompt, jobs):
+    return [j["url"] for j in jobs if j["url"] in prompt]
+
+
+def test_a_truncated_answer_keeps_its_matches_and_retries_only_the_rest(bisect):
+    jobs = [job(i) for i in range(4)]
+    truncated = json.dumps({"good_matches": [jobs[0], jobs[2]]})
+    truncated = truncated[:truncated.index(jobs[2]["url"])]
+    model = FakeModel(("ok", truncated), ("ok", json.dumps({"good_matches": []})),
+                      ("ok", json.dumps({"good_matches": [jobs[2]]})))
+
+    (matches, clean), verdict_cache, stats = bisect(model, jobs)
+
+    assert matches == [jobs[0], jobs[2]]
+    assert clean is False
+    # The vouched-for match is not sent again; the three unresolved jobs are split 1 / 2
+    assert [urls_in(p, jobs) for p in model.prompts] == [
+        [j["url"] for j in jobs], [jobs[1]["url"]], [jobs[2]["url"], jobs[3]["url"]]]
+    cached, misses = verdict_cache.partition(jobs)
+    assert cached == [jobs[0], jobs[2]] and misses == []
+    assert stats.salvaged_calls == 1 and stats.dropped_jobs == 0
+
+
+def test_an_unusable_half_is_split_again_and_the_good_half_keeps_its_verdicts(bisect):
+    jobs = [job(i) for i in range(4)]
+    model = FakeModel(
+        ("ok", "not json"),                                   # all four
+        ("ok", json.dumps({"good_matches": [jobs[1]]})),      # 0, 1
+        ("ok", "still not json"),                             # 2, 3
+        ("ok", json.dumps({"good_matches": []})),             # 2
+        ("ok", "never json"),                                 # 3, dropped on its own
+    )
+
+    (matches, clean), verdict_cache, stats = bisect(model, jobs)
+
+    assert matches == [jobs[1]]
+    assert [urls_in(p, jobs) for p in model.prompts] == [
+        [j["url"] for j in jobs], [jobs[0]["url"], jobs[1]["url"]], [jobs[2]["url"], jobs[3]["url"]],
+        [jobs[2]["url"]], [jobs[3]["url"]]]
+    cached, misses = verdict_cache.partition(jobs)
+    assert cached == [jobs[1]] and misses == [jobs[3]]
+    assert stats.dropped_jobs == 1
@@ -0,0 +1,35 @@
+from resume_profile import latex_to_profile
+
+RESUME = r"""\documentclass[letterpaper,11pt]{article}
+\usepackage[hidelinks]{hyperref}
+\begin{document}
+\setlist[itemize]{leftmargin=0pt, itemsep=0pt}
+\hypersetup{colorlinks=true, urlcolor=blue}
+\titlespacing{\section}{0pt}{4pt}{2pt}
+\section{Experience}  % Most recent first
+\resumeSubheading{Acme}{2024 -- Present}{Software Engineer}{Remote}
+\begin{itemize}[leftmargin=0.15in, label={}]
+\item Built Python services; cut p99 latency by 40\%
+\end{itemize}
+\section{Skills}
+\begin{tabular*}{0.97\textwidth}{l@{\extracolsep{\fill}}r}
+\textbf{Languages}{: Python, Go} \\
+\end{tabular*}
+\end{document}"""
+
+
+def test_profile_keeps_headings_entries_and_bullets():
+    assert latex_to_profile(RESUME) == "\n".join([
+        "## Experience",
+        "Acme | 2024 -- Present | Software Engineer | Remote",
+        "- Built Python services; cut p99 latency by 40%",
+        "## Skills",
+        "Languages | : Python, Go",
+    ])
+
+
+def test_key_value_options_go_with_their_command():
+    resume = RESUME.replace(r"\end{document}", r"\mysetup[align=left]{spacing=0pt} \customlist{topsep=0pt}" "\n\\end{document}")
+    profile = latex_to_profile(resume)
+    assert "=" not in profile
+    assert "0pt" not in profile
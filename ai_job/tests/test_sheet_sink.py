@@ -0,0 +1,116 @@
+import pytest
+
+import sheet_sink
+from sheet_sink import SheetSink
+from url_index import UrlIndex
+from state_files import StateFile
+from fakes import FakeWorksheet, FakeAPIError, sheet_row
+
+
+def job(i, suffix=""):
+    return {"companyName": f"Acme {i}", "positionName": "Software Engineer",
+            "url": f"https://boards.greenhouse.io/acme/jobs/{i}{suffix}"}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(sheet_sink, "backoff_delay", lambda attempt: 0)
+
+
+@pytest.fixture
+def url_index(tmp_path):
+    path = str(tmp_path / "index.sqlite3")
+    return UrlIndex("sheet-1", path=path, state_file=StateFile(path, store=None))
+
+
+def test_rows_are_buffered_until_the_flush_size(url_index):
+    sheet = FakeWorksheet()
+    sink = SheetSink(sheet, url_index, flush_rows=3)
+    sink.add([job(1), job(2)])
+    assert sheet.append_calls == []
+
+    sink.add([job(3)])
+    assert len(sheet.append_calls) == 1
+    rows, kwargs = sheet.append_calls[0]
+    assert [row[3] for row in rows] == [job(i)["url"] for i in (1, 2, 3)]
+    assert kwargs["insert_data_option"] == "INSERT_ROWS"
+    assert sink.rows_written == 3
+
+
+def test_scraped_text_is_written_raw(url_index):
+    sheet = FakeWorksheet()
+    sink = SheetSink(sheet, url_index, flush_rows=2)
+    sink.add([dict(job(1), positionName="-Senior Engineer"), dict(job(2), companyName='=HYPERLINK("http://x")')])
+
+    rows, kwargs = sheet.append_calls[0]
+    assert kwargs["value_input_option"] == "RAW"
+    assert [row[:2] for row in rows] == [["Acme 1", "-Senior Engineer"], ['=HYPERLINK("http://x")', "Software Engineer"]]
+
+
+def test_callbacks_run_only_after_the_rows_are_written(url_index):
+    sheet = FakeWorksheet()
+    sink = SheetSink(sheet, url_index, flush_rows=10)
+    acked = []
+    sink.add([job(1)], on_flushed=lambda: acked.append("a"))
+    sink.add([job(2)], on_flushed=lambda: acked.append("b"))
+    assert acked == []
+
+    sink.flush()
+    assert acked == ["a", "b"]
+    assert sheet.urls() == [job(1)["url"], job(2)["url"]]
+
+
+def test_an_empty_batch_is_acknowledged_at_once(url_index):
+    sink = SheetSink(FakeWorksheet(), url_index)
+    acked = []
+    sink.add([], on_flushed=lambda: acked.append(True))
+    assert acked == [True]
+
+
+def test_rate_limited_appends_are_retried(url_index):
+    sheet = FakeWorksheet(failures=[FakeAPIError(429), FakeAPIError(503)])
+    sink = SheetSink(sheet, url_index, flush_rows=10)
+    sink.add([job(1)])
+
+    assert sink.flush() == 1
+    assert len(sheet.append_calls) == 3
+    assert sheet.urls() == [job(1)["url"]]
+
+
+def test_failed_writes_keep_rows_and_callbacks_buffered(url_index):
+    sheet = FakeWorksheet(failures=[FakeAPIError(403)])
+    sink = SheetSink(sheet, url_index, flush_rows=10)
+    acked = []
+    sink.add([job(1)], on_flushed=lambda: acked.append(True))
+
+    with pytest.raises(FakeAPIError):
+        sink.flush()
+    assert acked == [] and sink.buffer == [job(1)]
+
+    sink.flush()  # The next flush writes them
+    assert acked == [True]
+    assert sheet.urls() == [job(1)["url"]]
+
+
+def test_retries_give_up_after_the_retry_budget(url_index):
+    sheet = FakeWorksheet(failures=[FakeAPIError(429)] * 3)
+    sink = SheetSink(sheet, url_index, flush_rows=10, retries=2)
+    sink.add([job(1)])
+    with pytest.raises(FakeAPIError):
+        sink.flush()
+    assert len(sheet.append_calls) == 3
+
+
+def test_duplicates_in_the_buffer_and_the_sheet_are_skipped(url_index):
+    sheet = FakeWorksheet([sheet_row(1)])
+    sink = SheetSink(sheet, url_index, flush_rows=10)
+    sink.add([job(1), job(2)])
+    sink.add([job(2, "?gh_src=abc")])  # A redelivered batch with a URL variant
+
+    # Another execution appends job 3 before this one flushes
+    sheet.rows.append(sheet_row(3))
+    sink.add([job(3)])
+
+    assert sink.flush() == 1
+    assert sheet.urls() == [job(1)["url"], job(3)["url"], job(2)["url"]]
+    assert job(2)["url"] in url_index
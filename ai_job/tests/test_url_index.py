@@ -0,0 +1,58 @@
+from url_index import UrlIndex
+from state_files import StateFile
+from blob_store import LocalBlobStore
+from fakes import FakeWorksheet, sheet_row
+
+
+def make_index(tmp_path, store=None, name="index.sqlite3"):
+    path = str(tmp_path / "local" / name)
+    (tmp_path / "local").mkdir(exist_ok=True)
+    return UrlIndex("sheet-1", path=path, state_file=StateFile(path, store=store))
+
+
+def test_sync_reads_only_new_rows(tmp_path):
+    sheet = FakeWorksheet([sheet_row(i) for i in range(100)])
+    index = make_index(tmp_path)
+    index.sync(sheet)
+    assert index.count() == 100 and index.synced_rows == 101
+
+    sheet.rows.extend(sheet_row(i) for i in range(100, 105))
+    sheet.rows_read = 0
+    index.sync(sheet)
+
+    assert sheet.rows_read == 6  # The last synced row plus the five new ones
+    assert index.count() == 105
+    assert "https://boards.greenhouse.io/acme/jobs/104?gh_src=abc" in index
+
+
+def test_deleted_rows_trigger_a_rebuild(tmp_path):
+    sheet = FakeWorksheet([sheet_row(i) for i in range(10)])
+    index = make_index(tmp_path)
+    index.sync(sheet)
+
+    del sheet.rows[3:5]  # Two rows removed by hand
+    sheet.rows.extend(sheet_row(i) for i in range(10, 13))
+    index.sync(sheet)
+
+    # Without the check the sync point would sit two rows past the end of the old data
+    assert all(url in index for url in sheet.urls())
+    assert index.synced_rows == len(sheet.rows)
+    assert sheet_row(3)[3] not in index
+
+
+def test_index_survives_a_fresh_local_disk_through_the_state_store(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    sheet = FakeWorksheet([sheet_row(i) for i in range(50)])
+    first = make_index(tmp_path, store)
+    first.sync(sheet)
+    first.save()
+    first.conn.close()
+    (tmp_path / "local" / "index.sqlite3").unlink()  # A new execution starts with an empty /tmp
+
+    sheet.rows.append(sheet_row(50))
+    sheet.rows_read = 0
+    second = make_index(tmp_path, store)
+    second.sync(sheet)
+
+    assert sheet.rows_read == 2
+    assert second.count() == 51
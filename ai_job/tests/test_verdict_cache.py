@@ -0,0 +1,53 @@
+from verdict_cache import VerdictCache
+from state_files import StateFile
+from blob_store import LocalBlobStore
+
+RESUME = "\\section{Experience} Python, Go"
+
+
+def job(i):
+    return {"companyName": f"Acme {i}", "positionName": "Software Engineer", "url": f"https://jobs.lever.co/acme/{i}"}
+
+
+def make_cache(tmp_path, store, name, resume=RESUME):
+    path = str(tmp_path / name / "verdicts.sqlite3")
+    (tmp_path / name).mkdir(exist_ok=True)
+    return VerdictCache(resume, path=path, state_file=StateFile(path, store=store))
+
+
+def test_verdicts_survive_to_an_execution_with_an_empty_disk(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    first = make_cache(tmp_path, store, "run1")
+    first.record([job(1), job(2)], [job(1)])
+    first.save()
+
+    second = make_cache(tmp_path, store, "run2")
+    matches, misses = second.partition([job(1), job(2), job(3)])
+
+    assert matches == [job(1)]
+    assert misses == [job(3)]
+    assert second.hits == 2
+
+
+def test_concurrent_executions_merge_instead_of_overwriting(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    a = make_cache(tmp_path, store, "a")
+    b = make_cache(tmp_path, store, "b")
+    a.record([job(1)], [job(1)])
+    b.record([job(2)], [])
+    a.save()
+    b.save()  # Saved second, so it must fold in a's verdict first
+
+    c = make_cache(tmp_path, store, "c")
+    matches, misses = c.partition([job(1), job(2)])
+    assert matches == [job(1)] and misses == []
+
+
+def test_a_new_resume_misses_old_verdicts(tmp_path):
+    store = LocalBlobStore(str(tmp_path / "store"))
+    first = make_cache(tmp_path, store, "run1")
+    first.record([job(1)], [job(1)])
+    first.save()
+
+    edited = make_cache(tmp_path, store, "run2", resume=RESUME + " Rust")
+    assert edited.partition([job(1)]) == ([], [job(1)])
@@ -0,0 +1,88 @@
+import json
+import pytest
+
+import ai_analyzer
+from url_index import UrlIndex
+from state_files import StateFile
+from fakes import FakeWorksheet, FakeMessage, FakeSubscriber, FakeModel
+
+pubsub_v1 = pytest.importorskip("google.cloud.pubsub_v1")
+
+
+def job(i):
+    return {"companyName": f"Acme {i}", "positionName": "Software Engineer",
+            "url": f"https://boards.greenhouse.io/acme/jobs/{i}"}
+
+
+def message(message_id, jobs):
+    return FakeMessage(message_id, json.dumps({"jobs": jobs}).encode("utf-8"))
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    """Runs run_worker against a fake sheet and subscriber; analysis returns each job with a 'match' title"""
+    sheet = FakeWorksheet()
+    index_path = str(tmp_path / "index.sqlite3")
+    monkeypatch.setattr(ai_analyzer, "get_sheet_id", lambda: "sheet-1")
+    monkeypatch.setattr(ai_analyzer, "get_applications_sheet", lambda sheet_id: sheet)
+    monkeypatch.setattr(ai_analyzer, "UrlIndex",
+                        lambda sheet_id: UrlIndex(sheet_id, path=index_path, state_file=StateFile(index_path, store=None)))
+    monkeypatch.setattr(ai_analyzer, "WORKER_FLUSH_SECONDS", 3600)
+
+    def analyze(jobs):
+        if any(j["companyName"] == "Broken" for j in jobs):
+            raise RuntimeError("Gemini is down")
+        return jobs
+    monkeypatch.setattr(ai_analyzer, "analyze_job_batch", analyze)
+
+    def run(*messages):
+        subscriber = FakeSubscriber(list(messages))
+        ai_analyzer.run_worker(subscriber=subscriber)
+        return subscriber, sheet
+    return run
+
+
+def test_a_message_is_acked_only_after_its_rows_are_written(worker):
+    ok = message("m-1", [job(1), job(2)])
+    subscriber, sheet = worker(ok)
+
+    # Below the flush size the rows wait in the sink, and so does the ack
+    assert subscriber.acked_while_pulling == []
+    assert ok.acked and not ok.nacked
+    assert sheet.urls() == [job(1)["url"], job(2)["url"]]
+    assert subscriber.closed
+
+
+def test_a_failed_analysis_is_nacked_for_redelivery(worker):
+    broken = message("m-1", [dict(job(1), companyName="Broken")])
+    ok = message("m-2", [job(2)])
+    subscriber, sheet = worker(broken, ok)
+
+    assert broken.nacked and not broken.acked
+    assert ok.acked
+    assert sheet.urls() == [job(2)["url"]]
+
+
+def test_a_malformed_message_is_acked_and_dropped(worker):
+    garbage = FakeMessage("m-1", b"not json")
+    subscriber, sheet = worker(garbage)
+    assert garbage.acked
+    assert sheet.append_calls == []
+
+
+def test_flow_control_caps_messages_in_flight(worker, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "WORKER_MAX_MESSAGES", 3)
+    subscriber, _ = worker()
+
+    kwargs = subscriber.subscribe_kwargs
+    assert kwargs["subscription"] == f"projects/{ai_analyzer.GCP_PROJECT_ID}/subscriptions/{ai_analyzer.ANALYZER_SUBSCRIPTION}"
+    assert kwargs["flow_control"].max_messages == 3
+    assert kwargs["scheduler"]._executor._max_workers == 3
+
+
+def test_startup_time_is_reported_once_per_process(offline_batch, monkeypatch, capsys):
+    monkeypatch.setattr(ai_analyzer, "FIRST_WORK_REPORTED", False)
+    answer = json.dumps({"good_matches": []})
+    offline_batch([job(1)], model=FakeModel(("ok", answer)))
+    offline_batch([job(2)], model=FakeModel(("ok", answer)))
+    assert capsys.readouterr().out.count("Time to first useful work") == 1
@@ -0,0 +1,102 @@
+import os
+import time
+import sqlite3
+from canonical_url import canonicalize_url
+from state_files import StateFile
+
+# --- Configuration ---
+# SQLite copy of the sheet's URL column plus the last synced row
+URL_INDEX_PATH = os.environ.get("URL_INDEX_PATH", "/tmp/jobscout-url-index.sqlite3")
+URL_COLUMN = 3  # Column D, zero-based
+LAST_COLUMN = "G"
+INDEX_VERSION = "2"  # Bump when the stored URL form changes
+
+
+def row_url(row):
+    return row[URL_COLUMN].strip() if len(row) > URL_COLUMN else ""
+
+
+class UrlIndex:
+    """Local index of URLs already logged to the applications sheet.
+
+    Only rows appended since the last sync are read from the sheet, and membership
+    checks are a primary-key lookup instead of a scan of the whole sheet. URLs are
+    stored in canonical form so tracking-param and ATS variants match. The URL of the
+    last synced row is kept too, so rows deleted from the sheet trigger a rebuild
+    instead of silently shifting the sync point past new rows.
+    """
+
+    def __init__(self, sheet_id, path=URL_INDEX_PATH, state_file=None):
+        self.sheet_id = sheet_id
+        self.state_file = state_file or StateFile(path)
+        self.state_file.restore()
+        self.conn = sqlite3.connect(path, check_same_thread=False)  # Shared by worker-mode threads under the sink lock
+        self.conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if self.get_meta("sheet_id") != sheet_id or self.get_meta("version") != INDEX_VERSION:
+            # A different tracker sheet or URL format: start over
+            self.set_meta("sheet_id", sheet_id)
+            self.set_meta("version", INDEX_VERSION)
+            self.reset()
+        self.conn.commit()
+
+    def reset(self):
+        self.conn.execute("DELETE FROM urls")
+        self.set_meta("synced_rows", "0")
+        self.set_meta("last_url", "")
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    @property
+    def synced_rows(self):
+        """Number of sheet rows (header included) already folded into the index"""
+        return int(self.get_meta("synced_rows") or 0)
+
+    def sync(self, sheet):
+        """Read only the rows appended since the last sync and add their URLs.
+
+        The last synced row is read again with them; if its URL changed, rows were deleted or
+        moved above it and the index is rebuilt from the whole sheet.
+        """
+        started = time.perf_counter()
+        synced_rows = self.synced_rows
+        first_row = max(1, synced_rows)
+        rows = sheet.get(f"A{first_row}:{LAST_COLUMN}")
+        if synced_rows:
+            if not rows or row_url(rows[0]) != (self.get_meta("last_url") or ""):
+                print(f"♻️ Row {synced_rows} no longer matches the index (rows were removed?), rebuilding it")
+                self.reset()
+                synced_rows, first_row = 0, 1
+                rows = sheet.get(f"A1:{LAST_COLUMN}")
+            else:
+                rows = rows[1:]
+
+        urls = [row_url(row) for offset, row in enumerate(rows) if first_row + offset > 1]  # Skip the header row
+        if rows:
+            self.set_meta("last_url", row_url(rows[-1]))
+        self.add([u for u in urls if u], synced_rows=synced_rows + len(rows))
+        print(f"📇 URL index synced {len(rows)} new rows in {time.perf_counter() - started:.2f}s "
+              f"({self.count()} URLs, {self.synced_rows} rows)")
+
+    def add(self, urls, synced_rows=None):
+        canonical_urls = {canonicalize_url(u) for u in urls}
+        self.conn.executemany("INSERT OR IGNORE INTO urls (url) VALUES (?)", ((u,) for u in canonical_urls if u))
+        if synced_rows is not None:
+            self.set_meta("synced_rows", synced_rows)
+        self.conn.commit()
+
+    def save(self):
+        """Persist the index so the next execution only reads rows appended after this one"""
+        self.state_file.save()
+
+    def __contains__(self, url):
+        row = self.conn.execute("SELECT 1 FROM urls WHERE url = ?", (canonicalize_url(url),)).fetchone()
+        return row is not None
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
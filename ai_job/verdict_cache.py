@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from canonical_url import canonicalize_url
+from state_files import StateFile
+
+# --- Configuration ---
+# SQLite table of verdicts keyed by canonical URL and resume hash
+VERDICT_CACHE_PATH = os.environ.get("VERDICT_CACHE_PATH", "/tmp/jobscout-verdicts.sqlite3")
+VERDICT_TTL_DAYS = float(os.environ.get("VERDICT_TTL_DAYS", 14))
+
+
+def resume_fingerprint(resume_text):
+    return hashlib.sha256(resume_text.encode("utf-8")).hexdigest()[:16]
+
+
+class VerdictCache:
+    """Remembers Gemini's match/no-match verdict per job and resume version.
+
+    Keys combine the canonical job URL with a hash of the resume, so editing the
+    resume invalidates every earlier verdict without an explicit flush. The database
+    is kept in the analyzer state store so verdicts carry over to later executions;
+    saving merges in whatever concurrent executions stored first.
+    """
+
+    def __init__(self, resume_text, path=VERDICT_CACHE_PATH, ttl_days=VERDICT_TTL_DAYS, state_file=None):
+        self.resume_hash = resume_fingerprint(resume_text)
+        self.ttl_seconds = ttl_days * 86400
+        self.state_file = state_file or StateFile(path)
+        self.state_file.restore()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()  # Chunks record verdicts from several threads
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "key TEXT PRIMARY KEY, resume_hash TEXT, is_match INTEGER, job_json TEXT, created_at REAL, weight REAL DEFAULT 1)"
+        )
+        if "weight" not in self.columns("main"):
+            self.conn.execute("ALTER TABLE verdicts ADD COLUMN weight REAL DEFAULT 1")
+        evicted = self.conn.execute(
+            "DELETE FROM verdicts WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        self.conn.commit()
+        if evicted:
+            print(f"🧾 Evicted {evicted} expired verdicts")
+        self.hits = 0
+        self.misses = 0
+        self.sample_weights = {}
+
+    def columns(self, schema):
+        return {row[1] for row in self.conn.execute(f"PRAGMA {schema}.table_info(verdicts)")}
+
+    def set_sample_weights(self, weights):
+        """Weights (by canonical URL) of audit-sampled jobs, stored with their verdicts for the pre-filter report"""
+        self.sample_weights = weights
+
+    def key_for(self, job):
+        identity = canonicalize_url(job.get("url", ""))
+        return hashlib.sha256(f"{identity}|{self.resume_hash}".encode("utf-8")).hexdigest()
+
+    def partition(self, jobs):
+        """Split jobs into (cached good matches, jobs that still need the model)"""
+        cached_matches, misses = [], []
+        for job in jobs:
+            row = self.conn.execute("SELECT is_match FROM verdicts WHERE key = ?", (self.key_for(job),)).fetchone()
+            if row is None:
+                misses.append(job)
+            elif row[0]:
+                cached_matches.append(job)
+        self.hits += len(jobs) - len(misses)
+        self.misses += len(misses)
+
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        print(f"🧾 Verdict cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), "
+              f"{len(cached_matches)} cached matches")
+        return cached_matches, misses
+
+    def record(self, jobs, matches):
+        """Store a verdict for every job the model judged; matches are identified by canonical URL"""
+        matched = {canonicalize_url(m.get("url", "")) for m in matches}
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO verdicts (key, resume_hash, is_match, job_json, created_at, weight) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (self.key_for(job), self.resume_hash, int(canonicalize_url(job.get("url", "")) in matched),
+                     json.dumps(job), now, self.sample_weights.get(canonicalize_url(job.get("url", "")), 1))
+                    for job in jobs
+                ],
+            )
+            self.conn.commit()
+
+    def recorded_verdicts(self):
+        """All unexpired (job, is_match, sample weight) triples for the current resume"""
+        rows = self.conn.execute(
+            "SELECT job_json, is_match, weight FROM verdicts WHERE resume_hash = ?", (self.resume_hash,)
+        ).fetchall()
+        return [(json.loads(job_json), bool(is_match), weight or 1) for job_json, is_match, weight in rows]
+
+    def merge(self, remote_path):
+        """Fold in verdicts another execution saved, keeping the newer one per key"""
+        with self.lock:
+            self.conn.execute("ATTACH DATABASE ? AS remote", (remote_path,))
+            try:
+                # Copies saved before sample weights were recorded have no weight column
+                weight = "r.weight" if "weight" in self.columns("remote") else "1"
+                merged = self.conn.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, resume_hash, is_match, job_json, created_at, weight) "
+                    f"SELECT r.key, r.resume_hash, r.is_match, r.job_json, r.created_at, {weight} FROM remote.verdicts r "
+                    "LEFT JOIN verdicts l ON l.key = r.key WHERE l.key IS NULL OR r.created_at > l.created_at"
+                ).rowcount
+                self.conn.commit()
+            finally:
+                self.conn.execute("DETACH DATABASE remote")
+        if merged:
+            print(f"🧾 Merged {merged} verdicts saved by other executions")
+
+    def save(self):
+        """Persist the cache so later executions get hits for jobs judged here"""
+        self.state_file.save(merge=self.merge)
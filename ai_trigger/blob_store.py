@@ -0,0 +1,151 @@
+import os
+import fcntl
+import hashlib
+from contextlib import contextmanager
+
+
+class LocalBlobStore:
+    """Stores blobs as files under a root directory (local runs and tests)"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path_for(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def read(self, key):
+        """Return the blob's bytes, or None if it does not exist"""
+        try:
+            with open(self.path_for(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open_read(self, key):
+        """Open the blob as a binary file object for streaming reads"""
+        return open(self.path_for(key), "rb")
+
+    def write(self, key, data):
+        """Write the blob atomically so readers never see a partial file"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def locked(self, key):
+        """Serialize compare-and-swap updates of one key across processes"""
+        lock_path = f"{self.path_for(key)}.lock"
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def create(self, key, data):
+        """Write the blob only if it does not exist yet. Returns True if this call created it."""
+        with self.locked(key):
+            if os.path.exists(self.path_for(key)):
+                return False
+            self.write(key, data)
+            return True
+
+    def read_with_token(self, key):
+        """Return (data, token) where token identifies this version for replace(), or (None, None)"""
+        data = self.read(key)
+        if data is None:
+            return None, None
+        return data, hashlib.sha256(data).hexdigest()
+
+    def replace(self, key, data, token):
+        """Overwrite the blob only if it is still the version identified by token"""
+        with self.locked(key):
+            _, current_token = self.read_with_token(key)
+            if current_token != token:
+                return False
+            self.write(key, data)
+            return True
+
+
+class GCSBlobStore:
+    """Stores blobs as objects in a Cloud Storage bucket"""
+
+    def __init__(self, bucket_name, prefix=""):
+        from google.cloud import storage  # Only needed when a gs:// store is configured
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+
+    def blob_for(self, key):
+        name = f"{self.prefix}/{key}" if self.prefix else key
+        return self.bucket.blob(name)
+
+    def read(self, key):
+        from google.api_core import exceptions as gax_exceptions
+        try:
+            return self.blob_for(key).download_as_bytes()
+        except gax_exceptions.NotFound:
+            return None
+
+    def open_read(self, key):
+        """Open the object as a binary file object that downloads in chunks"""
+        return self.blob_for(key).open("rb")
+
+    def write(self, key, data):
+        self.blob_for(key).upload_from_string(data)
+
+    def delete(self, key):
+        from google.api_core import exceptions as gax_exceptions
+        try:
+            self.blob_for(key).delete()
+        except gax_exceptions.NotFound:
+            pass
+
+    def create(self, key, data):
+        """Write the object only if it does not exist yet. Returns True if this call created it."""
+        from google.api_core import exceptions as gax_exceptions
+        try:
+            self.blob_for(key).upload_from_string(data, if_generation_match=0)
+            return True
+        except gax_exceptions.PreconditionFailed:
+            return False
+
+    def read_with_token(self, key):
+        """Return (data, generation) for replace(), or (None, None)"""
+        from google.api_core import exceptions as gax_exceptions
+        blob = self.blob_for(key)
+        try:
+            data = blob.download_as_bytes()
+        except gax_exceptions.NotFound:
+            return None, None
+        return data, blob.generation
+
+    def replace(self, key, data, token):
+        """Overwrite the object only if its generation still matches token"""
+        from google.api_core import exceptions as gax_exceptions
+        try:
+            self.blob_for(key).upload_from_string(data, if_generation_match=token)
+            return True
+        except (gax_exceptions.PreconditionFailed, gax_exceptions.NotFound):
+            return False
+
+
+def get_blob_store(uri):
+    """Build a store from a URI: gs://bucket/prefix, file:///path or a plain path. Returns None if unset."""
+    if not uri:
+        return None
+    if uri.startswith("gs://"):
+        bucket_name, _, prefix = uri[len("gs://"):].partition("/")
+        return GCSBlobStore(bucket_name, prefix)
+    if uri.startswith("file://"):
+        uri = uri[len("file://"):]
+    return LocalBlobStore(uri)
@@ -0,0 +1,62 @@
+import re
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# Query parameters that only say where a click came from
+TRACKING_PARAMS = {
+    "gh_src", "source", "src", "ref", "referrer", "refid", "trk", "trackingid", "lever-source",
+    "lever-origin", "iis", "iisn", "ccuid", "gclid", "fbclid", "mc_cid", "mc_eid", "jobright",
+}
+
+
+def canonicalize_url(url):
+    """Normalize a job URL so the same posting maps to one key across tracking params and ATS variants"""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.netloc.lower().split("@")[-1].split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    path = re.sub(r"/+", "/", parts.path).rstrip("/")
+    segments = [s for s in path.split("/") if s]
+    query = dict(parse_qsl(parts.query, keep_blank_values=False))
+
+    # Greenhouse: boards / job-boards / embed links and career sites with ?gh_jid= share one job id
+    if "gh_jid" in query:
+        return f"greenhouse:{query['gh_jid']}"
+    if host.endswith("greenhouse.io"):
+        if "token" in query:
+            return f"greenhouse:{query['token']}"
+        if "jobs" in segments and segments.index("jobs") + 1 < len(segments):
+            return f"greenhouse:{segments[segments.index('jobs') + 1]}"
+
+    # Lever: jobs.lever.co/<company>/<uuid>[/apply]
+    if host.endswith("lever.co") and len(segments) >= 2:
+        return f"lever:{segments[1].lower()}"
+
+    # Ashby: jobs.ashbyhq.com/<company>/<uuid>[/application]
+    if host.endswith("ashbyhq.com") and len(segments) >= 2:
+        return f"ashby:{segments[1].lower()}"
+
+    # Workday: <tenant>.wdN.myworkdayjobs.com/.../job/<location>/<slug>_<REQ-ID>[/apply/...]
+    if host.endswith("myworkdayjobs.com") and "job" in segments:
+        tenant = host.split(".")[0]
+        for segment in segments[segments.index("job") + 1:]:
+            match = re.search(r"_([A-Za-z0-9-]+)$", segment)
+            if match:
+                return f"workday:{tenant}:{match.group(1).upper()}"
+
+    # SmartRecruiters: jobs.smartrecruiters.com/<Company>/<id>-<slug>
+    if host.endswith("smartrecruiters.com") and len(segments) >= 2:
+        match = re.match(r"(\d+)", segments[1])
+        if match:
+            return f"smartrecruiters:{match.group(1)}"
+
+    kept = sorted(
+        (k, v) for k, v in query.items()
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    canonical = f"{host}{path}"
+    if kept:
+        canonical += f"?{urlencode(kept)}"
+    return canonical
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from canonical_url import canonicalize_url
+
+# --- Configuration ---
+DEDUP_TTL_HOURS = float(os.environ.get("DEDUP_TTL_HOURS", 24))
+
+
+def job_identity(job):
+    """The canonical URL, or company and title for a job without one"""
+    url = canonicalize_url(job.get("url", ""))
+    if url:
+        return url
+    return f"{job.get('companyName', '')}|{job.get('positionName', '')}".strip().lower()
+
+
+def content_key(jobs):
+    """Hash of the set of jobs in a batch, stable across redeliveries and re-publishes.
+
+    Publishers build batches in no particular order (and may repeat a job), so the key
+    covers the sorted, distinct job identities rather than the payload as sent.
+    """
+    identities = sorted({job_identity(job) for job in jobs})
+    payload = json.dumps(identities, separators=(",", ":"))
+    return f"content-{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def message_key(message_id):
+    return f"message-{message_id}"
+
+
+class DedupStore:
+    """Remembers which Pub/Sub messages and batch payloads already started an analyzer run.
+
+    Keys live in memory and, when a blob store is given, under dedup/ in the store so
+    every trigger instance sees them. A key is only written after its launch succeeded;
+    while a launch is in flight the same key is held locally and a concurrent redelivery
+    is told to come back later rather than starting a second run.
+    """
+
+    def __init__(self, store=None, ttl_seconds=DEDUP_TTL_HOURS * 3600):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.expires = {}
+        self.in_flight = set()
+        self.lock = threading.Lock()
+        self.suppressed = {"message_id": 0, "content": 0}
+
+    def seen(self, key):
+        now = time.time()
+        with self.lock:
+            if self.expires.get(key, 0) > now:
+                return True
+        if self.store is None:
+            return False
+        try:
+            data = self.store.read(f"dedup/{key}")
+        except Exception as e:
+            print(f"⚠️ Dedup store read failed for {key}, treating as new: {e}")
+            return False
+        if data is None:
+            return False
+        expires_at = json.loads(data).get("expires_at", 0)
+        if expires_at <= now:
+            self.delete_expired([key])
+            return False
+        with self.lock:
+            self.expires[key] = expires_at
+        return True
+
+    def delete_expired(self, keys):
+        """Remove expired keys from the store; a bucket lifecycle rule catches the ones never read again"""
+        for key in keys:
+            try:
+                self.store.delete(f"dedup/{key}")
+            except Exception as e:
+                print(f"⚠️ Dedup store delete failed for {key}: {e}")
+
+    def claim(self, message_id, jobs):
+        """Returns (status, keys): "new" with the keys to commit after launching, "duplicate",
+        or "in_flight" when the same message or payload is being launched right now"""
+        keys = {"message_id": message_key(message_id), "content": content_key(jobs)}
+        for reason, key in keys.items():
+            if self.seen(key):
+                with self.lock:
+                    self.suppressed[reason] += 1
+                return "duplicate", None
+        with self.lock:
+            if any(key in self.in_flight for key in keys.values()):
+                return "in_flight", None
+            self.in_flight.update(keys.values())
+        return "new", list(keys.values())
+
+    def commit(self, keys):
+        """Record keys whose launch succeeded"""
+        expires_at = time.time() + self.ttl_seconds
+        with self.lock:
+            now = time.time()
+            expired = [k for k, t in self.expires.items() if t <= now]
+            for k in expired:
+                del self.expires[k]
+            self.expires.update((key, expires_at) for key in keys)
+            self.in_flight.difference_update(keys)
+        if self.store is not None:
+            # Keys this instance wrote or read are swept from the store once they expire
+            self.delete_expired(expired)
+            for key in keys:
+                try:
+                    self.store.write(f"dedup/{key}", json.dumps({"expires_at": expires_at}).encode("utf-8"))
+                except Exception as e:
+                    print(f"⚠️ Dedup store write failed for {key}: {e}")
+
+    def release(self, keys):
+        """Forget in-flight keys whose launch failed, so the redelivery can try again"""
+        with self.lock:
+            self.in_flight.difference_update(keys)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "suppressed_duplicates": sum(self.suppressed.values()),
+                "suppressed_by_message_id": self.suppressed["message_id"],
+                "suppressed_by_content": self.suppressed["content"],
+            }
@@ -1,20 +1,85 @@
 import os
 import json
+import gzip
+import time
 import base64
 import traceback
-import uuid
-from flask import Flask, request
+from datetime import datetime
+from flask import Flask, request, jsonify
 from google.cloud import run_v2
+from blob_store import get_blob_store
+from micro_batcher import MicroBatcher
+from dedup_store import DedupStore
 
 app = Flask(__name__)
 
 GCP_PROJECT = os.environ.get("GCLOUD_PROJECT")
 GCP_LOCATION = os.environ.get("REGION", "us-central1")
 AI_JOB_NAME = os.environ.get("AI_JOB_NAME", "ai-analyzer-job")
+# When set, batches are written here and the analyzer gets a reference instead of the jobs in argv
+BATCH_STORE_URI = os.environ.get("BATCH_STORE_URI")
+BATCH_STORE = get_blob_store(BATCH_STORE_URI)
+# Shared record of launched messages/payloads; defaults to the batch store so all instances agree
+DEDUP_STORE_URI = os.environ.get("DEDUP_STORE_URI", BATCH_STORE_URI)
+DEDUP = DedupStore(get_blob_store(DEDUP_STORE_URI))
+JOBS_CLIENT = None
+
+
+def get_jobs_client():
+    """One Run API client per process, reused across requests."""
+    global JOBS_CLIENT
+    if JOBS_CLIENT is None:
+        JOBS_CLIENT = run_v2.JobsClient()
+    return JOBS_CLIENT
+
+
+def batch_args(jobs, batch_id):
+    """Container args for one batch: a claim-check reference when a batch store is configured"""
+    if BATCH_STORE is None:
+        return ["--jobs-json", json.dumps(jobs)]
+    key = f"batches/{batch_id}.json.gz"
+    payload = gzip.compress(json.dumps(jobs).encode("utf-8"))
+    BATCH_STORE.write(key, payload)
+    print(f"📦 Stored {len(jobs)} jobs ({len(payload)} bytes compressed) at {key}")
+    return ["--jobs-ref", key]
+
+
+def launch_analyzer(jobs, batch_id):
+    """Starts one AI Analyzer execution for a coalesced batch; raises if it could not be started"""
+    started = time.perf_counter()
+    job_path = f"projects/{GCP_PROJECT}/locations/{GCP_LOCATION}/jobs/{AI_JOB_NAME}"
+
+    # Pass the jobs (or a reference to them) as command arguments
+    args = batch_args(jobs, batch_id) + ["--batch-id", batch_id]
+
+    run_job_request = run_v2.RunJobRequest(
+        name=job_path,
+        overrides=run_v2.RunJobRequest.Overrides(
+            container_overrides=[
+                run_v2.RunJobRequest.Overrides.ContainerOverride(
+                    args=args
+                )
+            ]
+        )
+    )
+
+    get_jobs_client().run_job(request=run_job_request)
+    print(f"✅ AI Analyzer Job {batch_id} started for {len(jobs)} jobs in {time.perf_counter() - started:.2f}s")
+
+
+BATCHER = MicroBatcher(launch_analyzer)
+
+
+def parse_publish_time(value):
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
 
 @app.route("/", methods=["POST"])
 def trigger_ai_analyzer():
-    """Receives Pub/Sub message and triggers AI Analyzer job"""
+    """Receives Pub/Sub message and adds its jobs to the current analyzer batch"""
     envelope = request.get_json()
     if not envelope or "message" not in envelope:
         return "Bad Request", 400
@@ -26,45 +91,43 @@ def trigger_ai_analyzer():
         data_str = base64.b64decode(pubsub_message["data"]).decode("utf-8")
         data = json.loads(data_str)
         jobs_to_process = data.get("jobs", [])
-        
-        if not jobs_to_process:
-            print(f"📝 Message {message_id}: Empty batch received.")
-            return "Empty batch received.", 200
-
-        print(f"🚀 Message {message_id}: Triggering AI Analyzer Job for {len(jobs_to_process)} jobs")
-        
-        # Generate a unique batch ID
-        batch_id = f"batch-{uuid.uuid4().hex[:8]}"
-        
-        client = run_v2.JobsClient()
-        job_path = f"projects/{GCP_PROJECT}/locations/{GCP_LOCATION}/jobs/{AI_JOB_NAME}"
-        
-        # Pass jobs as command arguments
-        args = [
-            "--jobs-json", json.dumps(jobs_to_process),
-            "--batch-id", batch_id
-        ]
-        
-        run_job_request = run_v2.RunJobRequest(
-            name=job_path,
-            overrides=run_v2.RunJobRequest.Overrides(
-                container_overrides=[
-                    run_v2.RunJobRequest.Overrides.ContainerOverride(
-                        args=args
-                    )
-                ]
-            )
-        )
-        
-        operation = client.run_job(request=run_job_request)
-        print(f"✅ Message {message_id}: AI Analyzer Job {batch_id} started successfully")
-        
-        return f"AI Analyzer Job triggered: {batch_id}", 200
-        
     except Exception as e:
+        # A malformed message will never parse; acknowledge it instead of looping on redelivery
+        print(f"❌ Message {message_id}: Could not parse payload: {e}")
+        return "Malformed message dropped.", 200
+
+    if not jobs_to_process:
+        print(f"📝 Message {message_id}: Empty batch received.")
+        return "Empty batch received.", 200
+
+    # A redelivery, or the same payload published twice, is acknowledged without launching anything
+    status, dedup_keys = DEDUP.claim(message_id, jobs_to_process)
+    if status == "duplicate":
+        print(f"🔁 Message {message_id}: Duplicate delivery suppressed.")
+        return "Duplicate message ignored.", 200
+    if status == "in_flight":
+        # Not acknowledged: if the launch in progress fails, this delivery must still be able to run
+        print(f"⏳ Message {message_id}: Same batch is being launched, asking Pub/Sub to retry.")
+        return "Duplicate launch in progress.", 429
+
+    print(f"📥 Message {message_id}: Queued {len(jobs_to_process)} jobs for the next AI Analyzer batch")
+    try:
+        # Blocks until the coalesced execution has started, so the ack means the work is launched
+        batch_id = BATCHER.add(jobs_to_process, message_id, parse_publish_time(pubsub_message.get("publishTime")))
+    except Exception as e:
+        DEDUP.release(dedup_keys)
         print(f"❌ Message {message_id}: Error triggering AI job: {e}")
         traceback.print_exc()
-        return "Error processed and logged.", 200  # Return 200 to prevent retries
+        return "AI Analyzer Job could not be started.", 500  # Pub/Sub redelivers the message
+    DEDUP.commit(dedup_keys)
+    return f"AI Analyzer Job triggered: {batch_id}", 200
+
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    """Executions launched, messages coalesced, publish-to-launch latency and suppressed duplicates"""
+    return jsonify({**BATCHER.stats(), **DEDUP.stats()})
+
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
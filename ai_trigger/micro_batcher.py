@@ -0,0 +1,112 @@
+import os
+import time
+import uuid
+import threading
+from collections import deque
+
+# --- Configuration ---
+# Messages arriving within this many seconds of the first one share an analyzer execution
+BATCH_WINDOW_SECONDS = float(os.environ.get("BATCH_WINDOW_SECONDS", 20))
+# A window is launched early once it holds this many jobs
+BATCH_MAX_JOBS = int(os.environ.get("BATCH_MAX_JOBS", 150))
+
+
+class PendingBatch:
+    def __init__(self):
+        self.batch_id = f"batch-{uuid.uuid4().hex[:8]}"
+        self.jobs = []
+        self.message_ids = []
+        self.publish_times = []
+        self.opened_at = time.time()
+        self.launched = threading.Event()
+        self.error = None
+
+
+class MicroBatcher:
+    """Coalesces Pub/Sub pushes into one analyzer execution per time window or job count.
+
+    Each request blocks in add() until the execution carrying its jobs has started (or
+    failed to start), so a message is only acknowledged once its work is safely launched.
+    """
+
+    def __init__(self, launch, window_seconds=BATCH_WINDOW_SECONDS, max_jobs=BATCH_MAX_JOBS):
+        self.launch = launch
+        self.window_seconds = window_seconds
+        self.max_jobs = max_jobs
+        self.lock = threading.Lock()
+        self.pending = None
+        self.launch_times = deque()
+        self.executions = 0
+        self.failed_launches = 0
+        self.messages = 0
+        self.jobs = 0
+        self.latencies = []
+
+    def add(self, jobs, message_id, publish_time=None):
+        """Queue one message's jobs and wait for their launch. Returns the batch id or raises the launch error."""
+        with self.lock:
+            if self.pending is None:
+                self.pending = PendingBatch()
+                if self.window_seconds > 0:
+                    timer = threading.Timer(self.window_seconds, self.flush, args=(self.pending,))
+                    timer.daemon = True
+                    timer.start()
+            batch = self.pending
+            batch.jobs.extend(jobs)
+            batch.message_ids.append(message_id)
+            batch.publish_times.append(publish_time or time.time())
+            full = self.window_seconds <= 0 or len(batch.jobs) >= self.max_jobs
+
+        if full:
+            self.flush(batch)
+        # Bounded wait: a launch that hangs past the request deadline is reported as a failure
+        if not batch.launched.wait(timeout=self.window_seconds + 30):
+            raise TimeoutError(f"Batch {batch.batch_id} was not launched in time")
+        if batch.error is not None:
+            raise batch.error
+        return batch.batch_id
+
+    def flush(self, batch):
+        """Launch the batch if it is still the open one (the timer and a full window may race)"""
+        with self.lock:
+            if self.pending is not batch:
+                return
+            self.pending = None
+
+        try:
+            self.launch(batch.jobs, batch.batch_id)
+        except Exception as e:
+            batch.error = e
+        launched_at = time.time()
+        with self.lock:
+            if batch.error is None:
+                self.executions += 1
+                self.launch_times.append(launched_at)
+                self.messages += len(batch.message_ids)
+                self.jobs += len(batch.jobs)
+                self.latencies.extend(launched_at - t for t in batch.publish_times)
+                self.latencies = self.latencies[-1000:]
+            else:
+                self.failed_launches += 1
+        print(f"🧺 Batch {batch.batch_id}: {len(batch.message_ids)} messages, {len(batch.jobs)} jobs, "
+              f"window open {launched_at - batch.opened_at:.1f}s"
+              + (f", launch failed: {batch.error}" if batch.error else ""))
+        batch.launched.set()
+
+    def stats(self):
+        with self.lock:
+            while self.launch_times and self.launch_times[0] < time.time() - 86400:
+                self.launch_times.popleft()
+            latencies = sorted(self.latencies)
+            return {
+                "executions": self.executions,
+                "failed_launches": self.failed_launches,
+                "messages": self.messages,
+                "jobs": self.jobs,
+                "messages_per_execution": round(self.messages / self.executions, 2) if self.executions else 0,
+                "executions_last_24h": len(self.launch_times),
+                "publish_to_launch_p50_seconds": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                "publish_to_launch_max_seconds": round(latencies[-1], 2) if latencies else None,
+                "window_seconds": self.window_seconds,
+                "max_jobs": self.max_jobs,
+            }
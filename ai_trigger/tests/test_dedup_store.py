@@ -0,0 +1,63 @@
+import json
+import time
+
+from dedup_store import DedupStore, content_key
+from blob_store import LocalBlobStore
+
+
+def job(i, url_suffix=""):
+    return {"companyName": f"Acme {i}", "positionName": "Software Engineer",
+            "url": f"https://jobs.lever.co/acme/{i}{url_suffix}", "scrapedAt": time.time()}
+
+
+def test_content_key_ignores_order_repeats_and_url_variants():
+    jobs = [job(1), job(2)]
+    assert content_key(jobs) == content_key(list(reversed(jobs)))
+    assert content_key(jobs) == content_key([job(2, "?lever-source=jobright"), job(1), job(1)])
+    assert content_key(jobs) != content_key([job(1), job(3)])
+
+
+def test_jobs_without_a_url_are_keyed_by_company_and_title():
+    jobs = [{"companyName": "Acme", "positionName": "Engineer"}, {"companyName": "Globex", "positionName": "Engineer"}]
+    assert content_key(jobs) == content_key(list(reversed(jobs)))
+    assert content_key(jobs[:1]) != content_key(jobs[1:])
+
+
+def test_a_republished_batch_in_another_order_is_a_duplicate(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    first = DedupStore(store)
+    status, keys = first.claim("m-1", [job(1), job(2)])
+    assert status == "new"
+    first.commit(keys)
+
+    other_instance = DedupStore(store)
+    assert other_instance.claim("m-2", [job(2), job(1)]) == ("duplicate", None)
+    assert other_instance.stats()["suppressed_by_content"] == 1
+
+
+def test_expired_keys_are_deleted_from_the_store(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    dedup = DedupStore(store, ttl_seconds=-1)  # Everything it commits is already expired
+    status, keys = dedup.claim("m-1", [job(1)])
+    dedup.commit(keys)
+    stored = [f"dedup/{key}" for key in keys]
+    assert all(json.loads(store.read(key))["expires_at"] < time.time() for key in stored)
+
+    # Read again by another instance: reported as new and removed
+    other_instance = DedupStore(store)
+    assert other_instance.claim("m-1", [job(1)])[0] == "new"
+    assert all(store.read(key) is None for key in stored)
+
+
+def test_commit_sweeps_keys_that_expired_in_memory(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    dedup = DedupStore(store, ttl_seconds=-1)
+    _, old_keys = dedup.claim("m-1", [job(1)])
+    dedup.commit(old_keys)
+
+    dedup.ttl_seconds = 3600
+    _, new_keys = dedup.claim("m-2", [job(2)])
+    dedup.commit(new_keys)
+
+    assert all(store.read(f"dedup/{key}") is None for key in old_keys)
+    assert all(store.read(f"dedup/{key}") is not None for key in new_keys)
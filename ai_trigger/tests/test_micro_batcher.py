@@ -0,0 +1,113 @@
+import json
+import time
+import base64
+import threading
+import pytest
+
+from micro_batcher import MicroBatcher
+from dedup_store import DedupStore
+
+
+def job(i):
+    return {"companyName": f"Acme {i}", "positionName": "Software Engineer", "url": f"https://jobs.lever.co/acme/{i}"}
+
+
+class Launches:
+    """Records launched batches; each launch waits on `release` until the test lets it through"""
+
+    def __init__(self, blocked=False):
+        self.batches = []
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+
+    def __call__(self, jobs, batch_id):
+        self.release.wait(timeout=5)
+        self.batches.append((batch_id, list(jobs)))
+
+
+def add_in_background(batcher, jobs, message_id, results):
+    def run():
+        results[message_id] = batcher.add(jobs, message_id)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_messages_within_the_window_share_one_launch():
+    launches = Launches()
+    batcher = MicroBatcher(launches, window_seconds=0.3, max_jobs=100)
+    results = {}
+    started = time.monotonic()
+    threads = [add_in_background(batcher, [job(i)], f"m-{i}", results) for i in range(3)]
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert time.monotonic() - started >= 0.3
+    assert len(launches.batches) == 1
+    batch_id, jobs = launches.batches[0]
+    assert sorted(j["url"] for j in jobs) == [job(i)["url"] for i in range(3)]
+    assert set(results.values()) == {batch_id}
+    assert batcher.stats()["messages_per_execution"] == 3
+
+
+def test_a_full_window_is_launched_without_waiting_for_the_timer():
+    launches = Launches()
+    batcher = MicroBatcher(launches, window_seconds=30, max_jobs=3)
+    results = {}
+    started = time.monotonic()
+    first = add_in_background(batcher, [job(1), job(2)], "m-1", results)
+    time.sleep(0.05)
+    assert launches.batches == []
+
+    batch_id = batcher.add([job(3)], "m-2")
+    first.join(timeout=5)
+    assert time.monotonic() - started < 5
+    assert launches.batches == [(batch_id, [job(1), job(2), job(3)])]
+    assert results["m-1"] == batch_id
+
+    # The next message opens a new window
+    batcher.add([job(4)] * 3, "m-3")
+    assert len(launches.batches) == 2
+
+
+def test_a_failed_launch_is_raised_to_every_waiting_message():
+    def launch(jobs, batch_id):
+        raise RuntimeError("Run API unavailable")
+    batcher = MicroBatcher(launch, window_seconds=0, max_jobs=10)
+    with pytest.raises(RuntimeError, match="unavailable"):
+        batcher.add([job(1)], "m-1")
+    assert batcher.stats()["failed_launches"] == 1
+
+
+def push(client, message_id, jobs):
+    data = base64.b64encode(json.dumps({"jobs": jobs}).encode("utf-8")).decode("ascii")
+    return client.post("/", json={"message": {"messageId": message_id, "data": data}})
+
+
+@pytest.fixture
+def service(monkeypatch):
+    job_trigger_service = pytest.importorskip("job_trigger_service")
+    launches = Launches(blocked=True)
+    monkeypatch.setattr(job_trigger_service, "BATCHER", MicroBatcher(launches, window_seconds=0, max_jobs=100))
+    monkeypatch.setattr(job_trigger_service, "DEDUP", DedupStore())
+    return job_trigger_service.app.test_client(), launches
+
+
+def test_a_duplicate_of_an_in_flight_launch_gets_a_429(service):
+    client, launches = service
+    responses = {}
+    first = threading.Thread(target=lambda: responses.update(first=push(client, "m-1", [job(1), job(2)])))
+    first.start()
+    time.sleep(0.1)  # The first push is now waiting on its launch
+
+    # Same payload republished under another message id: not acknowledged, so Pub/Sub retries it
+    retried = push(client, "m-2", [job(2), job(1)])
+    assert retried.status_code == 429
+
+    launches.release.set()
+    first.join(timeout=5)
+    assert responses["first"].status_code == 200
+    # Once the launch succeeded, the retry is acknowledged as a duplicate and nothing else launches
+    assert push(client, "m-2", [job(2), job(1)]).status_code == 200
+    assert len(launches.batches) == 1
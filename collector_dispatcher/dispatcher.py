@@ -1,4 +1,5 @@
 import os
+import uuid
 import traceback
 from flask import Flask
 from google.cloud import run_v2
@@ -9,6 +10,9 @@ app = Flask(__name__)
 GCP_PROJECT = os.environ.get("GCLOUD_PROJECT")
 GCP_LOCATION = os.environ.get("SERVICE_REGION")
 JOB_NAME = os.environ.get("COLLECTOR_JOB_NAME")
+# "static" runs the fixed top-half/bottom-half split, "queue" runs COLLECTOR_WORKERS tasks sharing a lease queue
+SHARD_MODE = os.environ.get("SHARD_MODE", "static").lower()
+COLLECTOR_WORKERS = int(os.environ.get("COLLECTOR_WORKERS", 2))
 
 @app.route("/", methods=["GET"])
 def trigger_run_job():
@@ -18,6 +22,9 @@ def trigger_run_job():
         client = run_v2.JobsClient()
         
         job_path = f"projects/{GCP_PROJECT}/locations/{GCP_LOCATION}/jobs/{JOB_NAME}"
+
+        if SHARD_MODE == "queue":
+            return trigger_queue_workers(client, job_path)
         
         # Define the job instances to run
         job_configs = [
@@ -76,5 +83,34 @@ def trigger_run_job():
         traceback.print_exc()
         return "Error triggering jobs.", 500
 
+def trigger_queue_workers(client, job_path):
+    """Starts one execution with COLLECTOR_WORKERS tasks that pull card leases from a shared queue."""
+    run_id = f"run-{uuid.uuid4().hex[:8]}"
+    print(f"🚀 Starting {COLLECTOR_WORKERS} queue workers for {run_id}")
+
+    env_vars = [
+        run_v2.EnvVar(name="GCLOUD_PROJECT", value=GCP_PROJECT),
+        run_v2.EnvVar(name="COLLECTOR_JOB_NAME", value=JOB_NAME),
+        run_v2.EnvVar(name="SHARD_MODE", value="queue"),
+        run_v2.EnvVar(name="RUN_ID", value=run_id),
+        run_v2.EnvVar(name="INSTANCE_NAME", value="queue-worker"),
+    ]
+
+    request = run_v2.RunJobRequest(
+        name=job_path,
+        overrides=run_v2.RunJobRequest.Overrides(
+            container_overrides=[
+                run_v2.RunJobRequest.Overrides.ContainerOverride(
+                    env=env_vars
+                )
+            ],
+            task_count=COLLECTOR_WORKERS
+        )
+    )
+
+    client.run_job(request=request)
+    print(f"✅ {run_id} started with {COLLECTOR_WORKERS} tasks")
+    return f"Successfully triggered {COLLECTOR_WORKERS} queue workers ({run_id}).", 200
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+import threading
+
+# --- Configuration ---
+# full: the original headful-sized Chrome; lean: no images/media/fonts/trackers, eager loads, fewer renderers
+BROWSER_PROFILE = os.environ.get("BROWSER_PROFILE", "full").lower()
+RENDERER_PROCESS_LIMIT = int(os.environ.get("RENDERER_PROCESS_LIMIT", 2))
+RESOURCE_SAMPLE_SECONDS = float(os.environ.get("RESOURCE_SAMPLE_SECONDS", 2))
+
+BLOCKED_URL_PATTERNS = [
+    # Images, media and fonts
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.bmp",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # Analytics, ads and session-replay trackers
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*segment.io*",
+    "*segment.com*", "*mixpanel.com*", "*amplitude.com*", "*intercom.io*", "*fullstory.com*",
+    "*linkedin.com/px*", "*ads.linkedin.com*", "*bat.bing.com*", "*tiktok.com*", "*sentry.io*",
+] + [p.strip() for p in os.environ.get("BROWSER_EXTRA_BLOCKED", "").split(",") if p.strip()]
+
+NAVIGATION_TIMING_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+return { domContentLoaded: nav.domContentLoadedEventEnd, load: nav.loadEventEnd, transferSize: nav.transferSize };
+"""
+
+
+def apply_profile(options, profile=BROWSER_PROFILE):
+    """Add the lean profile's flags to Chrome options; the full profile is left unchanged"""
+    if profile != "lean":
+        options.add_argument("--window-size=1920,1080")
+        return
+    options.add_argument("--window-size=1280,800")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument(f"--renderer-process-limit={RENDERER_PROCESS_LIMIT}")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--disable-sync")
+    options.add_argument("--disable-default-apps")
+    options.add_argument("--mute-audio")
+    options.add_argument("--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    # Return from get() once the DOM is ready instead of waiting for every subresource
+    options.page_load_strategy = "eager"
+
+
+def block_resources(driver, profile=BROWSER_PROFILE, quiet=False):
+    """Block heavy and tracking requests in the current window through the DevTools protocol.
+
+    chromedriver sends CDP commands to the window it is switched to, so each popup the
+    scraper switches to starts unblocked and needs its own call.
+    """
+    if profile != "lean":
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        if not quiet:
+            print(f"🪶 Lean browser profile: blocking {len(BLOCKED_URL_PATTERNS)} URL patterns")
+    except Exception as e:
+        print(f"⚠️ Could not set blocked URLs: {e}")
+
+
+def navigation_timing(driver):
+    """DOMContentLoaded/load times (ms) and transfer size of the current page, or None"""
+    try:
+        return driver.execute_script(NAVIGATION_TIMING_JS)
+    except Exception:
+        return None
+
+
+class ResourceMonitor:
+    """Samples the RSS of this process plus its chromedriver/Chrome children and keeps the peak"""
+
+    def __init__(self, interval=RESOURCE_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sample(self, process):
+        import psutil
+        total, count = 0, 0
+        for proc in [process] + process.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+                count += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        if total > self.peak_rss:
+            self.peak_rss, self.peak_processes = total, count
+
+    def start(self):
+        try:
+            import psutil
+        except ImportError:
+            print("⚠️ psutil is not installed, peak memory will not be reported")
+            return
+        process = psutil.Process()
+
+        def loop():
+            while not self.stop_event.wait(self.interval):
+                self.sample(process)
+
+        self.sample(process)
+        self.thread = threading.Thread(target=loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread:
+            self.stop_event.set()
+            self.thread.join()
+            print(f"🧠 Peak RSS ({BROWSER_PROFILE} profile): {self.peak_rss / 2**20:.0f} MiB "
+                  f"across {self.peak_processes} processes")
+
+
+def report_page_loads(page_loads):
+    """Print median and max page-load times recorded by the scraper"""
+    timings = [t for t in page_loads if t]
+    if not timings:
+        return
+    for field in ("domContentLoaded", "load"):
+        values = sorted(t[field] for t in timings if t.get(field))
+        if values:
+            print(f"⏱️ Page {field} ({BROWSER_PROFILE} profile): median {values[len(values) // 2]:.0f}ms, "
+                  f"max {values[-1]:.0f}ms over {len(values)} loads")
+    transferred = sum(t.get("transferSize") or 0 for t in timings)
+    print(f"⏱️ Main documents transferred: {transferred / 1024:.0f} KiB")
@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import threading
+
+# --- Configuration ---
+CHECKPOINT_EVERY = int(os.environ.get("CHECKPOINT_EVERY", 1))
+# Checkpoints older than this are ignored so a new day's run never resumes yesterday's work
+CHECKPOINT_MAX_AGE_HOURS = float(os.environ.get("CHECKPOINT_MAX_AGE_HOURS", 6))
+
+
+def checkpoint_key(start_index, end_index):
+    """One checkpoint per run, instance and card range; task retries of an execution share it"""
+    run_id = os.environ.get("RUN_ID") or os.environ.get("CLOUD_RUN_EXECUTION", "local")
+    instance_name = os.environ.get("INSTANCE_NAME", "default")
+    task_index = os.environ.get("CLOUD_RUN_TASK_INDEX", "0")
+    return f"checkpoints/{run_id}/{instance_name}-{task_index}-{start_index}-{end_index}.json"
+
+
+class Checkpoint:
+    """Durable record of which cards a collector task already processed and what they yielded"""
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+        self.lock = threading.Lock()
+        self.processed = set()
+        self.records = []
+        self.complete = False
+        self.created_at = time.time()
+        self.unsaved = 0
+        self.load()
+
+    def load(self):
+        raw = self.store.read(self.key)
+        if not raw:
+            return
+        state = json.loads(raw)
+        age_hours = (time.time() - state.get("created_at", 0)) / 3600
+        if age_hours > CHECKPOINT_MAX_AGE_HOURS:
+            print(f"🗃️ Ignoring checkpoint from {age_hours:.1f}h ago")
+            return
+        self.processed = set(state.get("processed", []))
+        self.records = state.get("records", [])
+        self.complete = state.get("complete", False)
+        self.created_at = state.get("created_at", self.created_at)
+        print(f"🗃️ Resuming from checkpoint: {len(self.processed)} cards done, {len(self.records)} jobs collected")
+
+    def __contains__(self, card_key):
+        return card_key in self.processed
+
+    def remaining(self, indices, card_keys):
+        """Card indices still to process; cards beyond the loaded keys cannot be matched and are kept"""
+        return [i for i in indices if i >= len(card_keys) or card_keys[i] not in self.processed]
+
+    def mark(self, card_key, job_info):
+        """Record a processed card (whether or not it yielded a job) and persist periodically"""
+        with self.lock:
+            self.processed.add(card_key)
+            if job_info:
+                self.records.append(job_info)
+            self.unsaved += 1
+            if self.unsaved >= CHECKPOINT_EVERY:
+                self.save_locked()
+
+    def finish(self):
+        """Mark the range as fully processed so a retry can return the records without a browser"""
+        with self.lock:
+            self.complete = True
+            self.save_locked()
+
+    def save_locked(self):
+        state = {
+            "processed": sorted(self.processed),
+            "records": self.records,
+            "complete": self.complete,
+            "created_at": self.created_at,
+            "updated_at": time.time(),
+        }
+        try:
+            self.store.write(self.key, json.dumps(state).encode("utf-8"))
+            self.unsaved = 0
+        except Exception as e:
+            print(f"⚠️ Could not write checkpoint: {e}")
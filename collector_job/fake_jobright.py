@@ -0,0 +1,145 @@
+"""Local stand-in for the JobRight JSON API used by http_collector.py.
+
+It serves the login and recommended-jobs endpoints with the response shape the HTTP
+collector parses, so the collector can be run and tested offline:
+
+    python fake_jobright.py --port 8765 --jobs 60
+    JOBRIGHT_API_BASE=http://127.0.0.1:8765 COLLECTOR_MODE=http \\
+        JOBRIGHT_EMAIL=test@example.com JOBRIGHT_PASSWORD=secret python scraper.py
+
+The endpoints and fields mirror what the collector expects from jobright.ai; if the real
+API changes, update both this fixture and http_collector.py.
+"""
+import json
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from urllib.parse import urlparse, parse_qs
+from http_collector import LOGIN_PATH, JOBS_PATH
+
+SESSION_COOKIE = "SESSION_ID"
+
+
+def fake_feed(count, internal_every=0):
+    """Feed entries in the jobResult/companyResult shape; every internal_every-th one links back to jobright.ai"""
+    items = []
+    for i in range(count):
+        internal = internal_every and (i + 1) % internal_every == 0
+        items.append({
+            "jobResult": {
+                "jobId": f"job-{i}",
+                "jobTitle": f"Software Engineer {i}",
+                "applyLink": f"https://jobright.ai/jobs/info/job-{i}" if internal
+                else f"https://boards.greenhouse.io/acme{i}/jobs/{1000 + i}",
+            },
+            "companyResult": {"companyName": f"Acme {i}"},
+        })
+    return items
+
+
+class FakeJobRight:
+    """Threaded HTTP server holding the feed, the accepted credentials and a request log"""
+
+    def __init__(self, jobs=None, email="test@example.com", password="secret", port=0):
+        self.jobs = fake_feed(60) if jobs is None else jobs
+        self.email = email
+        self.password = password
+        self.sessions = set()
+        self.requests = []  # (method, path, query) of every request, for assertions
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self.handler_class())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def expire_sessions(self):
+        """Invalidate every issued session, as if the cookies had expired server-side"""
+        with self.lock:
+            self.sessions.clear()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, body, cookie=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if cookie:
+                    self.send_header("Set-Cookie", f"{SESSION_COOKIE}={cookie}; Path=/")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def record(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with fake.lock:
+                    fake.requests.append((self.command, url.path, query))
+                return url.path, query
+
+            def do_POST(self):
+                path, _ = self.record()
+                if path != LOGIN_PATH:
+                    return self.send_json(404, {"success": False, "errorMsg": "not found"})
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if body.get("email") != fake.email or body.get("password") != fake.password:
+                    return self.send_json(200, {"success": False, "errorMsg": "invalid credentials"})
+                token = uuid.uuid4().hex
+                with fake.lock:
+                    fake.sessions.add(token)
+                self.send_json(200, {"success": True, "result": {"email": fake.email}}, cookie=token)
+
+            def do_GET(self):
+                path, query = self.record()
+                if path != JOBS_PATH:
+                    return self.send_json(404, {"success": False, "errorMsg": "not found"})
+                cookie = SimpleCookie(self.headers.get("Cookie") or "")
+                token = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+                with fake.lock:
+                    authorized = token in fake.sessions
+                if not authorized:
+                    return self.send_json(401, {"success": False, "errorMsg": "not logged in"})
+                position = int(query.get("position", 0))
+                count = int(query.get("count", 20))
+                self.send_json(200, {"success": True, "result": {"jobList": fake.jobs[position:position + count]}})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake JobRight API for offline collector runs")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--jobs", type=int, default=60)
+    parser.add_argument("--internal-every", type=int, default=0, help="Make every Nth job link back to jobright.ai")
+    args = parser.parse_args()
+    server = FakeJobRight(jobs=fake_feed(args.jobs, args.internal_every), port=args.port)
+    print(f"🧪 Fake JobRight API on {server.base_url} (login: {server.email} / {server.password})")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
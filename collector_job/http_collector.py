@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import traceback
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from blob_store import get_blob_store
+
+# --- Configuration ---
+JOBRIGHT_API_BASE = os.environ.get("JOBRIGHT_API_BASE", "https://jobright.ai").rstrip("/")
+# Endpoints the web app calls; fake_jobright.py serves the same contract for offline runs
+LOGIN_PATH = os.environ.get("JOBRIGHT_LOGIN_PATH", "/swan/auth/login/pwd")
+JOBS_PATH = os.environ.get("JOBRIGHT_JOBS_PATH", "/swan/recommend/list/jobs")
+PAGE_SIZE = int(os.environ.get("HTTP_PAGE_SIZE", 20))
+SORT_MOST_RECENT = 1
+STATE_STORE_URI = os.environ.get("STATE_STORE_URI")
+SESSION_KEY = "sessions/jobright-session.json"
+REQUEST_TIMEOUT = 20
+
+
+class SessionExpired(Exception):
+    """Raised when the JobRight API rejects the current session."""
+
+
+class JobRightHttpCollector:
+    """Reads the recommended-jobs feed from JobRight's JSON API without a browser"""
+
+    def __init__(self, base_url=JOBRIGHT_API_BASE, page_size=PAGE_SIZE):
+        self.base_url = base_url
+        self.page_size = page_size
+        self.session = self.build_session()
+        self.job_data = []
+
+    def build_session(self):
+        """Create a pooled requests session with retries on transient errors"""
+        session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Origin": self.base_url,
+            "Referer": f"{self.base_url}/jobs/recommend",
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/141.0.0.0 Safari/537.36",
+        })
+        return session
+
+    def load_cookies(self, cookies):
+        """Load cookies in Selenium's get_cookies() format into the HTTP session"""
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        print(f"🍪 Loaded {len(cookies)} saved cookies")
+
+    def export_cookies(self):
+        """Return the session cookies in Selenium's get_cookies() format"""
+        return [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in self.session.cookies
+        ]
+
+    def login(self, email, password):
+        """Log in with email and password; the session keeps the auth cookies"""
+        try:
+            response = self.session.post(
+                f"{self.base_url}{LOGIN_PATH}",
+                json={"email": email, "password": password},
+                timeout=REQUEST_TIMEOUT,
+            )
+            response.raise_for_status()
+            body = response.json()
+            if body.get("success") is False:
+                print(f"❌ Login rejected: {body.get('errorMsg') or body}")
+                return False
+            print("✅ Login successful!")
+            return True
+        except Exception as e:
+            print(f"❌ Login request failed: {e}")
+            return False
+
+    def fetch_page(self, position):
+        """Fetch one page of the 'Most Recent' recommended-jobs feed"""
+        response = self.session.get(
+            f"{self.base_url}{JOBS_PATH}",
+            params={
+                "refresh": "true" if position == 0 else "false",
+                "sortCondition": SORT_MOST_RECENT,
+                "position": position,
+                "count": self.page_size,
+            },
+            timeout=REQUEST_TIMEOUT,
+        )
+        if response.status_code in (401, 403):
+            raise SessionExpired(f"HTTP {response.status_code}")
+        response.raise_for_status()
+
+        body = response.json()
+        if body.get("success") is False:
+            raise SessionExpired(body.get("errorMsg") or "request was not successful")
+
+        result = body.get("result") or {}
+        return result.get("jobList") or []
+
+    def parse_job(self, item):
+        """Map a feed entry to the {url, companyName, positionName} record the browser collector returns"""
+        job = item.get("jobResult") or item
+        company = item.get("companyResult") or {}
+
+        url = job.get("applyLink") or job.get("originalUrl") or job.get("url")
+        company_name = company.get("companyName") or job.get("companyName")
+        position_name = job.get("jobTitle") or job.get("title")
+
+        if not url or not company_name or not position_name:
+            return None
+        # Only return external URLs
+        if "jobright.ai" in url:
+            return None
+        return {"url": url, "companyName": company_name, "positionName": position_name}
+
+    def collect(self, start_index=0, end_index=150):
+        """Page through the feed and keep the records in [start_index, end_index)"""
+        position = 0
+        while position < end_index:
+            items = self.fetch_page(position)
+            print(f"📄 Fetched {len(items)} jobs at position {position}")
+            if not items:
+                print("No more jobs in the feed. Reached end of list.")
+                break
+
+            for offset, item in enumerate(items):
+                index = position + offset
+                if index < start_index or index >= end_index:
+                    continue
+                job_info = self.parse_job(item)
+                if job_info:
+                    self.job_data.append(job_info)
+                else:
+                    print(f"⚠️ Feed entry #{index + 1}: no external apply URL, skipping")
+
+            position += len(items)
+
+        return self.job_data
+
+    def run(self):
+        """Main execution flow, mirroring JobRightScraper.run()"""
+        instance_name = os.environ.get("INSTANCE_NAME", "default")
+        start_index = int(os.environ.get("START_INDEX", 0))
+        end_index = int(os.environ.get("END_INDEX", 150))
+        print(f"🚀 Starting HTTP collector instance: {instance_name}")
+        started = time.perf_counter()
+
+        try:
+            # Share the session cache with the browser collector
+            session_store = get_blob_store(STATE_STORE_URI)
+            saved = session_store.read(SESSION_KEY) if session_store else None
+            if saved:
+                self.load_cookies(json.loads(saved).get("cookies", []))
+
+            try:
+                jobs = self.collect(start_index, end_index)
+            except SessionExpired as e:
+                print(f"🔑 Session not usable ({e}), logging in...")
+                email = os.environ.get("JOBRIGHT_EMAIL")
+                password = os.environ.get("JOBRIGHT_PASSWORD")
+                if not email or not password:
+                    print("❌ Missing credentials in environment variables")
+                    return []
+                if not self.login(email, password):
+                    return []
+                if session_store:
+                    session = {"cookies": self.export_cookies(), "local_storage": {}, "saved_at": time.time()}
+                    session_store.write(SESSION_KEY, json.dumps(session).encode("utf-8"))
+                self.job_data = []
+                jobs = self.collect(start_index, end_index)
+
+            print(f"🎯 {instance_name}: Collected {len(jobs)} jobs in {time.perf_counter() - started:.1f}s")
+            return jobs
+
+        except Exception as e:
+            print(f"❌ Fatal error in {instance_name}: {e}")
+            traceback.print_exc()
+            return []
+
+        finally:
+            self.session.close()
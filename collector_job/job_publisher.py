@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# --- Configuration ---
+TOPIC_ID = os.environ.get("TOPIC_NAME", "scraped-urls")
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", 25))
+STREAM_MAX_LATENCY_SECONDS = float(os.environ.get("STREAM_MAX_LATENCY_SECONDS", 120))
+PUBLISH_TIMEOUT_SECONDS = 60
+
+
+def job_dedup_key(job):
+    """Stable identity of a collected job, used to drop repeats before and after publishing"""
+    return hashlib.sha1(job.get("url", "").strip().encode("utf-8")).hexdigest()
+
+
+class StreamingJobPublisher:
+    """Publishes collected jobs to Pub/Sub in micro-batches while the scraper is still running.
+
+    A batch is flushed when it reaches batch_size jobs or when its oldest job has waited
+    max_latency seconds. Batches from one instance share an ordering key so they arrive in
+    the order they were found. Publishing does not block the scraper; close() waits for all
+    sends and raises if any failed. Honours PUBSUB_EMULATOR_HOST like any PublisherClient,
+    and accepts any client with topic_path()/publish()/resume_publish() for in-memory runs.
+    """
+
+    def __init__(self, project_id, topic_id=TOPIC_ID, client=None,
+                 batch_size=STREAM_BATCH_SIZE, max_latency=STREAM_MAX_LATENCY_SECONDS):
+        if client is None:
+            from google.cloud import pubsub_v1  # Not needed when a client is injected
+            client = pubsub_v1.PublisherClient(
+                batch_settings=pubsub_v1.types.BatchSettings(max_messages=10, max_bytes=1024 * 1024, max_latency=0.5),
+                publisher_options=pubsub_v1.types.PublisherOptions(enable_message_ordering=True),
+            )
+        self.client = client
+        self.topic_path = self.client.topic_path(project_id, topic_id)
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.instance_name = os.environ.get("INSTANCE_NAME", "default")
+
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.buffer_started = None
+        self.sent_keys = set()
+        self.futures = []
+        self.batches_sent = 0
+        self.jobs_sent = 0
+
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_on_timer, daemon=True)
+        self.flusher.start()
+
+    def add(self, job):
+        """Queue a job for publishing; repeats of an already queued URL are dropped"""
+        key = job_dedup_key(job)
+        with self.lock:
+            if key in self.sent_keys:
+                return False
+            self.sent_keys.add(key)
+            if not self.buffer:
+                self.buffer_started = time.monotonic()
+            self.buffer.append(job)
+            if len(self.buffer) >= self.batch_size:
+                self.flush_locked()
+        return True
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        self.buffer_started = None
+
+        batch_key = hashlib.sha1("".join(sorted(job_dedup_key(j) for j in batch)).encode("utf-8")).hexdigest()
+        future = self.client.publish(
+            self.topic_path,
+            data=json.dumps({"jobs": batch}).encode("utf-8"),
+            ordering_key=self.instance_name,
+            dedup_key=batch_key,
+            instance=self.instance_name,
+        )
+        self.batches_sent += 1
+        self.jobs_sent += len(batch)
+        batch_number = self.batches_sent
+        future.add_done_callback(lambda f: self.report_publish(f, batch_number, len(batch)))
+        self.futures.append(future)
+
+    def report_publish(self, future, batch_number, size):
+        try:
+            future.result()
+            print(f"🚀 Streamed batch #{batch_number} with {size} jobs.")
+        except Exception as e:
+            print(f"❌ Streamed batch #{batch_number} failed to publish: {e}")
+            # A failure pauses the ordering key; let later batches through, close() reports the loss
+            self.client.resume_publish(self.topic_path, self.instance_name)
+
+    def flush_on_timer(self):
+        while not self.closed.wait(1):
+            with self.lock:
+                if self.buffer_started and time.monotonic() - self.buffer_started >= self.max_latency:
+                    self.flush_locked()
+
+    def close(self):
+        """Flush what is left and wait for every publish to finish. Returns the number of jobs sent.
+
+        Raises RuntimeError if any batch failed, so the task exits non-zero and is retried.
+        """
+        self.closed.set()
+        self.flush()
+        failed = 0
+        for future in self.futures:
+            try:
+                future.result(timeout=PUBLISH_TIMEOUT_SECONDS)
+            except Exception:
+                failed += 1
+        if failed:
+            print(f"❌ Streamed {self.jobs_sent} jobs in {self.batches_sent} batches, {failed} batches failed")
+            raise RuntimeError(f"{failed} of {self.batches_sent} streamed batches failed to publish")
+        print(f"✅ Streamed {self.jobs_sent} jobs in {self.batches_sent} batches")
+        return self.jobs_sent
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import socket
+
+# --- Configuration ---
+LEASE_SIZE = int(os.environ.get("LEASE_SIZE", 5))
+LEASE_TIMEOUT_SECONDS = float(os.environ.get("LEASE_TIMEOUT_SECONDS", 300))
+# Longest a worker with nothing to claim sleeps before checking the leases again
+LEASE_POLL_SECONDS = float(os.environ.get("LEASE_POLL_SECONDS", 15))
+# Workers that get to try cards missing from an earlier worker's browser before they are given up
+MISSING_CARD_ATTEMPTS = int(os.environ.get("MISSING_CARD_ATTEMPTS", 3))
+MANIFEST_WAIT_SECONDS = 600
+
+
+class LeaseQueue:
+    """Shared queue of card-index leases for one collector run, kept in a blob store.
+
+    One worker publishes the card manifest; every worker then claims small index ranges.
+    A lease that is not renewed within LEASE_TIMEOUT_SECONDS can be stolen by another worker,
+    so workers keep waiting while peers hold leases and only stop once every slot is done.
+    Cards a worker could not find in its own browser are handed back as a "partial" slot
+    for a worker that has not tried them yet, instead of being completed and lost.
+    """
+
+    def __init__(self, store, run_id, worker_name=None, lease_size=LEASE_SIZE, lease_timeout=LEASE_TIMEOUT_SECONDS,
+                 poll_seconds=LEASE_POLL_SECONDS):
+        self.store = store
+        self.prefix = f"runs/{run_id}"
+        self.worker_name = worker_name or socket.gethostname()
+        self.lease_size = lease_size
+        self.lease_timeout = lease_timeout
+        self.poll_seconds = poll_seconds
+        self.manifest = None
+        self.handoffs = {}  # slot -> {"missing": [...], "tried_by": [...]} for partial slots we hold
+
+    def lease_key(self, slot):
+        return f"{self.prefix}/leases/{slot:04d}.json"
+
+    def publish_manifest(self, card_keys):
+        """Publish this worker's card list unless another worker already did; return the winning manifest"""
+        manifest = {"card_keys": card_keys, "published_by": self.worker_name, "published_at": time.time()}
+        if self.store.create(f"{self.prefix}/manifest.json", json.dumps(manifest).encode("utf-8")):
+            print(f"📜 {self.worker_name}: Published manifest with {len(card_keys)} cards")
+            self.manifest = manifest
+        else:
+            self.manifest = self.read_manifest()
+            print(f"📜 {self.worker_name}: Using manifest from {self.manifest['published_by']} ({len(self.manifest['card_keys'])} cards)")
+        return self.manifest
+
+    def read_manifest(self):
+        deadline = time.monotonic() + MANIFEST_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            raw = self.store.read(f"{self.prefix}/manifest.json")
+            if raw:
+                return json.loads(raw)
+            time.sleep(1)
+        raise TimeoutError("manifest was never published")
+
+    def slot_count(self):
+        return -(-len(self.manifest["card_keys"]) // self.lease_size)
+
+    def slot_range(self, slot):
+        start = slot * self.lease_size
+        return start, min(start + self.lease_size, len(self.manifest["card_keys"]))
+
+    def lease_body(self, state="leased", handoff=None):
+        return json.dumps({
+            "worker": self.worker_name,
+            "state": state,
+            "expires_at": time.time() + self.lease_timeout,
+            **(handoff or {}),
+        }).encode("utf-8")
+
+    def positions(self, slot):
+        """Manifest positions to process for a claimed slot: all of them, or only a handed-back remainder"""
+        if slot in self.handoffs:
+            return list(self.handoffs[slot]["missing"])
+        return list(range(*self.slot_range(slot)))
+
+    def try_claim(self):
+        """One pass over the slots. Returns ((slot, start, end) or None, earliest expiry of a live peer lease or None)."""
+        earliest_expiry = None
+        for slot in range(self.slot_count()):
+            key = self.lease_key(slot)
+            if self.store.create(key, self.lease_body()):
+                return (slot, *self.slot_range(slot)), None
+
+            raw, token = self.store.read_with_token(key)
+            if raw is None:
+                earliest_expiry = time.time()  # Deleted under us; look again right away
+                continue
+            lease = json.loads(raw)
+            if lease["state"] == "done":
+                continue
+            handoff = {"missing": lease["missing"], "tried_by": lease["tried_by"]} if "missing" in lease else None
+            if lease["state"] == "partial":
+                if self.worker_name in lease["tried_by"]:
+                    continue  # Not in our browser either; left for workers that have not tried
+                if self.store.replace(key, self.lease_body(handoff=handoff), token):
+                    print(f"🔁 {self.worker_name}: Taking over {len(handoff['missing'])} cards of slot {slot} "
+                          f"that {lease['worker']} could not find")
+                    self.handoffs[slot] = handoff
+                    return (slot, *self.slot_range(slot)), None
+                earliest_expiry = time.time()
+                continue
+            if lease["expires_at"] > time.time():
+                earliest_expiry = min(earliest_expiry or lease["expires_at"], lease["expires_at"])
+                continue
+            # The owner stopped renewing: steal the lease
+            if self.store.replace(key, self.lease_body(handoff=handoff), token):
+                print(f"🦝 {self.worker_name}: Took over expired lease {slot} from {lease['worker']}")
+                if handoff:
+                    self.handoffs[slot] = handoff
+                return (slot, *self.slot_range(slot)), None
+            earliest_expiry = time.time()  # Someone else changed it first; look again
+        return None, earliest_expiry
+
+    def claim(self):
+        """Claim the next free (or expired) slot. Returns (slot, start, end), or None once every slot is done.
+
+        While peers still hold live leases this waits for the earliest one to expire (checking at
+        least every poll_seconds), so a crashed peer's cards are taken over instead of dropped.
+        """
+        while True:
+            lease, earliest_expiry = self.try_claim()
+            if lease or earliest_expiry is None:
+                return lease
+            wait = min(self.poll_seconds, max(0.0, earliest_expiry - time.time()) + 0.1)
+            print(f"⏳ {self.worker_name}: All remaining slots are leased, checking again in {wait:.1f}s")
+            time.sleep(wait)
+
+    def update(self, slot, state, handoff=None):
+        """Rewrite our own lease; returns False if another worker has taken it over"""
+        key = self.lease_key(slot)
+        raw, token = self.store.read_with_token(key)
+        if raw is None or json.loads(raw).get("worker") != self.worker_name:
+            return False
+        return self.store.replace(key, self.lease_body(state, handoff or self.handoffs.get(slot)), token)
+
+    def renew(self, slot):
+        """Push the lease expiry out while the slot is still being worked on. False means the lease was lost."""
+        return self.update(slot, "leased")
+
+    def complete(self, slot, missing=None):
+        """Finish a slot. Positions in missing (not loaded in this browser) are handed back for another worker."""
+        handoff = self.handoffs.pop(slot, None)
+        if not missing:
+            return self.update(slot, "done")
+        tried_by = (handoff or {}).get("tried_by", []) + [self.worker_name]
+        if len(tried_by) >= MISSING_CARD_ATTEMPTS:
+            print(f"⚠️ {self.worker_name}: {len(missing)} cards of slot {slot} were not found by "
+                  f"{len(tried_by)} workers, giving up on them")
+            return self.update(slot, "done")
+        return self.update(slot, "partial", {"missing": list(missing), "tried_by": tried_by})
@@ -2,67 +2,168 @@ import os
 import time
 import traceback
 import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from selenium import webdriver
 from google.cloud import pubsub_v1
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import TimeoutException
 import undetected_chromedriver as uc
+from wait_policy import WaitPolicy, CardBudgetExceeded
+from blob_store import get_blob_store
+from seen_postings import SeenPostings, posting_key
+from lease_queue import LeaseQueue
+from checkpoint import Checkpoint, checkpoint_key
+from browser_profile import apply_profile, block_resources, navigation_timing, ResourceMonitor, report_page_loads
 
 load_dotenv()
 
+# --- Configuration ---
+# "browser" drives undetected_chromedriver, "http" reads the JobRight JSON feed directly
+COLLECTOR_MODE = os.environ.get("COLLECTOR_MODE", "browser").lower()
+# "fast" captures apply URLs through a window.open hook, "window" always uses the popup window
+APPLY_CAPTURE_MODE = os.environ.get("APPLY_CAPTURE_MODE", "fast").lower()
+# Number of browser instances that split the card range inside one collector task
+WORKER_COUNT = max(1, int(os.environ.get("WORKER_COUNT", 1)))
+BASE_DEBUG_PORT = 9222
+# Where collector state (session, seen postings) is kept between runs: gs://bucket/prefix, file:///path or unset to disable
+STATE_STORE_URI = os.environ.get("STATE_STORE_URI")
+SESSION_KEY = "sessions/jobright-session.json"
+SESSION_MAX_AGE_HOURS = float(os.environ.get("SESSION_MAX_AGE_HOURS", 72))
+# "batch" publishes everything after the run, "stream" publishes micro-batches while scraping
+PUBLISH_MODE = os.environ.get("PUBLISH_MODE", "batch").lower()
+# "static" processes START_INDEX..END_INDEX, "queue" pulls index leases shared by all tasks of RUN_ID
+SHARD_MODE = os.environ.get("SHARD_MODE", "static").lower()
+RUN_ID = os.environ.get("RUN_ID", "default")
+# Skip postings collected by earlier runs (needs STATE_STORE_URI)
+INCREMENTAL_SCRAPE = os.environ.get("INCREMENTAL_SCRAPE", "false").lower() == "true"
+
+# Reads company, title and posting id of every loaded card in a single round trip
+CARD_KEYS_JS = """
+return Array.from(document.querySelectorAll("div[class*='index_job-card-main__spahH']")).map((card) => {
+    const company = card.querySelector("div[class*='index_company-name__gKiOY']");
+    const title = card.querySelector("h2[class*='index_job-title__UjuEY']");
+    const link = card.querySelector("a[href*='/jobs/info/']");
+    const linkId = link ? link.getAttribute('href').split('/jobs/info/')[1].split(/[?#]/)[0] : '';
+    return [company ? company.innerText : '', title ? title.innerText : '',
+            card.getAttribute('data-job-id') || linkId || ''];
+});
+"""
+
+# undetected_chromedriver patches its driver binary on startup, which is not safe to run concurrently
+DRIVER_SETUP_LOCK = threading.Lock()
+
+APPLY_MODAL_NO_BUTTON_XPATH = "//button[contains(@class, 'index_job-apply-confirm-popup-no-button__V7UbC')]"
+
+# Installed into the jobs page so apply clicks record their outbound URL instead of
+# opening a popup. Capture is only active while window.__jobscoutCapture is set, so the
+# window fallback still gets a real popup.
+APPLY_URL_HOOK_JS = """
+if (!window.__jobscoutHooked) {
+    window.__jobscoutHooked = true;
+    window.__jobscoutCapture = false;
+    window.__jobscoutApplyUrl = null;
+    const originalOpen = window.open;
+    const record = (url) => {
+        if (url) { window.__jobscoutApplyUrl = new URL(url, window.location.href).href; }
+    };
+    window.open = function (url, ...rest) {
+        if (!window.__jobscoutCapture) { return originalOpen.call(window, url, ...rest); }
+        record(url);
+        // Stub popup: pages that open a blank window and assign its location later still get captured
+        const location = { assign: record, replace: record };
+        Object.defineProperty(location, 'href', { set: record, get: () => window.__jobscoutApplyUrl || 'about:blank' });
+        const popup = { closed: false, opener: window, focus() {}, blur() {}, close() { this.closed = true; },
+                        document: { write() {}, close() {} } };
+        Object.defineProperty(popup, 'location', { set: record, get: () => location });
+        return popup;
+    };
+    document.addEventListener('click', (event) => {
+        if (!window.__jobscoutCapture) { return; }
+        const link = event.target.closest && event.target.closest('a[target="_blank"]');
+        if (link && link.href) {
+            record(link.href);
+            event.preventDefault();
+        }
+    }, true);
+}
+"""
+
 class JobRightScraper:
     def __init__(self):
         self.driver = None
         self.main_window = None
         self.job_data = []
+        self.card_timings = []
+        self.page_loads = []
+        self.resources = None
+        self.last_capture_mode = None
+        self.last_card_outcome = None
+        self.waits = WaitPolicy()
+        self.seen = None
+        self.new_postings_observed = None
+        self.publisher = None
+        self.checkpoint = None
+        self.card_keys = []
         
-    def setup_driver(self):
+    def setup_driver(self, debug_port=BASE_DEBUG_PORT):
         """Initialize Chrome driver with proper options for Docker"""
         options = uc.ChromeOptions()
         options.add_argument("--headless")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
-        options.add_argument("--remote-debugging-port=9222")
-        options.add_argument("--window-size=1920,1080")
+        options.add_argument(f"--remote-debugging-port={debug_port}")
+        apply_profile(options)  # Window size plus, for BROWSER_PROFILE=lean, resource blocking and renderer limits
         options.add_argument("--disable-blink-features=AutomationControlled")
         
         print("Initializing Chrome driver...")
         try:
-            self.driver = uc.Chrome(options=options)
+            with DRIVER_SETUP_LOCK:
+                self.driver = uc.Chrome(options=options)
             self.main_window = self.driver.current_window_handle
+            block_resources(self.driver)
             return True
         except Exception as e:
             print(f"❌ Error initializing Chrome driver: {e}")
             return False
 
+    def open_page(self, url):
+        """Navigate the current window and record the page's load timing"""
+        self.driver.get(url)
+        self.page_loads.append(navigation_timing(self.driver))
+
     def login(self, email, password):
         """Login to JobRight with improved stability and retries"""
         for attempt in range(3): # Try to log in up to 3 times
             try:
                 print(f"Navigating to JobRight... (Attempt {attempt + 1}/3)")
-                self.driver.get("https://jobright.ai/")
+                self.open_page("https://jobright.ai/")
                 
                 # --- FIX 1: Handle potential cookie banners or overlays ---
-                # Give the page a moment to settle and for overlays to appear.
-                time.sleep(3) 
+                # Wait for the page to settle instead of sleeping, then give overlays a short window to appear.
+                self.waits.attempt(self.driver, "page_ready", lambda d: d.execute_script("return document.readyState") == "complete")
                 try:
                     # This is a common pattern for cookie banners. Adjust if needed.
-                    cookie_accept_button = self.driver.find_element(By.XPATH, "//*[contains(text(), 'Accept') or contains(text(), 'Allow') or contains(text(), 'Got it')]")
-                    if cookie_accept_button.is_displayed():
-                        print("🍪 Found and clicked a cookie/consent button.")
-                        cookie_accept_button.click()
-                        time.sleep(1) # Wait for banner to disappear
+                    cookie_accept_button = self.waits.until(
+                        self.driver, "cookie_banner",
+                        EC.visibility_of_element_located((By.XPATH, "//*[contains(text(), 'Accept') or contains(text(), 'Allow') or contains(text(), 'Got it')]"))
+                    )
+                    print("🍪 Found and clicked a cookie/consent button.")
+                    cookie_accept_button.click()
+                    self.waits.attempt(self.driver, "cookie_banner", EC.invisibility_of_element(cookie_accept_button))
                 except Exception:
                     print("✅ No cookie banner found, proceeding.")
 
                 # --- FIX 2: Use a more robust wait for the sign-in button ---
                 print("Waiting for the 'SIGN IN' button to be clickable...")
-                signin_btn = WebDriverWait(self.driver, 30).until(
+                signin_btn = self.waits.until(
+                    self.driver, "signin_button",
                     EC.element_to_be_clickable((By.XPATH, "//span[text()='SIGN IN']"))
                 )
                 
@@ -72,7 +173,8 @@ class JobRightScraper:
                 self.driver.execute_script("arguments[0].click();", signin_btn)
 
                 # Enter credentials
-                email_field = WebDriverWait(self.driver, 15).until(
+                email_field = self.waits.until(
+                    self.driver, "login_form",
                     EC.visibility_of_element_located((By.XPATH, "//input[@id='basic_email']"))
                 )
                 password_field = self.driver.find_element(By.XPATH, "//input[@id='basic_password']")
@@ -82,7 +184,8 @@ class JobRightScraper:
                 password_field.send_keys(Keys.RETURN)
                 
                 # Wait for login success
-                WebDriverWait(self.driver, 25).until(
+                self.waits.until(
+                    self.driver, "login_success",
                     EC.presence_of_element_located((By.XPATH, "//span[text()='Profile']"))
                 )
                 print("✅ Login successful!")
@@ -91,8 +194,12 @@ class JobRightScraper:
             except Exception as e:
                 print(f"❌ Login attempt {attempt + 1} failed: {e}")
                 if attempt < 2: # If it's not the last attempt
-                    print("Retrying in 5 seconds...")
-                    time.sleep(5)
+                    print("Retrying once the page has settled...")
+                    # A failed attempt can leave a navigation in flight; let it finish before reloading
+                    try:
+                        self.waits.attempt(self.driver, "login_retry", lambda d: d.execute_script("return document.readyState") == "complete")
+                    except Exception:
+                        pass
                 else:
                     print("❌ All login attempts failed.")
                     return False
@@ -102,17 +209,27 @@ class JobRightScraper:
         """Switch job sorting to 'Most Recent'"""
         try:
             print("Switching to 'Most Recent' sorting...")
-            dropdown = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'index_jobs-recommend-sorter__')]"))
+            sorter_xpath = "//div[contains(@class, 'index_jobs-recommend-sorter__')]"
+            dropdown = self.waits.until(
+                self.driver, "sort_dropdown",
+                EC.element_to_be_clickable((By.XPATH, sorter_xpath))
             )
             dropdown.click()
             
-            most_recent_option = WebDriverWait(self.driver, 10).until(
+            most_recent_option = self.waits.until(
+                self.driver, "sort_option",
                 EC.element_to_be_clickable((By.XPATH, "//div[@class='ant-select-item-option-content' and text()='Most Recent']"))
             )
             most_recent_option.click()
             
-            time.sleep(3)
+            # The list is re-fetched once the sorter shows the new value and the spinner is gone.
+            # The sorter is looked up on every poll because it may re-render after the change.
+            self.waits.attempt(
+                self.driver, "sort_applied",
+                lambda d: any("Most Recent" in el.text for el in d.find_elements(By.XPATH, sorter_xpath))
+                and not d.find_elements(By.XPATH, "//div[contains(@class, 'ant-spin-spinning')]")
+                and d.find_elements(By.XPATH, "//div[contains(@class, 'index_job-card-main__spahH')]")
+            )
             print("✅ Switched to 'Most Recent'")
             return True
             
@@ -133,6 +250,11 @@ class JobRightScraper:
             
             if current_count >= target_count:
                 break
+
+            # Cards are sorted by recency, so a run of known postings means the rest are old too
+            if self.seen and self.seen.reached_seen_streak(self.read_card_keys()):
+                print("Reached postings collected by an earlier run. Stopping scroll.")
+                break
                 
             # Scroll to last card
             if job_cards:
@@ -141,34 +263,38 @@ class JobRightScraper:
                     job_cards[-1]
                 )
                 
-            # Wait for loading spinner
-            try:
-                WebDriverWait(self.driver, 3).until(
-                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'ant-spin-spinning')]"))
-                )
-                WebDriverWait(self.driver, 15).until_not(
-                    EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'ant-spin-spinning')]"))
-                )
-            except:
-                time.sleep(15)
+            # Wait for the next page of cards rather than for a spinner that may never show up
+            loaded_more = self.waits.attempt(
+                self.driver, "jobs_loaded",
+                lambda d: len(d.find_elements(By.XPATH, job_card_selector)) > current_count
+            )
                 
             # Check if no new jobs loaded
-            if len(self.driver.find_elements(By.XPATH, job_card_selector)) == current_count:
+            if not loaded_more:
                 print("No more jobs loading. Reached end of list.")
                 break
                 
         final_count = len(self.driver.find_elements(By.XPATH, job_card_selector))
         print(f"✅ Loaded {final_count} jobs total")
+        if self.seen:
+            self.new_postings_observed = self.seen.count_new(self.read_card_keys())
+            print(f"🆕 {self.new_postings_observed} of them were not collected before")
         return final_count
 
+    def read_card_keys(self):
+        """Return the posting key of every loaded card, in card order"""
+        return [posting_key(*fields) for fields in self.driver.execute_script(CARD_KEYS_JS)]
+
     def close_apply_modal(self):
         """Close the 'Did you apply?' modal using multiple strategies"""
         modal_closed = False
+        no_button_xpath = APPLY_MODAL_NO_BUTTON_XPATH
         
         # Strategy 1: Click "No, I didn't apply" button
         try:
-            no_button = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(@class, 'index_job-apply-confirm-popup-no-button__V7UbC')]"))
+            no_button = self.waits.until(
+                self.driver, "modal_button",
+                EC.element_to_be_clickable((By.XPATH, no_button_xpath))
             )
             self.driver.execute_script("arguments[0].click();", no_button)
             print("✅ Clicked 'No, I didn't apply' button")
@@ -179,7 +305,8 @@ class JobRightScraper:
         # Strategy 2: Click close button if "No" button didn't work
         if not modal_closed:
             try:
-                close_button = WebDriverWait(self.driver, 3).until(
+                close_button = self.waits.until(
+                    self.driver, "modal_button",
                     EC.element_to_be_clickable((By.XPATH, "//button[@aria-label='Close']"))
                 )
                 self.driver.execute_script("arguments[0].click();", close_button)
@@ -207,10 +334,144 @@ class JobRightScraper:
             except:
                 print("❌ All modal closing strategies failed")
         
-        time.sleep(2)  # Give modal time to close
+        # Give modal time to close
+        self.waits.attempt(self.driver, "modal_close", EC.invisibility_of_element_located((By.XPATH, no_button_xpath)))
         return modal_closed
 
+    def dismiss_apply_modal_if_present(self):
+        """Click 'No' on the 'Did you apply?' modal only if it is already showing.
+
+        The stubbed popup usually leaves the page focused, so the modal often never appears;
+        waiting for it or sending keyboard fallbacks would cost time and could hit the jobs page.
+        """
+        try:
+            buttons = [b for b in self.driver.find_elements(By.XPATH, APPLY_MODAL_NO_BUTTON_XPATH) if b.is_displayed()]
+            if buttons:
+                self.driver.execute_script("arguments[0].click();", buttons[0])
+                print("✅ Clicked 'No, I didn't apply' button")
+        except Exception as e:
+            print(f"⚠️ Could not dismiss apply modal: {e}")
+
+    def capture_apply_url_fast(self, apply_button, card_index):
+        """Capture the outbound apply URL through the window.open hook without opening a popup"""
+        self.driver.execute_script(APPLY_URL_HOOK_JS)
+        self.driver.execute_script("window.__jobscoutCapture = true; window.__jobscoutApplyUrl = null;")
+        try:
+            self.driver.execute_script("arguments[0].click();", apply_button)
+            print(f"👆 Used hooked JavaScript click for card #{card_index + 1}")
+            job_url = self.waits.until(
+                self.driver, "fast_capture",
+                lambda d: d.execute_script("return window.__jobscoutApplyUrl;")
+            )
+        except TimeoutException:
+            print(f"⚠️ Fast capture saw no outbound URL for card #{card_index + 1}")
+            return None
+        finally:
+            self.driver.execute_script("window.__jobscoutCapture = false;")
+
+        # Some clicks still open a real popup (e.g. plain links the hook missed) - close it
+        for handle in self.driver.window_handles:
+            if handle != self.main_window:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+        self.driver.switch_to.window(self.main_window)
+
+        print(f"🔗 Captured URL: {job_url}")
+        self.dismiss_apply_modal_if_present()
+        return job_url
+
+    def capture_apply_url_via_window(self, apply_button, card_index):
+        """Click the apply button and read the URL from the popup window it opens"""
+        try:
+            initial_windows = len(self.driver.window_handles)
+            print(f"🪟 Current windows: {initial_windows}")
+
+            # Method 1: Hover first, then real click
+            try:
+                actions = ActionChains(self.driver)
+                actions.move_to_element(apply_button).pause(0.5).click().perform()
+                print(f"👆 Used ActionChains click for card #{card_index + 1}")
+            except:
+                # Method 2: JavaScript click as fallback
+                self.driver.execute_script("arguments[0].click();", apply_button)
+                print(f"👆 Used JavaScript click for card #{card_index + 1}")
+
+            # Wait for new window with better detection
+            try:
+                if self.waits.attempt(self.driver, "new_window", lambda d: len(d.window_handles) > initial_windows):
+                    print(f"🪟 New window detected!")
+                else:
+                    print(f"❌ No new window opened")
+                    self.waits.check_budget("new_window_retry")
+
+                    # Debug: Check if button is actually clickable
+                    print(f"🔍 Button enabled: {apply_button.is_enabled()}")
+                    print(f"🔍 Button displayed: {apply_button.is_displayed()}")
+
+                    # Try clicking the button text/span instead
+                    try:
+                        button_text = apply_button.find_element(By.TAG_NAME, "span")
+                        ActionChains(self.driver).move_to_element(button_text).click().perform()
+                        print(f"👆 Clicked button text as backup")
+
+                        # Wait again
+                        self.waits.until(self.driver, "new_window_retry", lambda d: len(d.window_handles) > initial_windows)
+                        print(f"🪟 New window opened with button text click!")
+                    except:
+                        print(f"❌ Button text click also failed")
+                        return None
+
+            except Exception as e:
+                print(f"❌ Error waiting for new window: {e}")
+                return None
+
+        except Exception as e:
+            print(f"❌ Error clicking apply button: {e}")
+            return None
+
+        # Switch to new window
+        new_window = [w for w in self.driver.window_handles if w != self.main_window][0]
+        self.driver.switch_to.window(new_window)
+        # The external apply page would otherwise load its trackers and images unblocked
+        block_resources(self.driver, quiet=True)
+
+        # Get URL once the popup has navigated away from about:blank, then close window
+        self.waits.attempt(
+            self.driver, "popup_url",
+            lambda d: d.current_url not in ("", "about:blank")
+            and d.execute_script("return document.readyState") != "loading"
+        )
+        job_url = self.driver.current_url
+        print(f"🔗 Got URL: {job_url}")
+        self.driver.close()
+
+        # Switch back to main window
+        self.driver.switch_to.window(self.main_window)
+
+        # Handle the modal
+        self.close_apply_modal()
+        return job_url
+
     def process_job_card(self, card_index):
+        """Process a single job card and log how long the URL capture took"""
+        self.last_capture_mode = None
+        self.last_card_outcome = "error"
+        started = time.perf_counter()
+        self.waits.start_card()
+        try:
+            return self.extract_job_card(card_index)
+        except CardBudgetExceeded as e:
+            print(f"⏭️ Abandoning card #{card_index + 1}: {e}")
+            self.last_card_outcome = "abandoned"
+            return None
+        finally:
+            self.waits.end_card()
+            elapsed = time.perf_counter() - started
+            mode = self.last_capture_mode or "none"
+            self.card_timings.append((mode, elapsed))
+            print(f"⏱️ Card #{card_index + 1}: {elapsed:.2f}s (capture mode: {mode})")
+
+    def extract_job_card(self, card_index):
         """Process a single job card to extract URL with detailed logging"""
         try:
             # Get all current job cards
@@ -218,16 +479,25 @@ class JobRightScraper:
 
             if card_index >= len(job_cards):
                 print(f"❌ Card #{card_index + 1} not found")
+                self.last_card_outcome = "not_found"
                 return None
 
             current_card = job_cards[card_index]
 
-            # Scroll to card
+            # Scroll to card and wait until it is actually centred in the viewport
+            fast_mode = APPLY_CAPTURE_MODE == "fast"
             self.driver.execute_script(
-                "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", 
-                current_card
+                "arguments[0].scrollIntoView({behavior: arguments[1], block: 'center'});",
+                current_card, "instant" if fast_mode else "smooth"
+            )
+            self.waits.attempt(
+                self.driver, "card_in_view",
+                lambda d: d.execute_script(
+                    "const r = arguments[0].getBoundingClientRect();"
+                    "return r.top >= 0 && r.bottom <= window.innerHeight;",
+                    current_card
+                )
             )
-            time.sleep(2)
             print(f"📍 Scrolled to card #{card_index + 1}")
 
             company_name_element = current_card.find_element(By.XPATH, ".//div[contains(@class, 'index_company-name__gKiOY')]")
@@ -238,7 +508,8 @@ class JobRightScraper:
             print(f"Found Job: {job_title} at {company_name}")
             # Find apply button with more detailed logging
             try:
-                apply_button = WebDriverWait(current_card, 10).until(
+                apply_button = self.waits.until(
+                    current_card, "apply_button",
                     EC.element_to_be_clickable((By.XPATH, ".//button[contains(@class, 'index_apply-button__kp79C')]"))
                 )
                 print(f"🔘 Found apply button for card #{card_index + 1}")
@@ -251,93 +522,120 @@ class JobRightScraper:
                     print(f"🔘 Found apply button with alternative selector")
                 except:
                     print(f"❌ No apply button found with any selector")
+                    self.last_card_outcome = "no_apply_button"
                     return None
 
-            # Click apply button
-            try:
-                initial_windows = len(self.driver.window_handles)
-                print(f"🪟 Current windows: {initial_windows}")
-    
-                # Method 1: Hover first, then real click
-                try:
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(apply_button).pause(0.5).click().perform()
-                    print(f"👆 Used ActionChains click for card #{card_index + 1}")
-                except:
-                    # Method 2: JavaScript click as fallback
-                    self.driver.execute_script("arguments[0].click();", apply_button)
-                    print(f"👆 Used JavaScript click for card #{card_index + 1}")
-    
-                # Wait for new window with better detection
-                try:
-                    # Wait a bit longer and check multiple times
-                    for attempt in range(10):  # 10 attempts = 10 seconds
-                        current_windows = len(self.driver.window_handles)
-                        print(f"🪟 Attempt {attempt + 1}: {current_windows} windows")
-                        
-                        if current_windows > initial_windows:
-                            print(f"🪟 New window detected after {attempt + 1} seconds!")
-                            break
-                            
-                        time.sleep(1)
-                    else:
-                        print(f"❌ No new window opened after 10 seconds")
-                        
-                        # Debug: Check if button is actually clickable
-                        print(f"🔍 Button enabled: {apply_button.is_enabled()}")
-                        print(f"🔍 Button displayed: {apply_button.is_displayed()}")
-                        
-                        # Try clicking the button text/span instead
-                        try:
-                            button_text = apply_button.find_element(By.TAG_NAME, "span")
-                            ActionChains(self.driver).move_to_element(button_text).click().perform()
-                            print(f"👆 Clicked button text as backup")
-                            
-                            # Wait again
-                            WebDriverWait(self.driver, 5).until(lambda d: len(d.window_handles) > initial_windows)
-                            print(f"🪟 New window opened with button text click!")
-                        except:
-                            print(f"❌ Button text click also failed")
-                            return None
-                            
-                except Exception as e:
-                    print(f"❌ Error waiting for new window: {e}")
+            job_url = None
+            if fast_mode:
+                self.last_capture_mode = "fast"
+                job_url = self.capture_apply_url_fast(apply_button, card_index)
+                # JobRight redirect links only resolve to the real posting in a browser window
+                if job_url and "jobright.ai" in job_url:
+                    print(f"↪️ Captured an internal redirect URL, falling back to window capture")
+                    job_url = None
+
+            if not job_url:
+                self.waits.check_budget("window_capture")
+                self.last_capture_mode = "window"
+                job_url = self.capture_apply_url_via_window(apply_button, card_index)
+                if not job_url:
+                    self.last_card_outcome = "capture_failed"
                     return None
 
-            except Exception as e:
-                print(f"❌ Error clicking apply button: {e}")
-                return None
-
-            # Switch to new window
-            new_window = [w for w in self.driver.window_handles if w != self.main_window][0]
-            self.driver.switch_to.window(new_window)
-
-            # Get URL and close window
-            time.sleep(3)
-            job_url = self.driver.current_url
-            print(f"🔗 Got URL: {job_url}")
-            self.driver.close()
-
-            # Switch back to main window
-            self.driver.switch_to.window(self.main_window)
-
-            # Handle the modal
-            time.sleep(2)
-            self.close_apply_modal()
-
             # Only return external URLs
             if "jobright.ai" not in job_url:
                 print(f"✅ Card #{card_index + 1}: {job_url}")
+                self.last_card_outcome = "collected"
                 return {"url": job_url, "companyName": company_name, "positionName": job_title}
             else:
                 print(f"⚠️ Card #{card_index + 1}: Internal URL, skipping")
+                self.last_card_outcome = "internal_url"
                 return None
 
+        except CardBudgetExceeded:
+            raise
         except Exception as e:
             print(f"❌ Unexpected error processing card #{card_index + 1}: {type(e).__name__}: {e}")
 
-    def scrape_jobs(self, max_jobs=150):
-        """Main scraping function with configurable range"""
+    def emit_job(self, job_info):
+        """Hand a collected job to the streaming publisher, if one is attached"""
+        if self.publisher:
+            self.publisher.add(job_info)
+
+    def report_card_timings(self):
+        """Print per-mode card timing stats so capture modes can be compared"""
+        if not self.card_timings:
+            return
+        print("⏱️ Card timing summary:")
+        for mode in sorted({m for m, _ in self.card_timings}):
+            durations = sorted(d for m, d in self.card_timings if m == mode)
+            avg = sum(durations) / len(durations)
+            p90 = durations[min(len(durations) - 1, int(len(durations) * 0.9))]
+            print(f"   {mode}: {len(durations)} cards, avg {avg:.2f}s, p90 {p90:.2f}s, max {durations[-1]:.2f}s")
+
+    def export_session(self):
+        """Return the cookies and local storage of the authenticated session so other drivers can reuse it"""
+        return {
+            "cookies": self.driver.get_cookies(),
+            "local_storage": self.driver.execute_script("return Object.assign({}, window.localStorage);"),
+            "saved_at": time.time(),
+        }
+
+    def import_session(self, session):
+        """Load an exported session into this driver and check that it is still logged in"""
+        try:
+            self.open_page("https://jobright.ai/")
+            for cookie in session.get("cookies", []):
+                cookie = {k: v for k, v in cookie.items() if k != "sameSite"}
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception as e:
+                    print(f"⚠️ Could not restore cookie {cookie.get('name')}: {e}")
+            self.driver.execute_script(
+                "for (const [k, v] of Object.entries(arguments[0])) { window.localStorage.setItem(k, v); }",
+                session.get("local_storage") or {}
+            )
+            self.driver.refresh()
+            self.waits.until(
+                self.driver, "session_check",
+                EC.presence_of_element_located((By.XPATH, "//span[text()='Profile']"))
+            )
+            print("✅ Reused authenticated session")
+            return True
+        except Exception as e:
+            print(f"❌ Could not reuse authenticated session: {e}")
+            return False
+
+    def save_session(self, store):
+        """Persist the current session so later runs can skip login()"""
+        try:
+            store.write(SESSION_KEY, json.dumps(self.export_session()).encode("utf-8"))
+            print("💾 Saved authenticated session")
+        except Exception as e:
+            print(f"⚠️ Could not save session: {e}")
+
+    def restore_session(self, store):
+        """Restore a saved session if one exists, is recent enough and is still accepted"""
+        try:
+            raw = store.read(SESSION_KEY)
+        except Exception as e:
+            print(f"⚠️ Could not read saved session: {e}")
+            return False
+        if not raw:
+            print("🔑 No saved session found")
+            return False
+
+        session = json.loads(raw)
+        age_hours = (time.time() - session.get("saved_at", 0)) / 3600
+        if age_hours > SESSION_MAX_AGE_HOURS:
+            print(f"🔑 Saved session is {age_hours:.1f}h old, logging in again")
+            return False
+
+        print(f"🔑 Restoring saved session ({age_hours:.1f}h old)...")
+        return self.import_session(session)
+
+    def get_index_range(self, max_jobs):
+        """Resolve the START_INDEX/END_INDEX range against the loaded cards"""
         # Get range parameters from environment variables
         start_index = int(os.environ.get("START_INDEX", 0))
         end_index = int(os.environ.get("END_INDEX", max_jobs))
@@ -353,45 +651,279 @@ class JobRightScraper:
 
         if start_index >= total_available:
             print(f"❌ {instance_name}: Start index {start_index} exceeds available jobs ({total_available})")
-            return []
+            return None
 
         print(f"📊 {instance_name}: {total_available} jobs available, processing indices {start_index}-{actual_end-1}")
+        return start_index, actual_end
 
-        for i in range(start_index, actual_end):
-            print(f"\n--- {instance_name}: Processing job {i + 1}/{actual_end} (index {i}) ---")
-            job_info = self.process_job_card(i)
+    def scrape_jobs(self, max_jobs=150):
+        """Main scraping function with configurable range"""
+        instance_name = os.environ.get("INSTANCE_NAME", "default")
+        index_range = self.get_index_range(max_jobs)
+        if not index_range:
+            return []
+        start_index, actual_end = index_range
+
+        # Skip cards collected by an earlier run before clicking anything
+        indices = list(range(start_index, actual_end))
+        card_keys = self.card_keys = self.read_card_keys()
+        if self.seen:
+            indices = [i for i in indices if i >= len(card_keys) or card_keys[i] not in self.seen]
+            print(f"⏭️ {instance_name}: Skipping {actual_end - start_index - len(indices)} already collected cards")
+
+        # Skip cards a previous attempt of this task already processed
+        resumed_records = []
+        if self.checkpoint:
+            resumed_records = list(self.checkpoint.records)
+            before = len(indices)
+            indices = self.checkpoint.remaining(indices, card_keys)
+            print(f"🗃️ {instance_name}: {before - len(indices)} cards already processed by an earlier attempt")
+
+        if WORKER_COUNT > 1 and indices:
+            results = self.scrape_jobs_parallel(indices, actual_end, WORKER_COUNT)
+        else:
+            results = {}
+            started = time.perf_counter()
+            for i in indices:
+                print(f"\n--- {instance_name}: Processing job {i + 1}/{actual_end} (index {i}) ---")
+                job_info = self.process_job_card(i)
+                self.record_progress(i, job_info, self.last_card_outcome)
+                if job_info:
+                    results[i] = job_info
+                    self.emit_job(job_info)
+
+            self.report_card_timings()
+            self.waits.report()
+            self.report_throughput(1, len(indices), time.perf_counter() - started)
+
+        self.job_data.extend(resumed_records)
+        for i in sorted(results):
+            self.job_data.append(results[i])
+        if self.checkpoint:
+            self.checkpoint.finish()
+        return self.job_data
+
+    def record_progress(self, card_index, job_info, outcome):
+        """Checkpoint a processed card and mark it seen; transient failures are retried by the next run"""
+        if card_index >= len(self.card_keys):
+            return
+        if self.checkpoint:
+            self.checkpoint.mark(self.card_keys[card_index], job_info)
+        # A card that was not in the list when we clicked says nothing about the posting
+        if self.seen and outcome != "not_found":
+            self.seen.add(self.card_keys[card_index], outcome)
+
+    def scrape_jobs_parallel(self, indices, end_index, worker_count):
+        """Split the card indices across several browser instances sharing this session"""
+        instance_name = os.environ.get("INSTANCE_NAME", "default")
+        print(f"🧵 {instance_name}: Processing {len(indices)} cards with {worker_count} workers")
+        start_index = min(indices, default=end_index)
+
+        session = self.export_session()
+        pending = queue.Queue()
+        for i in indices:
+            pending.put(i)
+
+        results = {}
+        results_lock = threading.Lock()
+        workers = [self]
+        unmatched = []
+
+        def process(worker, worker_id, i, card_index):
+            print(f"\n--- {instance_name}/worker-{worker_id}: Processing job {i + 1}/{end_index} (index {i}) ---")
+            job_info = worker.process_job_card(card_index)
+            self.record_progress(i, job_info, worker.last_card_outcome)
             if job_info:
-                self.job_data.append(job_info)
-                
+                with results_lock:
+                    results[i] = job_info
+                self.emit_job(job_info)
+
+        def drain(worker, worker_id, card_index_of):
+            # Workers pull indices from a shared queue so a slow worker never holds up a fixed slice
+            while True:
+                try:
+                    i = pending.get_nowait()
+                except queue.Empty:
+                    return
+                card_index = card_index_of(i)
+                if card_index is None:
+                    with results_lock:
+                        unmatched.append(i)
+                    continue
+                process(worker, worker_id, i, card_index)
+
+        def run_worker(worker_id):
+            # Worker 0 reuses this scraper's driver; the others start their own browser on the same session
+            if worker_id == 0:
+                drain(self, worker_id, lambda i: i)
+                return
+
+            worker = JobRightScraper()
+            workers.append(worker)
+            try:
+                if not worker.setup_driver(debug_port=BASE_DEBUG_PORT + worker_id):
+                    return
+                if not worker.import_session(session) or not worker.switch_to_most_recent():
+                    return
+                if worker.load_jobs(end_index) <= start_index:
+                    print(f"❌ worker-{worker_id}: Could not load enough cards, leaving work to the others")
+                    return
+                # The feed can differ between browsers, so map this scraper's indices through posting keys
+                own_index = {}
+                for position, key in enumerate(worker.read_card_keys()):
+                    own_index.setdefault(key, position)
+
+                def card_index_of(i):
+                    return own_index.get(self.card_keys[i]) if i < len(self.card_keys) else None
+
+                drain(worker, worker_id, card_index_of)
+            except Exception as e:
+                print(f"❌ worker-{worker_id}: {type(e).__name__}: {e}")
+            finally:
+                if worker.driver:
+                    worker.driver.quit()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            list(executor.map(run_worker, range(worker_count)))
+
+        # Cards another browser did not have loaded are processed by the main driver, which always has them
+        if unmatched:
+            print(f"🧵 {instance_name}: {len(unmatched)} cards were missing from a worker's feed, processing them here")
+            for i in sorted(unmatched):
+                process(self, 0, i, i)
+
+        for worker in workers:
+            if worker is not self:
+                self.card_timings.extend(worker.card_timings)
+                self.page_loads.extend(worker.page_loads)
+                self.waits.merge(worker.waits)
+        self.report_card_timings()
+        self.waits.report()
+        self.report_throughput(worker_count, len(indices), time.perf_counter() - started)
+        return results
+
+    def scrape_jobs_from_queue(self, store):
+        """Pull small index leases from the run's shared queue until every card is handled"""
+        instance_name = os.environ.get("INSTANCE_NAME", "default")
+        # Include the attempt so a retried task does not pass for the crashed attempt that held a lease
+        worker_name = (f"{instance_name}-{os.environ.get('CLOUD_RUN_TASK_INDEX', 0)}"
+                       f"-{os.environ.get('CLOUD_RUN_TASK_ATTEMPT', 0)}")
+        lease_queue = LeaseQueue(store, RUN_ID, worker_name=worker_name)
+
+        own_keys = self.read_card_keys()
+        manifest = lease_queue.publish_manifest(own_keys)
+        # Map manifest positions onto this browser's cards, which may be ordered slightly differently
+        own_index = {}
+        for i, key in enumerate(own_keys):
+            own_index.setdefault(key, i)
+
+        started = time.perf_counter()
+        processed = 0
+        while True:
+            lease = lease_queue.claim()
+            if not lease:
+                break
+            slot, start, end = lease
+            print(f"\n📦 {worker_name}: Leased cards {start + 1}-{end} (slot {slot})")
+
+            missing = []
+            for position in lease_queue.positions(slot):
+                key = manifest["card_keys"][position]
+                if self.seen and key in self.seen:
+                    continue
+                card_index = own_index.get(key)
+                if card_index is None:
+                    # Handed back with the slot so a worker whose browser loaded it can process it
+                    print(f"⚠️ Card #{position + 1} from the manifest is not loaded in this browser, handing it back")
+                    missing.append(position)
+                    continue
+
+                print(f"\n--- {worker_name}: Processing job {position + 1}/{len(manifest['card_keys'])} ---")
+                job_info = self.process_job_card(card_index)
+                processed += 1
+                if self.seen and self.last_card_outcome != "not_found":
+                    self.seen.add(key, self.last_card_outcome)
+                if job_info:
+                    self.job_data.append(job_info)
+                    self.emit_job(job_info)
+                if not lease_queue.renew(slot):
+                    # Another worker took the slot over after our lease expired; it will redo the rest
+                    print(f"⚠️ {worker_name}: Lost lease {slot} to another worker, moving on")
+                    break
+            else:
+                if not lease_queue.complete(slot, missing):
+                    print(f"⚠️ {worker_name}: Lease {slot} was taken over before it could be completed")
+
+        self.report_card_timings()
+        self.waits.report()
+        self.report_throughput(1, processed, time.perf_counter() - started)
         return self.job_data
 
+    def report_throughput(self, worker_count, card_count, elapsed):
+        """Print cards/minute for this run so different WORKER_COUNT values can be compared"""
+        if elapsed <= 0 or card_count <= 0:
+            return
+        rate = card_count / elapsed * 60
+        print(f"📈 Throughput with {worker_count} worker(s): {card_count} cards in {elapsed:.1f}s ({rate:.1f} cards/min)")
+
     def run(self):
         """Main execution flow"""
         try:
             instance_name = os.environ.get("INSTANCE_NAME", "default")
             print(f"🚀 Starting collector instance: {instance_name}")
+            session_store = get_blob_store(STATE_STORE_URI)
+
+            # A retry of a task that already finished its range does not need a browser at all
+            if session_store and SHARD_MODE == "static":
+                key = checkpoint_key(os.environ.get("START_INDEX", 0), os.environ.get("END_INDEX", 150))
+                self.checkpoint = Checkpoint(session_store, key)
+                if self.checkpoint.complete:
+                    print(f"🗃️ {instance_name}: Range already finished, returning {len(self.checkpoint.records)} checkpointed jobs")
+                    return list(self.checkpoint.records)
 
             # Setup
+            self.resources = ResourceMonitor()
+            self.resources.start()
             if not self.setup_driver():
                 return []
 
-            # Get credentials
-            email = os.environ.get("JOBRIGHT_EMAIL")
-            password = os.environ.get("JOBRIGHT_PASSWORD")
+            # Reuse a cached session when possible, logging in only if it has expired
+            if not (session_store and self.restore_session(session_store)):
+                # Get credentials
+                email = os.environ.get("JOBRIGHT_EMAIL")
+                password = os.environ.get("JOBRIGHT_PASSWORD")
 
-            if not email or not password:
-                print("❌ Missing credentials in environment variables")
-                return []
+                if not email or not password:
+                    print("❌ Missing credentials in environment variables")
+                    return []
 
-            # Execute workflow
-            if not self.login(email, password):
-                return []
+                # Execute workflow
+                if not self.login(email, password):
+                    return []
+
+                if session_store:
+                    self.save_session(session_store)
 
             if not self.switch_to_most_recent():
                 return []
 
-            self.load_jobs(150)  # Both instances load all 150 jobs
-            jobs = self.scrape_jobs(150)  # But each processes different ranges
+            target_count = 150
+            if INCREMENTAL_SCRAPE and session_store:
+                self.seen = SeenPostings(session_store)
+                target_count = self.seen.next_target_count(target_count)
+
+            self.load_jobs(target_count)  # Every instance loads the same list
+            if SHARD_MODE == "queue":
+                if not session_store:
+                    print("❌ SHARD_MODE=queue needs STATE_STORE_URI for the shared lease queue")
+                    return []
+                jobs = self.scrape_jobs_from_queue(session_store)  # Instances pull leases until the list is done
+            else:
+                jobs = self.scrape_jobs(150)  # But each processes different ranges
+
+            if self.seen:
+                self.seen.save(new_count=self.new_postings_observed)
 
             print(f"🎯 {instance_name}: Collected {len(jobs)} jobs")
             return jobs
@@ -404,9 +936,25 @@ class JobRightScraper:
         finally:
             if self.driver:
                 self.driver.quit()
+            if self.resources:
+                self.resources.stop()
+            report_page_loads(self.page_loads)
 
 if __name__ == "__main__":
-    scraper = JobRightScraper()
+    if COLLECTOR_MODE == "http":
+        from http_collector import JobRightHttpCollector
+        scraper = JobRightHttpCollector()
+    else:
+        scraper = JobRightScraper()
+
+    streaming_publisher = None
+    if PUBLISH_MODE == "stream":
+        from job_publisher import StreamingJobPublisher
+        if not os.environ.get("GCLOUD_PROJECT"):
+            raise ValueError("GCLOUD_PROJECT environment variable not set.")
+        streaming_publisher = StreamingJobPublisher(os.environ["GCLOUD_PROJECT"])
+        scraper.publisher = streaming_publisher
+
     collected_jobs = scraper.run()
     
     print(f"\n{'='*50}")
@@ -414,7 +962,12 @@ if __name__ == "__main__":
     print(f"{'='*50}")
     print(f"Total jobs collected: {len(collected_jobs)}")
     
-    if collected_jobs:
+    if streaming_publisher:
+        # Anything already streamed is dropped as a duplicate; collectors that do not stream per card publish here
+        for job in collected_jobs:
+            streaming_publisher.add(job)
+        streaming_publisher.close()
+    elif collected_jobs:
         GCP_PROJECT_ID = os.environ.get("GCLOUD_PROJECT")
         TOPIC_ID = "scraped-urls"
         
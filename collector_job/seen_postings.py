@@ -0,0 +1,131 @@
+import os
+import re
+import json
+import math
+import time
+
+# --- Configuration ---
+SEEN_POSTINGS_KEY = "state/seen-postings.json"
+SEEN_RETENTION_DAYS = float(os.environ.get("SEEN_RETENTION_DAYS", 30))
+# Cards that failed for reasons unrelated to the posting are only skipped until the next scheduled run
+TRANSIENT_RETENTION_HOURS = float(os.environ.get("TRANSIENT_RETENTION_HOURS", 12))
+# Outcomes that will not change if the card is clicked again
+STABLE_OUTCOMES = {"collected", "internal_url", "no_apply_button"}
+SAVE_ATTEMPTS = 5
+# Stop scrolling once this many consecutive loaded cards were already collected
+SEEN_STOP_STREAK = int(os.environ.get("SEEN_STOP_STREAK", 10))
+MIN_TARGET_COUNT = int(os.environ.get("MIN_TARGET_COUNT", 30))
+MAX_TARGET_COUNT = int(os.environ.get("MAX_TARGET_COUNT", 150))
+
+
+def posting_key(company, title, posting_id=""):
+    """Identity of a posting across runs: normalized company, title and (when known) posting id"""
+    def normalize(value):
+        return re.sub(r"\s+", " ", (value or "").strip().lower())
+    return f"{normalize(company)}|{normalize(title)}|{normalize(posting_id)}"
+
+
+class SeenPostings:
+    """Persistent set of postings processed by earlier runs, used as an incremental watermark.
+
+    Every processed card is recorded, not only the ones that produced a job: internal-URL
+    cards would otherwise be clicked again on every run and break the seen streak that stops
+    scrolling. Outcomes other than "collected" are kept alongside. Transient failures (errors,
+    abandoned cards, failed captures) only count as seen for TRANSIENT_RETENTION_HOURS, so the
+    next run tries them again.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.postings = {}
+        self.outcomes = {}
+        self.last_new_count = None
+        self.added = set()
+        self.load()
+
+    def load(self):
+        raw = self.store.read(SEEN_POSTINGS_KEY)
+        if not raw:
+            print("👀 No seen-postings state yet, doing a full run")
+            return
+        state = json.loads(raw)
+        self.postings = state.get("postings", {})
+        self.outcomes = state.get("outcomes", {})
+        self.last_new_count = state.get("last_new_count")
+        print(f"👀 Loaded {len(self.postings)} seen postings (last run found {self.last_new_count} new)")
+
+    def retention_seconds(self, key, outcomes=None):
+        outcome = (self.outcomes if outcomes is None else outcomes).get(key, "collected")
+        if outcome in STABLE_OUTCOMES:
+            return SEEN_RETENTION_DAYS * 86400
+        return TRANSIENT_RETENTION_HOURS * 3600
+
+    def __contains__(self, key):
+        seen_at = self.postings.get(key)
+        return seen_at is not None and seen_at >= time.time() - self.retention_seconds(key)
+
+    def add(self, key, outcome="collected"):
+        self.postings[key] = time.time()
+        if outcome == "collected":
+            self.outcomes.pop(key, None)
+        else:
+            self.outcomes[key] = outcome
+        self.added.add(key)
+
+    def count_new(self, keys):
+        return sum(1 for key in keys if key not in self)
+
+    def reached_seen_streak(self, keys):
+        """True when the trailing cards of a 'Most Recent' list are all postings we already have"""
+        tail = keys[-SEEN_STOP_STREAK:]
+        return len(tail) == SEEN_STOP_STREAK and all(key in self for key in tail)
+
+    def next_target_count(self, default=MAX_TARGET_COUNT):
+        """How many cards to load, based on how many new postings appeared last time"""
+        if self.last_new_count is None:
+            return default
+        target = math.ceil(self.last_new_count * 1.5) + SEEN_STOP_STREAK
+        return max(MIN_TARGET_COUNT, min(MAX_TARGET_COUNT, target))
+
+    def save(self, new_count=None):
+        """Merge with whatever other instances wrote since we loaded, prune old entries and persist.
+
+        The write is a compare-and-swap on the stored version, so concurrent tasks saving at
+        the same time re-merge instead of overwriting each other's additions.
+        """
+        for _ in range(SAVE_ATTEMPTS):
+            raw, token = self.store.read_with_token(SEEN_POSTINGS_KEY)
+            stored = json.loads(raw) if raw else {}
+            current = stored.get("postings", {})
+            outcomes = stored.get("outcomes", {})
+            for key in self.added:
+                current[key] = self.postings[key]
+                if key in self.outcomes:
+                    outcomes[key] = self.outcomes[key]
+                else:
+                    outcomes.pop(key, None)
+
+            now = time.time()
+            current = {key: seen_at for key, seen_at in current.items()
+                       if seen_at >= now - self.retention_seconds(key, outcomes)}
+            outcomes = {key: outcome for key, outcome in outcomes.items() if key in current}
+
+            state = {
+                "postings": current,
+                "outcomes": outcomes,
+                "last_new_count": new_count if new_count is not None else self.last_new_count,
+                "updated_at": now,
+            }
+            data = json.dumps(state).encode("utf-8")
+            saved = self.store.create(SEEN_POSTINGS_KEY, data) if raw is None else self.store.replace(SEEN_POSTINGS_KEY, data, token)
+            if saved:
+                break
+        else:
+            print(f"⚠️ Seen postings kept changing while saving, {len(self.added)} additions were not saved")
+            return
+        skipped = {}
+        for key in self.added:
+            outcome = self.outcomes.get(key, "collected")
+            skipped[outcome] = skipped.get(outcome, 0) + 1
+        breakdown = ", ".join(f"{outcome}: {count}" for outcome, count in sorted(skipped.items()))
+        print(f"💾 Saved {len(current)} seen postings ({len(self.added)} added this run{'; ' + breakdown if breakdown else ''})")
@@ -0,0 +1,104 @@
+import functools
+import pytest
+
+from browser_profile import apply_profile, block_resources, BLOCKED_URL_PATTERNS
+
+
+class FakeOptions:
+    def __init__(self):
+        self.arguments = []
+        self.experimental = {}
+        self.page_load_strategy = "normal"
+
+    def add_argument(self, argument):
+        self.arguments.append(argument)
+
+    def add_experimental_option(self, name, value):
+        self.experimental[name] = value
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        assert handle in self.driver.window_handles
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """Records CDP commands with the window they were sent to; a click on the apply button opens a popup"""
+
+    def __init__(self, popup_url="https://boards.greenhouse.io/acme/jobs/1"):
+        self.window_handles = ["main"]
+        self.current_window_handle = "main"
+        self.switch_to = FakeSwitchTo(self)
+        self.popup_url = popup_url
+        self.cdp_commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.append((self.current_window_handle, cmd, params))
+        return {}
+
+    def execute_script(self, script, *args):
+        if "click()" in script:
+            self.window_handles.append("popup")
+        if "readyState" in script:
+            return "complete"
+        return None
+
+    @property
+    def current_url(self):
+        return self.popup_url if self.current_window_handle == "popup" else "https://jobright.ai/jobs/recommend"
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+
+
+def test_the_full_profile_sends_no_cdp_commands():
+    driver = FakeDriver()
+    block_resources(driver, profile="full")
+    assert driver.cdp_commands == []
+
+
+def test_the_lean_profile_blocks_urls_in_the_current_window():
+    driver = FakeDriver()
+    block_resources(driver, profile="lean")
+    assert driver.cdp_commands == [
+        ("main", "Network.enable", {}),
+        ("main", "Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS}),
+    ]
+
+
+def test_a_cdp_failure_does_not_stop_the_scraper():
+    class NoDevTools(FakeDriver):
+        def execute_cdp_cmd(self, cmd, params):
+            raise RuntimeError("no DevTools")
+    block_resources(NoDevTools(), profile="lean")
+
+
+@pytest.mark.parametrize("profile, strategy", [("full", "normal"), ("lean", "eager")])
+def test_apply_profile_sets_the_chrome_options(profile, strategy):
+    options = FakeOptions()
+    apply_profile(options, profile=profile)
+    assert options.page_load_strategy == strategy
+    assert ("--blink-settings=imagesEnabled=false" in options.arguments) == (profile == "lean")
+
+
+@pytest.mark.parametrize("profile, blocked_windows", [("full", []), ("lean", ["main", "popup"])])
+def test_apply_popups_get_the_profile_too(monkeypatch, profile, blocked_windows):
+    pytest.importorskip("undetected_chromedriver")
+    import scraper
+    driver = FakeDriver()
+    monkeypatch.setattr(scraper, "apply_profile", functools.partial(apply_profile, profile=profile))
+    monkeypatch.setattr(scraper, "block_resources", functools.partial(block_resources, profile=profile))
+    monkeypatch.setattr(scraper.uc, "Chrome", lambda options: driver)
+    collector = scraper.JobRightScraper()
+    monkeypatch.setattr(collector, "close_apply_modal", lambda: None)
+
+    assert collector.setup_driver()
+    assert collector.capture_apply_url_via_window(object(), 0) == driver.popup_url
+
+    blocked = [window for window, cmd, _ in driver.cdp_commands if cmd == "Network.setBlockedURLs"]
+    assert blocked == blocked_windows
+    assert driver.window_handles == ["main"] and driver.current_window_handle == "main"
@@ -0,0 +1,86 @@
+import json
+import time
+import pytest
+
+import checkpoint
+from blob_store import LocalBlobStore
+from checkpoint import Checkpoint, checkpoint_key
+
+KEY = "checkpoints/run-1/default-0-0-10.json"
+
+
+def job(i):
+    return {"companyName": f"Acme {i}", "url": f"https://jobs.lever.co/acme/{i}"}
+
+
+def test_a_retry_resumes_the_records_and_skips_processed_cards(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    first = Checkpoint(store, KEY)
+    first.mark("card-0", job(0))
+    first.mark("card-1", None)  # Processed without yielding a job
+
+    retry = Checkpoint(store, KEY)
+    assert retry.records == [job(0)]
+    assert not retry.complete
+    card_keys = ["card-0", "card-1", "card-2"]
+    assert retry.remaining([0, 1, 2, 3], card_keys) == [2, 3]
+
+
+@pytest.mark.parametrize("age_hours, resumed", [(1, True), (7, False)])
+def test_checkpoints_older_than_the_max_age_are_ignored(tmp_path, age_hours, resumed):
+    store = LocalBlobStore(str(tmp_path))
+    state = {"processed": ["card-0"], "records": [job(0)], "complete": True,
+             "created_at": time.time() - age_hours * 3600}
+    store.write(KEY, json.dumps(state).encode("utf-8"))
+
+    restored = Checkpoint(store, KEY)
+    assert ("card-0" in restored) is resumed
+    assert restored.complete is resumed
+    assert restored.records == ([job(0)] if resumed else [])
+
+
+def test_finish_marks_the_range_complete(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    first = Checkpoint(store, KEY)
+    first.mark("card-0", job(0))
+    first.finish()
+
+    retry = Checkpoint(store, KEY)
+    assert retry.complete
+    assert retry.remaining([0], ["card-0"]) == []
+
+
+def test_saves_are_batched_by_checkpoint_every(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_EVERY", 3)
+    store = LocalBlobStore(str(tmp_path))
+    saver = Checkpoint(store, KEY)
+    saver.mark("card-0", job(0))
+    saver.mark("card-1", job(1))
+    assert store.read(KEY) is None
+    saver.mark("card-2", None)
+    assert len(json.loads(store.read(KEY))["processed"]) == 3
+
+
+def test_key_is_shared_by_retries_of_the_same_task(monkeypatch):
+    monkeypatch.setenv("CLOUD_RUN_EXECUTION", "collector-abc")
+    monkeypatch.setenv("INSTANCE_NAME", "first-half")
+    monkeypatch.setenv("CLOUD_RUN_TASK_INDEX", "1")
+    monkeypatch.delenv("RUN_ID", raising=False)
+    assert checkpoint_key(0, 75) == "checkpoints/collector-abc/first-half-1-0-75.json"
+
+
+def test_a_finished_range_is_returned_without_a_browser(tmp_path, monkeypatch):
+    pytest.importorskip("undetected_chromedriver")
+    import scraper
+    store = LocalBlobStore(str(tmp_path))
+    monkeypatch.setattr(scraper, "STATE_STORE_URI", str(tmp_path))
+    monkeypatch.setattr(scraper, "SHARD_MODE", "static")
+    monkeypatch.setenv("START_INDEX", "0")
+    monkeypatch.setenv("END_INDEX", "10")
+    done = Checkpoint(store, checkpoint_key("0", "10"))
+    done.mark("card-0", job(0))
+    done.finish()
+
+    collector = scraper.JobRightScraper()
+    monkeypatch.setattr(collector, "setup_driver", lambda: pytest.fail("started a browser for a finished range"))
+    assert collector.run() == [job(0)]
@@ -0,0 +1,114 @@
+import json
+import pytest
+
+pytest.importorskip("requests")
+
+import http_collector
+from http_collector import JobRightHttpCollector, SessionExpired, JOBS_PATH, LOGIN_PATH, SESSION_KEY
+from fake_jobright import FakeJobRight, fake_feed
+from blob_store import LocalBlobStore
+
+
+@pytest.fixture
+def fake():
+    with FakeJobRight(jobs=fake_feed(45, internal_every=10)) as server:
+        yield server
+
+
+def logged_in_collector(fake):
+    collector = JobRightHttpCollector(base_url=fake.base_url, page_size=20)
+    assert collector.login(fake.email, fake.password)
+    return collector
+
+
+def feed_positions(fake):
+    return [int(query["position"]) for method, path, query in fake.requests if path == JOBS_PATH]
+
+
+def test_collect_pages_until_the_feed_is_empty(fake):
+    collector = logged_in_collector(fake)
+
+    jobs = collector.collect(0, 150)
+
+    assert feed_positions(fake) == [0, 20, 40, 45]
+    # 45 entries, every 10th links back to jobright.ai
+    assert len(jobs) == 41
+    assert jobs[0] == {
+        "url": "https://boards.greenhouse.io/acme0/jobs/1000",
+        "companyName": "Acme 0",
+        "positionName": "Software Engineer 0",
+    }
+
+
+def test_collect_keeps_only_the_requested_range(fake):
+    collector = logged_in_collector(fake)
+
+    jobs = collector.collect(5, 25)
+
+    assert feed_positions(fake) == [0, 20]
+    assert [job["companyName"] for job in jobs] == [f"Acme {i}" for i in range(5, 25) if (i + 1) % 10]
+
+
+def test_fetch_page_without_a_session_raises_session_expired(fake):
+    collector = JobRightHttpCollector(base_url=fake.base_url)
+
+    with pytest.raises(SessionExpired):
+        collector.fetch_page(0)
+
+
+def test_login_rejects_wrong_password(fake):
+    collector = JobRightHttpCollector(base_url=fake.base_url)
+
+    assert not collector.login(fake.email, "wrong")
+
+
+def test_run_logs_in_again_when_the_saved_session_expired(fake, tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path))
+    stale = {"cookies": [{"name": "SESSION_ID", "value": "expired", "domain": "127.0.0.1", "path": "/"}]}
+    store.write(SESSION_KEY, json.dumps(stale).encode("utf-8"))
+    monkeypatch.setattr(http_collector, "STATE_STORE_URI", str(tmp_path))
+    monkeypatch.setenv("JOBRIGHT_EMAIL", fake.email)
+    monkeypatch.setenv("JOBRIGHT_PASSWORD", fake.password)
+    monkeypatch.setenv("START_INDEX", "0")
+    monkeypatch.setenv("END_INDEX", "30")
+
+    jobs = JobRightHttpCollector(base_url=fake.base_url, page_size=20).run()
+
+    paths = [path for method, path, query in fake.requests]
+    assert paths == [JOBS_PATH, LOGIN_PATH, JOBS_PATH, JOBS_PATH]
+    assert len(jobs) == 27
+    # The fresh session replaced the stale one in the shared cache
+    saved = json.loads(store.read(SESSION_KEY))
+    assert [c["value"] for c in saved["cookies"]] != ["expired"]
+
+    # The next run reuses the saved session without logging in
+    fake.requests.clear()
+    JobRightHttpCollector(base_url=fake.base_url, page_size=20).run()
+    assert LOGIN_PATH not in [path for method, path, query in fake.requests]
+
+
+def test_run_gives_up_without_credentials(fake, monkeypatch):
+    monkeypatch.setattr(http_collector, "STATE_STORE_URI", None)
+    monkeypatch.delenv("JOBRIGHT_EMAIL", raising=False)
+    monkeypatch.delenv("JOBRIGHT_PASSWORD", raising=False)
+
+    assert JobRightHttpCollector(base_url=fake.base_url).run() == []
+
+
+@pytest.mark.parametrize("item, expected", [
+    (
+        {"jobResult": {"jobTitle": "Data Engineer", "applyLink": "https://jobs.lever.co/acme/1"},
+         "companyResult": {"companyName": "Acme"}},
+        {"url": "https://jobs.lever.co/acme/1", "companyName": "Acme", "positionName": "Data Engineer"},
+    ),
+    (
+        {"title": "Backend Engineer", "originalUrl": "https://acme.com/careers/2", "companyName": "Acme"},
+        {"url": "https://acme.com/careers/2", "companyName": "Acme", "positionName": "Backend Engineer"},
+    ),
+    ({"jobResult": {"jobTitle": "SWE", "applyLink": "https://jobright.ai/jobs/info/1"},
+      "companyResult": {"companyName": "Acme"}}, None),
+    ({"jobResult": {"jobTitle": "SWE"}, "companyResult": {"companyName": "Acme"}}, None),
+    ({"jobResult": {"applyLink": "https://acme.com/3"}, "companyResult": {"companyName": "Acme"}}, None),
+])
+def test_parse_job(item, expected):
+    assert JobRightHttpCollector(base_url="http://127.0.0.1:1").parse_job(item) == expected
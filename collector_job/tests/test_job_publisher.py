@@ -0,0 +1,91 @@
+import json
+import time
+import pytest
+from concurrent.futures import Future
+
+from job_publisher import StreamingJobPublisher
+
+
+class FakePublisherClient:
+    """In-memory stand-in for pubsub_v1.PublisherClient; fail_batches lists publish calls (1-based) that fail"""
+
+    def __init__(self, fail_batches=()):
+        self.fail_batches = set(fail_batches)
+        self.messages = []
+        self.resumed = []
+
+    def topic_path(self, project_id, topic_id):
+        return f"projects/{project_id}/topics/{topic_id}"
+
+    def publish(self, topic, data, ordering_key="", **attributes):
+        self.messages.append({"topic": topic, "jobs": json.loads(data)["jobs"], "ordering_key": ordering_key,
+                              "attributes": attributes})
+        future = Future()
+        if len(self.messages) in self.fail_batches:
+            future.set_exception(RuntimeError("503 Service Unavailable"))
+        else:
+            future.set_result(str(len(self.messages)))
+        return future
+
+    def resume_publish(self, topic, ordering_key):
+        self.resumed.append((topic, ordering_key))
+
+
+def job(i):
+    return {"companyName": f"Acme {i}", "positionName": "Engineer", "url": f"https://jobs.lever.co/acme/{i}"}
+
+
+@pytest.fixture(autouse=True)
+def instance_name(monkeypatch):
+    monkeypatch.setenv("INSTANCE_NAME", "worker-a")
+
+
+def test_jobs_are_published_in_batches_by_count():
+    client = FakePublisherClient()
+    publisher = StreamingJobPublisher("proj", "scraped-urls", client=client, batch_size=2, max_latency=60)
+    for i in range(5):
+        publisher.add(job(i))
+    assert [len(m["jobs"]) for m in client.messages] == [2, 2]
+
+    assert publisher.close() == 5
+    assert [len(m["jobs"]) for m in client.messages] == [2, 2, 1]
+    assert {m["topic"] for m in client.messages} == {"projects/proj/topics/scraped-urls"}
+
+
+def test_repeats_are_dropped_and_batches_carry_dedup_and_ordering_keys():
+    client = FakePublisherClient()
+    publisher = StreamingJobPublisher("proj", client=client, batch_size=2, max_latency=60)
+    assert publisher.add(job(1))
+    assert not publisher.add(dict(job(1), positionName="Engineer II"))
+    publisher.add(job(2))
+    publisher.add(job(3))
+    publisher.close()
+
+    assert [[j["url"] for j in m["jobs"]] for m in client.messages] == [
+        [job(1)["url"], job(2)["url"]], [job(3)["url"]]]
+    # One ordering key per instance keeps its batches in the order they were found
+    assert {m["ordering_key"] for m in client.messages} == {"worker-a"}
+    keys = [m["attributes"]["dedup_key"] for m in client.messages]
+    assert len(set(keys)) == 2
+
+
+def test_a_partial_batch_is_flushed_after_the_max_latency():
+    client = FakePublisherClient()
+    publisher = StreamingJobPublisher("proj", client=client, batch_size=10, max_latency=0.1)
+    publisher.add(job(1))
+    deadline = time.monotonic() + 3
+    while not client.messages and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(client.messages) == 1
+    publisher.close()
+
+
+def test_a_failed_publish_resumes_the_ordering_key_and_fails_close():
+    client = FakePublisherClient(fail_batches=[1])
+    publisher = StreamingJobPublisher("proj", client=client, batch_size=1, max_latency=60)
+    publisher.add(job(1))
+    publisher.add(job(2))
+
+    assert client.resumed == [("projects/proj/topics/scraped-urls", "worker-a")]
+    with pytest.raises(RuntimeError, match="1 of 2"):
+        publisher.close()
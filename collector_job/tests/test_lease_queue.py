@@ -0,0 +1,88 @@
+import time
+import threading
+from blob_store import LocalBlobStore
+import lease_queue
+from lease_queue import LeaseQueue
+
+CARDS = [f"card-{i}" for i in range(4)]
+
+
+def make_queue(store, name, lease_timeout=0.3):
+    queue = LeaseQueue(store, "run-1", worker_name=name, lease_size=2, lease_timeout=lease_timeout, poll_seconds=0.05)
+    queue.publish_manifest(CARDS)
+    return queue
+
+
+def test_claim_waits_for_a_dead_peer_and_takes_over_its_lease(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    a, b = make_queue(store, "a"), make_queue(store, "b")
+
+    assert a.claim() == (0, 0, 2)  # a dies holding slot 0
+    assert b.claim() == (1, 2, 4)
+    assert b.complete(1)
+
+    started = time.monotonic()
+    assert b.claim() == (0, 0, 2)
+    assert time.monotonic() - started >= 0.2  # waited for a's lease to expire
+    assert b.complete(0)
+    assert b.claim() is None
+
+
+def test_claim_returns_none_only_when_every_slot_is_done(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    a, b = make_queue(store, "a", lease_timeout=5), make_queue(store, "b", lease_timeout=5)
+    assert a.claim() == (0, 0, 2)
+    assert a.claim() == (1, 2, 4)
+
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(b.claim()))
+    waiter.start()
+    time.sleep(0.2)
+    assert waiter.is_alive()  # a still holds live leases
+
+    assert a.complete(0) and a.complete(1)
+    waiter.join(timeout=2)
+    assert result == [None]
+
+
+def test_renew_and_complete_fail_after_the_lease_was_stolen(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    a, b = make_queue(store, "a", lease_timeout=0.1), make_queue(store, "b", lease_timeout=0.1)
+    assert a.claim() == (0, 0, 2)
+    time.sleep(0.15)
+    assert b.claim() == (0, 0, 2)
+
+    assert not a.renew(0)
+    assert not a.complete(0)
+    assert b.renew(0)
+    assert b.complete(0)
+
+
+def test_cards_missing_from_one_browser_are_handed_to_another_worker(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    a, b = make_queue(store, "a", lease_timeout=5), make_queue(store, "b", lease_timeout=5)
+    assert a.claim() == (0, 0, 2)
+    assert a.positions(0) == [0, 1]
+    assert a.complete(0, missing=[1])  # card-1 was not loaded in a's browser
+    assert a.claim() == (1, 2, 4)
+    assert a.complete(1)
+    assert a.claim() is None  # a already tried the handed-back card
+
+    assert b.claim() == (0, 0, 2)
+    assert b.positions(0) == [1]
+    assert b.renew(0)
+    assert b.complete(0)
+    assert b.claim() is None
+
+
+def test_missing_cards_are_given_up_after_every_attempt(tmp_path, monkeypatch):
+    monkeypatch.setattr(lease_queue, "MISSING_CARD_ATTEMPTS", 2)
+    store = LocalBlobStore(str(tmp_path))
+    a, b, c = (make_queue(store, name, lease_timeout=5) for name in "abc")
+    assert a.claim() == (0, 0, 2)
+    assert a.complete(0, missing=[0, 1])
+    assert b.claim() == (0, 0, 2)
+    assert b.complete(0, missing=[0])
+    assert b.claim() == (1, 2, 4)
+    assert b.complete(1)
+    assert c.claim() is None  # Slot 0 was given up on after two workers tried it
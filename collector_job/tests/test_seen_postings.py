@@ -0,0 +1,89 @@
+import json
+import time
+import threading
+import seen_postings
+from blob_store import LocalBlobStore
+from seen_postings import SeenPostings, SEEN_POSTINGS_KEY, SEEN_STOP_STREAK, posting_key
+
+
+def test_outcomes_persist_and_every_processed_card_counts_as_seen(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    seen = SeenPostings(store)
+    collected = posting_key("Acme", "Engineer", "1")
+    internal = posting_key("Acme", "Engineer", "2")
+    failed = posting_key("Acme", "Engineer", "3")
+
+    seen.add(collected)
+    seen.add(internal, "internal_url")
+    seen.add(failed, "capture_failed")
+    seen.save()
+
+    reloaded = SeenPostings(store)
+    assert all(key in reloaded for key in (collected, internal, failed))
+    assert reloaded.outcomes == {internal: "internal_url", failed: "capture_failed"}
+
+
+def test_non_collected_cards_complete_the_seen_streak(tmp_path):
+    seen = SeenPostings(LocalBlobStore(str(tmp_path)))
+    keys = [posting_key("Acme", f"Role {i}") for i in range(SEEN_STOP_STREAK)]
+    for i, key in enumerate(keys):
+        seen.add(key, "collected" if i % 2 else "internal_url")
+
+    assert seen.reached_seen_streak(keys)
+
+
+def test_save_merges_other_instances_outcomes(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    first, second = SeenPostings(store), SeenPostings(store)
+    first.add("a|x|", "internal_url")
+    first.save()
+    second.add("b|y|")
+    second.save()
+
+    state = json.loads(store.read(SEEN_POSTINGS_KEY))
+    assert set(state["postings"]) == {"a|x|", "b|y|"}
+    assert state["outcomes"] == {"a|x|": "internal_url"}
+
+
+def test_transient_failures_are_retried_after_a_short_retention(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path))
+    seen = SeenPostings(store)
+    seen.add("collected|x|")
+    seen.add("no-apply|x|", "no_apply_button")
+    seen.add("failed|x|", "capture_failed")
+    seen.add("error|x|", "error")
+    assert all(key in seen for key in seen.postings)
+    seen.save()
+
+    # A day later the failures are due for another try; stable outcomes are still skipped
+    later = time.time() + 86400
+    monkeypatch.setattr(seen_postings.time, "time", lambda: later)
+    reloaded = SeenPostings(store)
+    assert "collected|x|" in reloaded and "no-apply|x|" in reloaded
+    assert "failed|x|" not in reloaded and "error|x|" not in reloaded
+
+    reloaded.save()
+    state = json.loads(store.read(SEEN_POSTINGS_KEY))
+    assert set(state["postings"]) == {"collected|x|", "no-apply|x|"}
+
+
+def test_concurrent_saves_keep_every_instances_additions(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    instances = [SeenPostings(store) for _ in range(6)]
+    for i, seen in enumerate(instances):
+        seen.add(f"company {i}|engineer|")
+
+    barrier = threading.Barrier(len(instances))
+
+    def save(seen):
+        barrier.wait()
+        seen.save()
+
+    threads = [threading.Thread(target=save, args=(seen,)) for seen in instances]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    state = json.loads(store.read(SEEN_POSTINGS_KEY))
+    assert set(state["postings"]) == {f"company {i}|engineer|" for i in range(6)}
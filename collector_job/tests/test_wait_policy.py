@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from wait_policy import WaitPolicy
+
+
+def flaky_condition(stale_polls, result="ready"):
+    """Condition that raises StaleElementReferenceException for the first polls, like a re-rendered element"""
+    calls = {"count": 0}
+
+    def condition(target):
+        calls["count"] += 1
+        if calls["count"] <= stale_polls:
+            raise StaleElementReferenceException("element is not attached to the page document")
+        return result
+
+    return condition, calls
+
+
+def test_until_polls_through_stale_elements():
+    waits = WaitPolicy(poll_interval=0.01)
+    condition, calls = flaky_condition(stale_polls=3)
+
+    assert waits.until(object(), "sort_applied", condition, timeout=1) == "ready"
+    assert calls["count"] == 4
+    assert len(waits.timings["sort_applied"]) == 1
+
+
+def test_attempt_returns_none_when_the_element_stays_stale():
+    waits = WaitPolicy(poll_interval=0.01)
+    condition, _ = flaky_condition(stale_polls=10**6)
+
+    assert waits.attempt(object(), "sort_applied", condition, timeout=0.1) is None
+
+
+def test_until_raises_timeout_for_a_condition_that_never_holds():
+    waits = WaitPolicy(poll_interval=0.01)
+
+    with pytest.raises(TimeoutException):
+        waits.until(object(), "modal_close", lambda target: False, timeout=0.05)
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# --- Configuration ---
+POLL_INTERVAL = float(os.environ.get("WAIT_POLL_INTERVAL", 0.1))
+# Total seconds a single card may spend in waits before it is abandoned
+CARD_TIME_BUDGET = float(os.environ.get("CARD_TIME_BUDGET", 20))
+
+# Per-step deadlines in seconds; override any of them with WAIT_DEADLINES='{"step": seconds}'
+DEFAULT_DEADLINES = {
+    "page_ready": 10,
+    "cookie_banner": 2,
+    "signin_button": 30,
+    "login_form": 15,
+    "login_success": 25,
+    "login_retry": 5,
+    "session_check": 10,
+    "sort_dropdown": 10,
+    "sort_option": 10,
+    "sort_applied": 10,
+    "jobs_loaded": 15,
+    "card_in_view": 3,
+    "apply_button": 5,
+    "fast_capture": float(os.environ.get("FAST_CAPTURE_TIMEOUT", 3)),
+    "new_window": 10,
+    "new_window_retry": 5,
+    "popup_url": 5,
+    "modal_button": 5,
+    "modal_close": 3,
+}
+
+HISTOGRAM_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 30]
+# React re-renders can detach an element a condition is reading; treat that as "not yet" and poll again
+IGNORED_EXCEPTIONS = (StaleElementReferenceException,)
+
+
+class CardBudgetExceeded(Exception):
+    """Raised when a card has used up its failure budget and should be abandoned."""
+
+
+class WaitPolicy:
+    """Condition-based waits with per-step deadlines, a per-card budget and timing histograms"""
+
+    def __init__(self, poll_interval=POLL_INTERVAL, card_budget=CARD_TIME_BUDGET, deadlines=None):
+        self.poll_interval = poll_interval
+        self.card_budget = card_budget
+        self.deadlines = dict(DEFAULT_DEADLINES)
+        self.deadlines.update(json.loads(os.environ.get("WAIT_DEADLINES", "{}")))
+        if deadlines:
+            self.deadlines.update(deadlines)
+        self.timings = {}
+        self.card_deadline = None
+
+    def start_card(self):
+        """Start the failure budget for a new card"""
+        self.card_deadline = time.monotonic() + self.card_budget
+
+    def end_card(self):
+        self.card_deadline = None
+
+    def budget_remaining(self):
+        if self.card_deadline is None:
+            return float("inf")
+        return self.card_deadline - time.monotonic()
+
+    def check_budget(self, step):
+        """Abandon the current card if its budget is used up before an expensive step"""
+        if self.budget_remaining() <= 0:
+            raise CardBudgetExceeded(f"card budget of {self.card_budget}s exhausted before '{step}'")
+
+    def timeout_for(self, step):
+        return max(0, min(self.deadlines.get(step, 10), self.budget_remaining()))
+
+    def record(self, step, elapsed):
+        self.timings.setdefault(step, []).append(elapsed)
+
+    @contextmanager
+    def timed(self, step):
+        """Record how long the wrapped block takes under the given step name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(step, time.perf_counter() - started)
+
+    def until(self, target, step, condition, timeout=None):
+        """Poll condition(target) until it is truthy or the step deadline passes.
+
+        Raises TimeoutException on the deadline, or CardBudgetExceeded if the card
+        budget is already gone before the wait starts.
+        """
+        self.check_budget(step)
+        timeout = self.timeout_for(step) if timeout is None else timeout
+        with self.timed(step):
+            return WebDriverWait(target, timeout, poll_frequency=self.poll_interval,
+                                 ignored_exceptions=IGNORED_EXCEPTIONS).until(condition)
+
+    def until_not(self, target, step, condition, timeout=None):
+        """Poll condition(target) until it is falsy or the step deadline passes"""
+        self.check_budget(step)
+        timeout = self.timeout_for(step) if timeout is None else timeout
+        with self.timed(step):
+            return WebDriverWait(target, timeout, poll_frequency=self.poll_interval,
+                                 ignored_exceptions=IGNORED_EXCEPTIONS).until_not(condition)
+
+    def attempt(self, target, step, condition, timeout=None):
+        """Like until(), but returns None instead of raising on timeout or an exhausted budget"""
+        try:
+            return self.until(target, step, condition, timeout)
+        except (TimeoutException, CardBudgetExceeded):
+            return None
+
+    def merge(self, other):
+        """Fold another policy's timings into this one (e.g. from parallel workers)"""
+        for step, durations in other.timings.items():
+            self.timings.setdefault(step, []).extend(durations)
+
+    def report(self):
+        """Print a timing histogram per step so we can see where the wall time goes"""
+        if not self.timings:
+            return
+        print("⏱️ Wait timing histograms (count per upper bound in seconds):")
+        labels = [f"≤{b}" for b in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}"]
+        ranked = sorted(self.timings.items(), key=lambda item: sum(item[1]), reverse=True)
+        for step, durations in ranked:
+            counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+            for d in durations:
+                bucket = next((i for i, b in enumerate(HISTOGRAM_BUCKETS) if d <= b), len(HISTOGRAM_BUCKETS))
+                counts[bucket] += 1
+            histogram = " ".join(f"{label}:{count}" for label, count in zip(labels, counts) if count)
+            print(f"   {step}: n={len(durations)} total={sum(durations):.1f}s max={max(durations):.2f}s | {histogram}")
@@ -35,6 +35,17 @@ done
 TOPIC_NAME=${TOPIC_NAME:-scraped-urls}
 SCHEDULE=${SCHEDULE:-"00 12 * * 1-6"}
 TIMEZONE=${TIMEZONE:-America/Denver}
+COLLECTOR_WORKER_COUNT=${COLLECTOR_WORKER_COUNT:-1}
+COLLECTOR_BROWSER_PROFILE=${COLLECTOR_BROWSER_PROFILE:-full}
+STATE_STORE_URI=${STATE_STORE_URI:-}
+INCREMENTAL_SCRAPE=${INCREMENTAL_SCRAPE:-false}
+SHARD_MODE=${SHARD_MODE:-static}
+COLLECTOR_WORKERS=${COLLECTOR_WORKERS:-2}
+BATCH_STORE_URI=${BATCH_STORE_URI:-}
+# Analyzer state (URL index, verdict cache, chunk budget) must outlive each execution's in-memory /tmp
+ANALYZER_STATE_URI=${ANALYZER_STATE_URI:-$BATCH_STORE_URI}
+BATCH_WINDOW_SECONDS=${BATCH_WINDOW_SECONDS:-20}
+BATCH_MAX_JOBS=${BATCH_MAX_JOBS:-150}
 DISPATCHER_SA="dispatcher-sa@$GCLOUD_PROJECT.iam.gserviceaccount.com"
 COLLECTOR_SA="collector-sa@$GCLOUD_PROJECT.iam.gserviceaccount.com"
 AI_ANALYZER_SA="ai-analyzer-sa@$GCLOUD_PROJECT.iam.gserviceaccount.com"
@@ -142,7 +153,7 @@ gcloud run deploy "$DISPATCHER_SVC" \
   --memory=512Mi \
   --cpu=1 \
   --timeout=60s \
-  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT,COLLECTOR_JOB_NAME=$COLLECTOR_JOB,SERVICE_REGION=$REGION" \
+  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT,COLLECTOR_JOB_NAME=$COLLECTOR_JOB,SERVICE_REGION=$REGION,SHARD_MODE=$SHARD_MODE,COLLECTOR_WORKERS=$COLLECTOR_WORKERS" \
   --max-instances=2 >/dev/null
 DISPATCHER_URL=$(gcloud run services describe "$DISPATCHER_SVC" --region="$REGION" --format="value(status.url)")
 
@@ -155,8 +166,8 @@ gcloud run jobs deploy "$COLLECTOR_JOB" \
   --memory=8Gi \
   --cpu=4 \
   --task-timeout=1800s \
-  --parallelism=1 \
-  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT,TOPIC_NAME=$TOPIC_NAME" \
+  --parallelism="$COLLECTOR_WORKERS" \
+  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT,TOPIC_NAME=$TOPIC_NAME,WORKER_COUNT=$COLLECTOR_WORKER_COUNT,BROWSER_PROFILE=$COLLECTOR_BROWSER_PROFILE,STATE_STORE_URI=$STATE_STORE_URI,INCREMENTAL_SCRAPE=$INCREMENTAL_SCRAPE" \
   --update-secrets="JOBRIGHT_EMAIL=jobright-email:latest,JOBRIGHT_PASSWORD=jobright-password:latest" >/dev/null
 
 # 10) Deploy AI Analyzer job (uses Secret Manager programmatically)
@@ -170,7 +181,7 @@ gcloud run jobs deploy "$AI_JOB" \
   --task-timeout=1800s \
   --parallelism=1 \
   --update-secrets="GOOGLE_SHEET_ID=google-sheet-id:latest,RESUME_LATEX=resume-latex:latest,GEMINI_API_KEY=gemini-api-key:latest" \
-  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT" >/dev/null
+  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT,BATCH_STORE_URI=$BATCH_STORE_URI,ANALYZER_STATE_URI=$ANALYZER_STATE_URI" >/dev/null
 
 # Also grant invoker on the specific AI job (not strictly required with run.developer, but harmless)
 gcloud run jobs add-iam-policy-binding "$AI_JOB" \
@@ -179,7 +190,31 @@ gcloud run jobs add-iam-policy-binding "$AI_JOB" \
   --role="roles/run.invoker" >/dev/null || true
 
 # 11) Deploy Job Trigger Service (receives Pub/Sub via Eventarc, triggers AI job with overrides)
+# Dedup keys and batches left by failed runs are deleted by age. This replaces the bucket's lifecycle
+# configuration, so set LIFECYCLE_RULES=false if the bucket has rules of its own.
+if [[ "$BATCH_STORE_URI" == gs://* && "${LIFECYCLE_RULES:-true}" == "true" ]]; then
+  echo "🧹 Setting lifecycle rules on $BATCH_STORE_URI..."
+  STORE_PATH=${BATCH_STORE_URI#gs://}
+  STORE_BUCKET=${STORE_PATH%%/*}
+  STORE_PREFIX=""
+  [[ "$STORE_PATH" == */* ]] && STORE_PREFIX="${STORE_PATH#*/}"
+  STORE_PREFIX=${STORE_PREFIX%/}
+  STORE_PREFIX=${STORE_PREFIX:+$STORE_PREFIX/}
+  DEDUP_TTL_DAYS=$(( (${DEDUP_TTL_HOURS:-24} + 23) / 24 + 1 ))
+  LIFECYCLE_FILE=$(mktemp)
+  cat > "$LIFECYCLE_FILE" <<EOF
+{"rule": [
+  {"action": {"type": "Delete"}, "condition": {"age": $DEDUP_TTL_DAYS, "matchesPrefix": ["${STORE_PREFIX}dedup/"]}},
+  {"action": {"type": "Delete"}, "condition": {"age": 7, "matchesPrefix": ["${STORE_PREFIX}batches/"]}}
+]}
+EOF
+  gcloud storage buckets update "gs://$STORE_BUCKET" --lifecycle-file="$LIFECYCLE_FILE" >/dev/null
+  rm -f "$LIFECYCLE_FILE"
+fi
+
 echo "🚀 Deploying job-trigger-service..."
+# Each request holds a gunicorn thread until its window launches, so concurrency must not exceed
+# the --threads in ai_trigger/Dockerfile; requests beyond it would queue behind open windows.
 gcloud run deploy "$TRIGGER_SVC" \
   --image="$DOCKER_AI_DISPATCH" \
   --platform=managed \
@@ -189,7 +224,8 @@ gcloud run deploy "$TRIGGER_SVC" \
   --memory=512Mi \
   --cpu=1 \
   --timeout=60s \
-  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT,REGION=$REGION,AI_JOB_NAME=$AI_JOB" \
+  --concurrency=32 \
+  --set-env-vars="GCLOUD_PROJECT=$GCLOUD_PROJECT,REGION=$REGION,AI_JOB_NAME=$AI_JOB,BATCH_STORE_URI=$BATCH_STORE_URI,BATCH_WINDOW_SECONDS=$BATCH_WINDOW_SECONDS,BATCH_MAX_JOBS=$BATCH_MAX_JOBS" \
   --max-instances=5 >/dev/null
 TRIGGER_URL=$(gcloud run services describe "$TRIGGER_SVC" --region="$REGION" --format="value(status.url)")
 